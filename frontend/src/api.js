@@ -0,0 +1,20 @@
+// Fetch wrapper for every call to the SortedShelf services.
+//
+// Sends the signed access token stored at login as "Authorization: Bearer ..."
+// (media-service and collection-service reject user-scoped requests without
+// it), and goes back to the login page when the token is missing or expired.
+
+export const apiFetch = async (url, options = {}) => {
+  const headers = new Headers(options.headers || {});
+  const token = localStorage.getItem('access_token');
+  if (token) {
+    headers.set('Authorization', `Bearer ${token}`);
+  }
+  const res = await fetch(url, { ...options, headers });
+  if (res.status === 401 && window.location.pathname !== '/login') {
+    window.location.assign('/login');
+  }
+  return res;
+};
+
+export default apiFetch;
@@ -9,6 +9,7 @@ import {
   Button,
   Divider,
 } from '@mui/material';
+import { apiFetch } from '../api';
 
 const AddCollection = () => {
   const navigate = useNavigate();
@@ -28,7 +29,7 @@ const AddCollection = () => {
       return;
     }
     try {
-      const res = await fetch('/api/collections', {
+      const res = await apiFetch('/api/collections', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ user_id: parseInt(userId, 10), name, description }),
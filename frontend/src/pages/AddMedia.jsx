@@ -4,6 +4,7 @@ import {
   TextField, Button, MenuItem, Select, InputLabel, FormControl, OutlinedInput, Checkbox, ListItemText, Divider
 } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
+import { apiFetch } from '../api';
 
 const AddMedia = () => {
   const navigate = useNavigate();
@@ -22,7 +23,7 @@ const AddMedia = () => {
       setError(null);
       try {
         const userId = localStorage.getItem('user_id');
-        const allCollRes = await fetch(`/api/collections?user_id=${userId}`);
+        const allCollRes = await apiFetch(`/api/collections?user_id=${userId}`);
         const allCollJson = await allCollRes.json();
         setAvailableCollections(Array.isArray(allCollJson.collections) ? allCollJson.collections : []);
       } catch (err) {
@@ -79,7 +80,7 @@ const AddMedia = () => {
         user_id: userId,
         metadata
       });
-      const mediaRes = await fetch(`/api/media`, {
+      const mediaRes = await apiFetch(`/api/media`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -101,7 +102,7 @@ const AddMedia = () => {
       if (!mediaJson.id) throw new Error('Failed to add media - no ID returned');
       // Link collections via collection-service
       if (collections.length > 0) {
-        const collRes = await fetch(`/api/collection-media`, {
+        const collRes = await apiFetch(`/api/collection-media`, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
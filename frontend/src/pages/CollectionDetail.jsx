@@ -19,6 +19,7 @@ import {
 import ArrowBackIcon from '@mui/icons-material/ArrowBack';
 import FolderIcon from '@mui/icons-material/Folder';
 import SettingsIcon from '@mui/icons-material/Settings';
+import { apiFetch } from '../api';
 
 const CollectionDetail = () => {
   const { id } = useParams();
@@ -34,14 +35,14 @@ const CollectionDetail = () => {
       setError(null);
       try {
         console.log('Fetching collection details:', `/api/collections/${id}`);
-        const res = await fetch(`/api/collections/${id}`);
+        const res = await apiFetch(`/api/collections/${id}`);
         if (!res.ok) throw new Error('Collection not found');
         const json = await res.json();
         console.log('Collection response:', json);
         setCollection(json.collection);
 
         console.log('Fetching media for collection:', `/api/collection/${id}/media`);
-        const mediaRes = await fetch(`/api/collection/${id}/media`);
+        const mediaRes = await apiFetch(`/api/collection/${id}/media`);
         if (!mediaRes.ok) throw new Error('Failed to fetch media');
         const mediaJson = await mediaRes.json();
         console.log('Media response:', mediaJson);
@@ -19,6 +19,7 @@ import {
 import FolderIcon from '@mui/icons-material/Folder';
 import ArrowForwardIcon from '@mui/icons-material/ArrowForward';
 import { useNavigate } from 'react-router-dom';
+import { apiFetch } from '../api';
 
 const CollectionsList = () => {
   const navigate = useNavigate();
@@ -33,7 +34,7 @@ const CollectionsList = () => {
       setError(null);
       try {
         const userId = localStorage.getItem('user_id');
-        const res = await fetch(`/api/collections?user_id=${userId}`);
+        const res = await apiFetch(`/api/collections?user_id=${userId}`);
         const json = await res.json();
         setCollections(Array.isArray(json.collections) ? json.collections : []);
       } catch (err) {
@@ -10,6 +10,7 @@ import {
   Divider,
   CircularProgress,
 } from '@mui/material';
+import { apiFetch } from '../api';
 
 const EditCollection = () => {
   const { id } = useParams();
@@ -25,7 +26,7 @@ const EditCollection = () => {
       setLoading(true);
       setError(null);
       try {
-        const res = await fetch(`/api/collections/${id}`);
+        const res = await apiFetch(`/api/collections/${id}`);
         const data = await res.json();
         if (data.success && data.collection) {
           setName(data.collection.name || '');
@@ -47,7 +48,7 @@ const EditCollection = () => {
     setSaving(true);
     setError(null);
     try {
-      const res = await fetch(`/api/collection/${id}`, {
+      const res = await apiFetch(`/api/collection/${id}`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ name, description }),
@@ -4,6 +4,7 @@ import {
   Typography, Box, Divider, Chip, Avatar, Stack, CircularProgress, Paper,
   TextField, Button, MenuItem, Select, InputLabel, FormControl, OutlinedInput, Checkbox, ListItemText
 } from '@mui/material';
+import { apiFetch } from '../api';
 
 const EditMedia = () => {
   const { id } = useParams();
@@ -22,26 +23,22 @@ const EditMedia = () => {
       setLoading(true);
       setError(null);
       try {
-        // Fetch media details
-        const mediaRes = await fetch(`/api/media/${id}`);
+        // Fetch media details with embedded metadata (one request)
+        const mediaRes = await apiFetch(`/api/media/${id}?include=metadata`);
         if (!mediaRes.ok) throw new Error('Media not found');
         const mediaData = await mediaRes.json();
         setMedia(mediaData.media);
-
-        // Fetch metadata
-        const metaRes = await fetch(`/api/media/${id}/metadata`);
-        const metaJson = await metaRes.json();
-        setMetadata(metaJson.metadata || []);
+        setMetadata(mediaData.media.metadata || []);
 
         // Fetch collections containing this media
-        const collRes = await fetch(`/api/collection-media/${id}`);
+        const collRes = await apiFetch(`/api/collection-media/${id}`);
         const collJson = await collRes.json();
         setCollections(collJson.collections ? collJson.collections.map(c => c.id) : []);
 
         // Fetch all available collections
         const userId = localStorage.getItem('user_id');
         //const userId = 3; // TODO: Replace with actual logged-in user ID
-        const allCollRes = await fetch(`/api/collections?user_id=${userId}`);
+        const allCollRes = await apiFetch(`/api/collections?user_id=${userId}`);
         const allCollJson = await allCollRes.json();
         setAvailableCollections(Array.isArray(allCollJson.collections) ? allCollJson.collections : []);
       } catch (err) {
@@ -80,7 +77,7 @@ const EditMedia = () => {
     try {
       const userId = localStorage.getItem('user_id');
       // PATCH media fields and metadata
-      const mediaRes = await fetch(`/api/media/${id}`, {
+      const mediaRes = await apiFetch(`/api/media/${id}`, {
         method: 'PATCH',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -92,7 +89,7 @@ const EditMedia = () => {
       if (!mediaRes.ok) throw new Error('Failed to save media');
 
       // Update collection links via collection-service
-      const collRes = await fetch(`/api/collection-media`, {
+      const collRes = await apiFetch(`/api/collection-media`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Typography, TextField, Button, Box, Alert, Link as MuiLink, Divider, Stack } from '@mui/material';
 import { useNavigate, Link } from 'react-router-dom';
 
@@ -8,6 +8,13 @@ const Login = () => {
   const [error, setError] = useState('');
   const navigate = useNavigate();
 
+  // Reaching the login page (Log Out, or an expired token) ends the session
+  useEffect(() => {
+    localStorage.removeItem('access_token');
+    localStorage.removeItem('user_id');
+    localStorage.removeItem('username');
+  }, []);
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setError('');
@@ -19,11 +26,14 @@ const Login = () => {
       });
       if (response.ok) {
         const data = await response.json();
+        if (data && data.access_token) {
+          // Signed access token, verified locally by media/collection services
+          localStorage.setItem('access_token', data.access_token);
+        }
         if (data && data.user_id && username) {
+          // Must match the token's user, or the services answer 403
           localStorage.setItem('username', username);
-          if (!localStorage.getItem('user_id')) {
-            localStorage.setItem('user_id', data.user_id);
-          }
+          localStorage.setItem('user_id', data.user_id);
         }
         navigate('/home'); // Redirect to Home page after login
       } else {
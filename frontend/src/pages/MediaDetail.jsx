@@ -3,6 +3,7 @@ import { Typography, Box, Divider, Chip, Avatar, Stack, CircularProgress, Paper,
 import NavigationBar from '../components/NavigationBar';
 import { useParams } from 'react-router-dom';
 import SettingsIcon from '@mui/icons-material/Settings';
+import { apiFetch } from '../api';
 
 const MediaDetail = () => {
   const { id } = useParams();
@@ -17,19 +18,15 @@ const MediaDetail = () => {
       setLoading(true);
       setError(null);
       try {
-        // Fetch media details
-        const mediaRes = await fetch(`/api/media/${id}`);
+        // Fetch media details with embedded metadata (one request)
+        const mediaRes = await apiFetch(`/api/media/${id}?include=metadata`);
         if (!mediaRes.ok) throw new Error('Media not found');
         const mediaData = await mediaRes.json();
         setMedia(mediaData.media);
-
-        // Fetch metadata
-        const metaRes = await fetch(`/api/media/${id}/metadata`);
-        const metaJson = await metaRes.json();
-        setMetadata(metaJson.metadata || []);
+        setMetadata(mediaData.media.metadata || []);
 
         // Fetch collections containing this media
-        const collRes = await fetch(`/api/collection-media/${id}`);
+        const collRes = await apiFetch(`/api/collection-media/${id}`);
         const collJson = await collRes.json();
         setCollections(collJson.collections || []);
       } catch (err) {
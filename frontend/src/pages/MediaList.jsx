@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useRef, useState } from 'react';
 import {
   Typography,
   Box,
@@ -22,65 +22,99 @@ import CollectionsBookmarkIcon from '@mui/icons-material/CollectionsBookmark';
 import AddBoxIcon from '@mui/icons-material/AddBox';
 import NavigationBar from '../components/NavigationBar';
 import { useNavigate } from 'react-router-dom';
+import { apiFetch } from '../api';
+
+// Items fetched per "Load more" (GET /api/media allows up to 500)
+const PAGE_SIZE = 100;
 
 const MediaList = () => {
   const [media, setMedia] = useState([]);
   const [collections, setCollections] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState('');
   const [sortBy, setSortBy] = useState('title');
   const [sortDir, setSortDir] = useState('asc');
-  const username = localStorage.getItem('username');
+  // Bumped on every sort change so a late "Load more" page is not appended to the new order
+  const listVersion = useRef(0);
+  const userId = localStorage.getItem('user_id');
   const navigate = useNavigate();
 
-  useEffect(() => {
-    const userId = localStorage.getItem('user_id');
-    
-    // Fetch media data
-    fetch(`/api/media?user_id=${userId}`)
-      .then(res => res.json())
-      .then(data => {
-        let mediaItems = [];
-        if (Array.isArray(data)) {
-          mediaItems = data;
-        } else if (Array.isArray(data.media)) {
-          mediaItems = data.media;
-        } else {
-          mediaItems = [];
-        }
-        setMedia(mediaItems);
-        
-        // Fetch collections for each media item
-        const collectionsMap = {};
-        const promises = mediaItems.map(item => 
-          fetch(`/api/collection-media/${item.id}`)
-            .then(res => res.json())
-            .then(data => {
-              if (data.success && Array.isArray(data.collections)) {
-                collectionsMap[item.id] = data.collections;
-              } else {
-                collectionsMap[item.id] = [];
-              }
-            })
-            .catch(() => {
-              collectionsMap[item.id] = [];
-            })
-        );
-        
-        Promise.all(promises).then(() => {
-          setCollections(collectionsMap);
-          setLoading(false);
+  // Fetch one page, sorted by the server, plus the collections of just those items
+  const fetchPage = useCallback(async (after) => {
+    const params = new URLSearchParams({ user_id: userId, sort: sortBy, order: sortDir, limit: PAGE_SIZE });
+    if (after) {
+      params.set('after', after);
+    }
+    const res = await apiFetch(`/api/media?${params}`);
+    const data = await res.json();
+    const items = Array.isArray(data.media) ? data.media : [];
+
+    const pageCollections = {};
+    items.forEach(item => { pageCollections[item.id] = []; });
+    if (items.length > 0) {
+      try {
+        const ids = items.map(item => item.id).join(',');
+        const colRes = await apiFetch(`/api/collection-media?user_id=${userId}&media_ids=${ids}`);
+        const colData = await colRes.json();
+        items.forEach(item => {
+          const cols = colData.success && colData.collections ? colData.collections[item.id] : null;
+          if (Array.isArray(cols)) {
+            pageCollections[item.id] = cols;
+          }
         });
+      } catch (err) {
+        // Collections are only badges; show the page's items as Draft
+      }
+    }
+    return { items, pageCollections, next: data.next_cursor || null };
+  }, [userId, sortBy, sortDir]);
+
+  // First page, and again from the top whenever the sort changes
+  useEffect(() => {
+    const version = ++listVersion.current;
+    setLoading(true);
+    fetchPage(null)
+      .then(({ items, pageCollections, next }) => {
+        if (version !== listVersion.current) return;
+        setMedia(items);
+        setCollections(pageCollections);
+        setNextCursor(next);
       })
-      .catch(() => setLoading(false));
-  }, []);
+      .catch(() => {})
+      .finally(() => {
+        if (version === listVersion.current) setLoading(false);
+      });
+  }, [fetchPage]);
+
+  const handleLoadMore = async () => {
+    const version = listVersion.current;
+    setLoadingMore(true);
+    try {
+      const { items, pageCollections, next } = await fetchPage(nextCursor);
+      if (version !== listVersion.current) return;
+      setMedia(prev => prev.concat(items));
+      setCollections(prev => ({ ...prev, ...pageCollections }));
+      setNextCursor(next);
+    } catch (err) {
+      // Keep the cursor so the button can be pressed again
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const handleSort = (column) => {
+    setSortDir(sortBy === column && sortDir === 'asc' ? 'desc' : 'asc');
+    setSortBy(column);
+  };
 
   const handleDelete = async (id) => {
-    await fetch(`${API_URL}/${id}`, { method: 'DELETE' });
+    await apiFetch(`/api/media/${id}`, { method: 'DELETE' });
     setMedia(media.filter(item => item.id !== id));
   };
 
-  // Filter and sort logic
+  // Filter the loaded items (order comes from the server)
   const filteredMedia = media.filter(item => {
     const f = filter.trim().toLowerCase();
     const itemCollections = collections[item.id] || [];
@@ -95,35 +129,8 @@ const MediaList = () => {
       collectionText.includes(f)
     );
   });
-  
-  const sortedMedia = [...filteredMedia].sort((a, b) => {
-    if (sortBy === 'collections') {
-      // Special sorting for collections column
-      const aCollections = collections[a.id] || [];
-      const bCollections = collections[b.id] || [];
-      const aText = aCollections.length > 0 
-        ? aCollections.map(col => col.name).join(', ').toLowerCase()
-        : 'draft';
-      const bText = bCollections.length > 0 
-        ? bCollections.map(col => col.name).join(', ').toLowerCase()
-        : 'draft';
-      
-      if (aText < bText) return sortDir === 'asc' ? -1 : 1;
-      if (aText > bText) return sortDir === 'asc' ? 1 : -1;
-      return 0;
-    } else {
-      // Regular sorting for other columns
-      let valA = a[sortBy] || '';
-      let valB = b[sortBy] || '';
-      valA = typeof valA === 'string' ? valA.toLowerCase() : valA;
-      valB = typeof valB === 'string' ? valB.toLowerCase() : valB;
-      if (valA < valB) return sortDir === 'asc' ? -1 : 1;
-      if (valA > valB) return sortDir === 'asc' ? 1 : -1;
-      return 0;
-    }
-  });
 
-  if (loading) {
+  if (loading && media.length === 0) {
     return <Typography variant="h6">Loading media...</Typography>;
   }
 
@@ -186,35 +193,20 @@ const MediaList = () => {
             <Table stickyHeader>
               <TableHead>
                 <TableRow>
-                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => {
-                    setSortBy('title');
-                    setSortDir(sortBy === 'title' && sortDir === 'asc' ? 'desc' : 'asc');
-                  }}>
+                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => handleSort('title')}>
                     Title {sortBy === 'title' ? (sortDir === 'asc' ? '▲' : '▼') : ''}
                   </TableCell>
-                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => {
-                    setSortBy('creator');
-                    setSortDir(sortBy === 'creator' && sortDir === 'asc' ? 'desc' : 'asc');
-                  }}>
-                    Author/Creator {sortBy === 'creator' ? (sortDir === 'asc' ? '▲' : '▼') : ''}
-                  </TableCell>
-                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => {
-                    setSortBy('type');
-                    setSortDir(sortBy === 'type' && sortDir === 'asc' ? 'desc' : 'asc');
-                  }}>
-                    Type {sortBy === 'type' ? (sortDir === 'asc' ? '▲' : '▼') : ''}
-                  </TableCell>
-                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => {
-                    setSortBy('collections');
-                    setSortDir(sortBy === 'collections' && sortDir === 'asc' ? 'desc' : 'asc');
-                  }}>
-                    Collections {sortBy === 'collections' ? (sortDir === 'asc' ? '▲' : '▼') : ''}
+                  <TableCell sx={{ fontWeight: 700 }}>Author/Creator</TableCell>
+                  <TableCell sx={{ fontWeight: 700, cursor: 'pointer' }} onClick={() => handleSort('year')}>
+                    Year {sortBy === 'year' ? (sortDir === 'asc' ? '▲' : '▼') : ''}
                   </TableCell>
+                  <TableCell sx={{ fontWeight: 700 }}>Type</TableCell>
+                  <TableCell sx={{ fontWeight: 700 }}>Collections</TableCell>
                   <TableCell sx={{ fontWeight: 700 }} align="center">Delete</TableCell>
                 </TableRow>
               </TableHead>
               <TableBody>
-                {sortedMedia.map((item) => (
+                {filteredMedia.map((item) => (
                   <TableRow key={item.id} hover sx={{ height: 32 }}>
                     <TableCell sx={{ py: 0.5 }}>
                       <span
@@ -225,6 +217,7 @@ const MediaList = () => {
                       </span>
                     </TableCell>
                     <TableCell sx={{ py: 0.5 }}>{item.creator}</TableCell>
+                    <TableCell sx={{ py: 0.5 }}>{item.year}</TableCell>
                     <TableCell sx={{ py: 0.5 }}>{item.type}</TableCell>
                     <TableCell sx={{ py: 0.5 }}>
                       {collections[item.id] && collections[item.id].length > 0 
@@ -242,6 +235,13 @@ const MediaList = () => {
               </TableBody>
             </Table>
           </TableContainer>
+          {nextCursor && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', mb: '20pt' }}>
+              <Button variant="contained" onClick={handleLoadMore} disabled={loadingMore}>
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </Button>
+            </Box>
+          )}
         </Box>
       </Box>
     </Box>
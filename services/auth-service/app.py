@@ -15,9 +15,15 @@ Purpose:
 Major Functions:
   - create_app: Application factory function
     - Loads config from config.py
+    - Installs the fast JSON response encoder
     - Initializes database and migration extensions
+    - Applies the database engine profile (pool, timeouts, SQLite pragmas)
+    - Records request metrics and serves them on /metrics
     - Enables CORS for API access
-    - Registers routes and models
+    - Loads the access token signing key
+    - Verifies access and service tokens on incoming requests (own keys, in-process)
+    - Configures the password hashing pool
+    - Registers routes, models and CLI commands
 
 Security:
   - Uses environment variables for secrets and DB config
@@ -47,6 +53,8 @@ def create_app():
     Application factory function for the Auth Service.
     - Loads configuration from config.py
     - Initializes database and migration extensions
+    - Applies the database engine profile (pool, timeouts, SQLite pragmas)
+    - Records request metrics and serves them on /metrics
     - Enables CORS for API access from frontend
     - Registers routes and models
     Returns:
@@ -54,12 +62,28 @@ def create_app():
     """
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])  # Log level from config (LOG_LEVEL)
+    from sortedshelf_common import json_provider  # Encode JSON responses with orjson when installed
+    json_provider.init_app(app)
+    from sortedshelf_common import engine_profiles  # Engine pool, timeouts and SQLite pragmas from DB_PROFILE
+    engine_profiles.apply_profile(app)
     db.init_app(app)
+    engine_profiles.init_app(app, db)
+    from sortedshelf_common.metrics import metrics  # Request metrics on /metrics (hooks run first)
+    metrics.init_app(app, db)
     migrate.init_app(app, db)
     CORS(app)  # Enable CORS for the app
+    import tokens  # Load the access token signing key
+    tokens.init_app(app)
+    from sortedshelf_common.auth_tokens import token_verifier  # Verify tokens with this service's own keys
+    token_verifier.init_app(app, local_keys=tokens.jwks)
+    from passwords import password_hasher  # bcrypt worker pool and cost factor
+    password_hasher.init_app(app)
     from routes import bp as routes_bp  # Register API routes
     app.register_blueprint(routes_bp)
     import models  # ensures User model is registered with SQLAlchemy
+    import commands  # Register maintenance CLI commands (flask <command>)
+    commands.init_app(app)
     return app
 
 # Allow running the service directly for development
@@ -0,0 +1,78 @@
+"""
+====================================================================================
+commands.py - Maintenance CLI Commands for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Provides operational commands run through the Flask CLI
+  - Keeps one-off maintenance jobs out of the request path
+
+Major Commands:
+  - flask bench-login: Measure password verification throughput (logins/sec/core)
+  - flask check-query-plans: Fail if a hot query stops using its index
+
+Usage:
+  - set FLASK_APP=app.py
+  - flask bench-login --logins 200 --concurrency 16
+  - flask check-query-plans
+
+====================================================================================
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+def init_app(app):
+    """
+    Register maintenance commands on the Flask app.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+
+    @app.cli.command('bench-login')
+    @click.option('--logins', default=200, show_default=True, help='Password verifications to run')
+    @click.option('--concurrency', default=16, show_default=True, help='Simultaneous login requests')
+    def bench_login(logins, concurrency):
+        """Time bcrypt login checks through the password pool at BCRYPT_ROUNDS."""
+        from passwords import PasswordPoolBusy, password_hasher
+
+        password = 'benchmark-password'
+        password_hash = password_hasher.hash(password)
+        password_hasher.verify(password, password_hash)  # warm up the workers
+
+        def login(_):
+            # Retry like a client honouring Retry-After would
+            while True:
+                try:
+                    return password_hasher.verify(password, password_hash)[0]
+                except PasswordPoolBusy:
+                    time.sleep(0.01)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            ok = sum(executor.map(login, range(logins)))
+        elapsed = time.perf_counter() - started
+
+        cores = min(password_hasher.workers or 1, os.cpu_count() or 1)
+        rate = logins / elapsed
+        click.echo(
+            f'{ok}/{logins} logins in {elapsed:.2f}s at cost {password_hasher.rounds}: '
+            f'{rate:.1f} logins/sec, {rate / cores:.1f} logins/sec/core '
+            f'({cores} core(s), {password_hasher.workers} worker(s))'
+        )
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Run EXPLAIN QUERY PLAN for every route query; exit 1 on a table scan."""
+        from query_plans import check_query_plans
+        failures = check_query_plans(echo=click.echo)
+        if failures:
+            raise click.ClickException(f'{len(failures)} query plan(s) regressed: {", ".join(failures)}')
+        click.echo('All query plans use indexes')
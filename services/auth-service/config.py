@@ -16,6 +16,12 @@ Major Components:
     - SECRET_KEY: Secret key for session and security
     - SQLALCHEMY_DATABASE_URI: Database connection URI
     - SQLALCHEMY_TRACK_MODIFICATIONS: Disable event system for performance
+    - DB_PROFILE / DB_* / SQLITE_*: Database engine profile (pool, timeouts, SQLite pragmas)
+    - METRICS_ENABLED: Prometheus-format request metrics on /metrics
+    - LOG_LEVEL: Level of the app logger (startup and request logs)
+    - TOKEN_*: Access token signing key, lifetime and issuer
+    - BCRYPT_ROUNDS / PASSWORD_*: Password hashing cost and worker pool limits
+    - AUTH_TOKEN_ISSUER / INTERNAL_API_*: Token checks on this service's own endpoints
 
 Security:
   - Secrets and DB credentials loaded from environment, not hardcoded
@@ -41,11 +47,77 @@ class Config:
         SECRET_KEY (str): Secret key for session and security
         SQLALCHEMY_DATABASE_URI (str): Database connection URI
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Disable SQLAlchemy event system for performance
+        DB_PROFILE (str): Engine profile, 'dev-sqlite' or 'prod-mysql' (default: from the URI scheme)
+        DB_POOL_SIZE (int): Connections kept open per worker process (prod-mysql)
+        DB_MAX_OVERFLOW (int): Extra connections allowed under load (prod-mysql)
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection (prod-mysql)
+        DB_POOL_RECYCLE (int): Seconds before a connection is replaced, below MySQL's wait_timeout
+        DB_CONNECT_TIMEOUT (int): Seconds to establish a connection (prod-mysql)
+        DB_READ_TIMEOUT (int): Socket read/write timeout in seconds (prod-mysql)
+        DB_STATEMENT_TIMEOUT_MS (int): Server-side SELECT timeout, max_execution_time (prod-mysql)
+        SQLITE_BUSY_TIMEOUT_MS (int): Milliseconds to wait on a locked database (dev-sqlite)
+        SQLITE_MMAP_SIZE (int): Bytes of the database file memory-mapped for reads (dev-sqlite)
+        METRICS_ENABLED (bool): Record request metrics and serve them on /metrics
+        LOG_LEVEL (str): Level of app.logger, e.g. INFO or WARNING
+        TOKEN_SIGNING_KEY (str): Ed25519 private key (PEM) used to sign access tokens
+        TOKEN_SIGNING_KEY_FILE (str): Path to the PEM file, if TOKEN_SIGNING_KEY is unset
+        TOKEN_PREVIOUS_PUBLIC_KEYS (str): Retired public keys (PEM) still published for verification
+        TOKEN_TTL (int): Access token lifetime in seconds
+        TOKEN_ISSUER (str): 'iss' claim of issued tokens
+        TOKEN_KEYS_MAX_AGE (int): Cache-Control max-age of GET /api/auth/keys (seconds)
+        BCRYPT_ROUNDS (int): bcrypt cost factor for new and upgraded password hashes
+        PASSWORD_WORKERS (int): Password hashing worker processes (0 = request thread)
+        PASSWORD_MAX_PENDING (int): Password jobs in flight before answering 503
+        PASSWORD_TIMEOUT (float): Seconds a request waits for its password job
+        AUTH_TOKEN_ISSUER (str): Issuer checked when verifying access tokens here (= TOKEN_ISSUER)
+        INTERNAL_API_TOKEN (str): Service token required by POST /api/users/batch
+        INTERNAL_API_DEV_OPEN (bool): Accept service token endpoints without a token while
+            INTERNAL_API_TOKEN is unset (development only)
     """
 
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///auth.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Database engine profile: pool, timeouts and SQLite pragmas (see sortedshelf_common/engine_profiles.py)
+    DB_PROFILE = os.getenv('DB_PROFILE') or ('dev-sqlite' if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else 'prod-mysql')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 280))
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    DB_READ_TIMEOUT = int(os.getenv('DB_READ_TIMEOUT', 60))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # Request metrics served on /metrics (see sortedshelf_common/metrics.py)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+    # App logger level (INFO shows the database profile line at startup)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
     # Port configuration for auth service
     PORT = int(os.getenv('PORT', 5001))
+
+    # Access token signing (see tokens.py); generate a key with:
+    #   openssl genpkey -algorithm ed25519 -out token_signing_key.pem
+    TOKEN_SIGNING_KEY = os.getenv('TOKEN_SIGNING_KEY')
+    TOKEN_SIGNING_KEY_FILE = os.getenv('TOKEN_SIGNING_KEY_FILE')
+    TOKEN_PREVIOUS_PUBLIC_KEYS = os.getenv('TOKEN_PREVIOUS_PUBLIC_KEYS', '')
+    TOKEN_TTL = int(os.getenv('TOKEN_TTL', 900))
+    TOKEN_ISSUER = os.getenv('TOKEN_ISSUER', 'sortedshelf-auth')
+    TOKEN_KEYS_MAX_AGE = int(os.getenv('TOKEN_KEYS_MAX_AGE', 300))
+
+    # Password hashing (see passwords.py); raising BCRYPT_ROUNDS upgrades
+    # existing hashes the next time each user logs in
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_WORKERS = int(os.getenv('PASSWORD_WORKERS', os.cpu_count() or 1))
+    PASSWORD_MAX_PENDING = int(os.getenv('PASSWORD_MAX_PENDING', 0)) or None
+    PASSWORD_TIMEOUT = float(os.getenv('PASSWORD_TIMEOUT', 5.0))
+
+    # Access token and service token checks on this service's own endpoints
+    # (see sortedshelf_common/auth_tokens.py; keys come from tokens.py in-process)
+    AUTH_TOKEN_ISSUER = TOKEN_ISSUER
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+    INTERNAL_API_DEV_OPEN = os.getenv('INTERNAL_API_DEV_OPEN', 'false').lower() in ('1', 'true', 'yes')
@@ -16,10 +16,10 @@ Major Components:
     - username: Unique username
     - password_hash: Hashed password
     - set_password: Hash and set password
-    - check_password: Verify password
+    - check_password: Verify password (upgrading an outdated hash)
 
 Security:
-  - Uses bcrypt for secure password hashing
+  - Uses bcrypt for secure password hashing (on the worker pool in passwords.py)
   - No plaintext passwords stored
 
 Usage:
@@ -29,9 +29,9 @@ Usage:
 """
 """ from app import db"""
 from flask_sqlalchemy import SQLAlchemy
-from passlib.hash import bcrypt
 
 from app import db  # Use relative import if app.py defines db
+from passwords import password_hasher
 # If db is initialized in app.py and imported here, this ensures correct context
 # If not, fallback to initializing db here:
 # db = SQLAlchemy()
@@ -58,25 +58,37 @@ class User(db.Model):
         Parameters:
             password (str): Plain text password to hash and store
         
+        Raises:
+            PasswordPoolBusy: If the hashing pool is saturated
+        
         Usage:
             user = User(username="john")
             user.set_password("secret123")
         """
-        self.password_hash = bcrypt.hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
         """
         Verify if provided password matches stored hash.
         
+        If the stored hash uses an outdated bcrypt cost, it is replaced
+        with one at BCRYPT_ROUNDS (the caller commits the session).
+        
         Parameters:
             password (str): Plain text password to verify
         
         Returns:
             bool: True if password matches, False otherwise
         
+        Raises:
+            PasswordPoolBusy: If the hashing pool is saturated
+        
         Usage:
             if user.check_password("secret123"):
                 # Password is correct
                 pass
         """
-        return bcrypt.verify(password, self.password_hash)
+        ok, new_hash = password_hasher.verify(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return ok
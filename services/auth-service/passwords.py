@@ -0,0 +1,238 @@
+"""
+====================================================================================
+passwords.py - Bounded Password Hashing Pool for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Runs bcrypt hashing and verification on a pool of worker processes, so a
+    burst of logins cannot pin every request thread (or the GIL) for
+    hundreds of milliseconds and starve cheap endpoints like GET /api/users
+  - Bounds the work queued on the pool; when it is full, callers fail fast
+    with PasswordPoolBusy (routes answer 503 + Retry-After) instead of queueing
+  - Takes the bcrypt cost factor from config and upgrades outdated hashes
+    on successful login
+
+Major Components:
+  - PasswordHasher class: Bounded process pool for bcrypt
+    - init_app: Reads BCRYPT_ROUNDS and PASSWORD_* limits from app config
+    - hash: Hash a new password
+    - hash_many: Hash a batch of passwords across all workers (bulk provisioning),
+      one job per worker at a time so interactive jobs are not stuck behind it
+    - verify: Check a password, returning a rehashed value if the cost changed
+  - password_hasher: Shared instance registered by create_app()
+  - PasswordPoolBusy: Raised when the queue limit is reached or a job times out
+
+Configuration (config.py):
+  - BCRYPT_ROUNDS: bcrypt cost factor (log2 of the work)
+  - PASSWORD_WORKERS: Worker processes (0 = hash on the request thread)
+  - PASSWORD_MAX_PENDING: Hash/verify jobs allowed in flight per worker process
+  - PASSWORD_TIMEOUT: Seconds a request waits for its job before giving up
+
+Security:
+  - Plain-text passwords only travel to the local worker processes
+  - Rehash-on-login moves every active account to the configured cost
+
+Usage:
+  - password_hash = password_hasher.hash('secret')
+  - ok, new_hash = password_hasher.verify('secret', user.password_hash)
+  - Workers are spawned, so they re-import the main module: scripts that create
+    the app must keep an "if __name__ == '__main__':" guard (app.py already does)
+
+====================================================================================
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from itertools import islice
+
+from passlib.hash import bcrypt
+
+class PasswordPoolBusy(Exception):
+    """The password pool is saturated (or too slow); retry later."""
+
+def _hash_password(password, rounds):
+    """Worker: hash a password at the given cost."""
+    return bcrypt.using(rounds=rounds).hash(password)
+
+def _verify_password(password, password_hash, rounds):
+    """
+    Worker: verify a password and rehash it if its cost is outdated.
+
+    Returns:
+        tuple: (ok, new_hash) where new_hash is None unless a rehash happened
+    """
+    hasher = bcrypt.using(rounds=rounds)
+    if not hasher.verify(password, password_hash):
+        return False, None
+    if hasher.needs_update(password_hash):
+        return True, hasher.hash(password)
+    return True, None
+
+class PasswordHasher:
+    """
+    Bounded process pool for bcrypt hashing and verification.
+
+    The pool is created lazily and per process (and in 'spawn' mode, so
+    workers never inherit a forked copy of the server's threads).
+
+    Attributes:
+        rounds (int): bcrypt cost factor for new hashes
+        workers (int): Worker processes (0 = run on the calling thread)
+        max_pending (int): Jobs allowed in flight before PasswordPoolBusy
+        timeout (float): Seconds to wait for a job
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self.workers = os.cpu_count() or 1
+        self.max_pending = self.workers * 4
+        self.timeout = 5.0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def init_app(self, app):
+        """
+        Load pool settings from the Flask app config.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+        """
+        self.rounds = app.config.get('BCRYPT_ROUNDS', self.rounds)
+        self.workers = app.config.get('PASSWORD_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_MAX_PENDING') or max(self.workers, 1) * 4
+        self.timeout = app.config.get('PASSWORD_TIMEOUT', self.timeout)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self):
+        """Return the process pool for the current process."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def _run(self, fn, *args):
+        """
+        Run a bcrypt job on the pool, failing fast when it is saturated.
+
+        Raises:
+            PasswordPoolBusy: If max_pending jobs are already in flight or
+            the job does not finish within the timeout
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy('Password hashing queue is full')
+        if self.workers == 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the worker is done, even if we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordPoolBusy('Password hashing timed out')
+
+    def hash(self, password):
+        """
+        Hash a password at the configured cost.
+
+        Parameters:
+            password (str): Plain-text password
+
+        Returns:
+            str: bcrypt hash
+        """
+        return self._run(_hash_password, password, self.rounds)
+
+    def hash_many(self, passwords):
+        """
+        Hash a batch of passwords in parallel across every worker.
+
+        The pool's queue is FIFO, so the batch never has more than one job
+        per worker submitted at a time: a new job goes in only when one
+        finishes. A login or registration arriving mid-batch is queued
+        behind at most one bcrypt job per worker instead of behind the whole
+        batch, and keeps its normal PASSWORD_TIMEOUT. The batch itself holds
+        a single queue slot and gets PASSWORD_TIMEOUT per round of one job
+        per worker as its overall deadline.
+
+        Parameters:
+            passwords (list[str]): Plain-text passwords
+
+        Returns:
+            list[str]: bcrypt hashes, in input order
+
+        Raises:
+            PasswordPoolBusy: If the queue is already full or the batch
+            misses its deadline
+        """
+        if not passwords:
+            return []
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy('Password hashing queue is full')
+        try:
+            if self.workers == 0:
+                return [_hash_password(password, self.rounds) for password in passwords]
+            executor = self._get_executor()
+            deadline = time.monotonic() + self.timeout * math.ceil(len(passwords) / self.workers)
+            hashes = [None] * len(passwords)
+            todo = iter(enumerate(passwords))
+            in_flight = {}
+            try:
+                for i, password in islice(todo, self.workers):
+                    in_flight[executor.submit(_hash_password, password, self.rounds)] = i
+                while in_flight:
+                    remaining = deadline - time.monotonic()
+                    done, _ = wait(in_flight, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+                    if not done:
+                        raise PasswordPoolBusy('Password hashing timed out')
+                    for future in done:
+                        hashes[in_flight.pop(future)] = future.result()
+                    for i, password in islice(todo, len(done)):
+                        in_flight[executor.submit(_hash_password, password, self.rounds)] = i
+            finally:
+                for future in in_flight:
+                    future.cancel()
+            return hashes
+        finally:
+            self._slots.release()
+
+    def verify(self, password, password_hash):
+        """
+        Check a password against a stored hash.
+
+        Parameters:
+            password (str): Plain-text password
+            password_hash (str): Stored bcrypt hash
+
+        Returns:
+            tuple: (ok, new_hash)
+                ok (bool): Whether the password matches
+                new_hash (str or None): Replacement hash at the configured
+                cost when the stored one is outdated; store it
+        """
+        return self._run(_verify_password, password, password_hash, self.rounds)
+
+# Shared hasher instance, configured by create_app()
+password_hasher = PasswordHasher()
@@ -0,0 +1,120 @@
+"""
+====================================================================================
+query_plans.py - Query Plan Regression Checks for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Guards the user table's indexes against regressions
+  - Runs EXPLAIN QUERY PLAN for the queries behind every user route on SQLite
+  - Fails if a hot query falls back to a full table scan or a sort of all rows
+
+Major Functions:
+  - hot_queries: The statements issued by routes.py, with representative parameters
+  - explain: EXPLAIN QUERY PLAN for one statement on a SQLite connection
+  - regressions: The plan steps that scan a whole table or sort every row
+  - check_query_plans: Builds the schema in memory and explains every hot query
+
+Usage:
+  - flask check-query-plans   (exits non-zero if any plan regresses)
+  - Add a statement to hot_queries() whenever a route gains a new query
+  - tests/test_query_plans.py runs the same checks against the migrated schema
+
+====================================================================================
+"""
+
+import re
+
+from sqlalchemy import create_engine, select
+
+from app import db
+from models import User
+
+# Plan details that mean a query reads every row of a table
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (COVERING )?INDEX)')
+_SORTS_ALL_ROWS = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)')
+
+# Queries whose SCAN walks the primary key in ORDER BY order and stops at LIMIT
+_LIMITED_KEY_SCANS = {'GET /api/users'}
+
+def hot_queries():
+    """
+    Return the queries issued by the user routes.
+
+    Returns:
+        list[tuple[str, Executable]]: (description, statement) pairs
+    """
+    page = 101
+    users = select(User.id, User.username)
+    return [
+        ('POST /api/auth/login', select(User).where(User.username == 'john')),
+        ('GET /api/users', users.order_by(User.id).limit(page)),
+        ('GET /api/users?after=', users.where(User.id > 100).order_by(User.id).limit(page)),
+        ('GET /api/users?q=',
+         users.where(User.username >= 'jo', User.username < 'jp').order_by(User.username).limit(page)),
+        ('GET /api/users?q=&after=',
+         users.where(User.username >= 'jo', User.username < 'jp', User.username > 'joe')
+         .order_by(User.username).limit(page)),
+        ('GET /api/users?ids=', select(User.id, User.username).where(User.id.in_([1, 2, 3]))),
+        ('POST /api/users/batch (existing names)',
+         select(User.username).where(User.username.in_(['ann', 'bob']))),
+    ]
+
+def explain(conn, stmt):
+    """
+    Run EXPLAIN QUERY PLAN for a statement on a SQLite connection.
+
+    Parameters:
+        conn (Connection): Open connection to a SQLite database with the schema
+        stmt (Executable): Statement from hot_queries()
+
+    Returns:
+        list[str]: The detail column of every plan row
+    """
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    positional = tuple(params[key] for key in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', positional)]
+
+def regressions(name, plan):
+    """
+    Return the plan steps that read every row of a table or sort every row.
+
+    Parameters:
+        name (str): Description of the query (from hot_queries())
+        plan (list[str]): Output of explain()
+
+    Returns:
+        list[str]: Offending steps (empty if the plan uses indexes)
+    """
+    return [
+        step for step in plan
+        if (_FULL_SCAN.search(step) and name not in _LIMITED_KEY_SCANS) or _SORTS_ALL_ROWS.search(step)
+    ]
+
+def check_query_plans(echo=print):
+    """
+    Explain every hot query against an in-memory SQLite copy of the schema.
+
+    Parameters:
+        echo (callable): Receives one report line per query
+
+    Returns:
+        list[str]: Descriptions of queries whose plan regressed (empty if all pass)
+    """
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    failures = []
+
+    with engine.connect() as conn:
+        for name, stmt in hot_queries():
+            plan = explain(conn, stmt)
+            bad = regressions(name, plan)
+            echo(f"{'FAIL' if bad else 'ok  '} {name}: {'; '.join(plan)}")
+            if bad:
+                failures.append(name)
+
+    engine.dispose()
+    return failures
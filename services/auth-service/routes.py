@@ -15,9 +15,19 @@ Major Endpoints:
   - /api/auth/register: Register new user
   - /api/auth/login: Authenticate user
   - /api/auth/logout: Placeholder for logout logic
+  - /api/auth/keys: Public keys for verifying access tokens (JWKS)
+  - /api/users: Keyset-paginated user listing, username prefix search
+    and batch id -> username resolution (?ids=)
+  - /api/users/batch: Bulk user provisioning with per-user results (service token only)
 
 Security:
-  - Passwords are hashed with bcrypt before storage
+  - Passwords are hashed with bcrypt before storage, on a bounded worker pool
+    (passwords.py); when it is saturated these endpoints answer 503 quickly
+  - Login issues a short-lived signed access token (see tokens.py) that the
+    other services verify locally with the keys from /api/auth/keys
+  - Bulk provisioning requires the service token (X-Internal-Token,
+    checked by sortedshelf_common/auth_tokens.py); listing, searching and
+    resolving users requires an access token or the service token
   - Input validation and error handling for all endpoints
 
 Usage:
@@ -27,13 +37,30 @@ Usage:
 ====================================================================================
 """
 
-from flask import Blueprint, request, jsonify
+import base64
+import json
+
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sortedshelf_common.auth_tokens import INTERNAL_TOKEN_HEADER, require_service_token, require_token
+from sortedshelf_common.json_provider import row_serializer
 from app import db
 from models import User
-from passlib.hash import bcrypt
+from passwords import PasswordPoolBusy, password_hasher
+from tokens import issue_token, jwks
 
 bp = Blueprint('routes', __name__)
 
+# Seconds clients are told to wait when the password pool is saturated
+PASSWORD_RETRY_AFTER = 1
+
+def _password_pool_busy():
+    """Build the 503 response returned when password hashing is saturated."""
+    response = jsonify({'success': False, 'error': 'Server busy, please retry'})
+    response.headers['Retry-After'] = str(PASSWORD_RETRY_AFTER)
+    return response, 503
+
 @bp.route('/api/auth/register', methods=['POST'])
 def register():
     """
@@ -51,6 +78,7 @@ def register():
         400: Missing required fields
         409: Username already exists
         500: Database error
+        503: Password hashing pool saturated (Retry-After header set)
     
     Usage:
         POST /api/auth/register
@@ -64,11 +92,14 @@ def register():
         return jsonify({'success': False, 'error': 'Username already exists'}), 409
     
     try:
-        hashed_pw = bcrypt.hash(data['password'])
-        user = User(username=data['username'], password_hash=hashed_pw)
+        user = User(username=data['username'])
+        user.set_password(data['password'])
         db.session.add(user)
         db.session.commit()
         return jsonify({'success': True, 'message': 'User registered', 'id': user.id}), 201
+    except PasswordPoolBusy:
+        db.session.rollback()
+        return _password_pool_busy()
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -78,17 +109,21 @@ def login():
     """
     Authenticate user credentials and return login result.
     
-    Verifies username and password against stored hash.
-    Returns user information on successful authentication.
+    Verifies username and password against stored hash. A hash made with
+    an outdated bcrypt cost is upgraded to BCRYPT_ROUNDS on success.
+    Returns user information and a signed access token on successful
+    authentication. Send the token as 'Authorization: Bearer <token>' to
+    media-service and collection-service.
     
     Request Body (JSON):
         username (str): Username to authenticate (required)
         password (str): Plain text password to verify (required)
     
     Returns:
-        200: Success with user_id
+        200: Success with user_id, access_token, token_type and expires_in (seconds)
         401: Invalid credentials
         400: Missing required fields (implicit from missing data)
+        503: Password hashing pool saturated (Retry-After header set)
     
     Usage:
         POST /api/auth/login
@@ -99,8 +134,28 @@ def login():
     password = data.get('password')
     
     user = User.query.filter_by(username=username).first()
-    if user and bcrypt.verify(password, user.password_hash):
-        return jsonify({'success': True, 'user_id': user.id, 'message': 'Login successful'}), 200
+    try:
+        authenticated = user is not None and user.check_password(password)
+    except PasswordPoolBusy:
+        return _password_pool_busy()
+    
+    if authenticated:
+        if db.session.is_modified(user):
+            # Hash was upgraded to the current cost factor
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning('Password rehash for user %s not saved: %s', user.id, e)
+        token, expires_in = issue_token(user)
+        return jsonify({
+            'success': True,
+            'user_id': user.id,
+            'access_token': token,
+            'token_type': 'Bearer',
+            'expires_in': expires_in,
+            'message': 'Login successful'
+        }), 200
     
     return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
 
@@ -120,29 +175,169 @@ def logout():
     """
     return jsonify({'success': True, 'message': 'Logout endpoint'}), 200
 
+@bp.route('/api/auth/keys', methods=['GET'])
+def get_keys():
+    """
+    Publish the public keys that verify access tokens (JSON Web Key Set).
+
+    Fetched and cached by the token verifiers in media-service and
+    collection-service; they only call back when they see an unknown key ID
+    or their cached copy expires, never once per request.
+
+    Returns:
+        200: JWKS document, cacheable for TOKEN_KEYS_MAX_AGE seconds
+
+    Usage:
+        GET /api/auth/keys
+        Returns: {"keys": [{"kty": "OKP", "crv": "Ed25519", "x": "...", "kid": "...", "alg": "EdDSA", "use": "sig"}]}
+    """
+    response = jsonify(jwks())
+    response.headers['Cache-Control'] = f"public, max-age={current_app.config['TOKEN_KEYS_MAX_AGE']}"
+    return response, 200
+
+# Page sizes for GET /api/users (keyset pagination)
+DEFAULT_USER_PAGE_SIZE = 100
+MAX_USER_PAGE_SIZE = 1000
+
+# Upper bound on IDs accepted by GET /api/users?ids=
+MAX_USER_IDS = 1000
+
+def _encode_user_cursor(value):
+    """Encode the last id (or username, when searching) of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+def _decode_user_cursor(cursor, expected_type):
+    """
+    Decode a cursor produced by _encode_user_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed or from the other listing mode
+    """
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(value, expected_type) or isinstance(value, bool):
+        raise ValueError('Invalid cursor')
+    return value
+
+def _prefix_upper_bound(prefix):
+    """
+    Smallest string greater than every string starting with prefix.
+    
+    username >= prefix AND username < bound is an index range scan on
+    every database, unlike LIKE 'prefix%' (which SQLite only optimises
+    for case-insensitive columns).
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _resolve_users(raw_ids):
+    """
+    Map many user IDs to usernames with one primary-key IN query.
+    
+    Parameters:
+        raw_ids (str): Comma-separated user IDs from the 'ids' query parameter
+    
+    Returns:
+        200: JSON with 'users' (id -> username) and 'missing' (unknown IDs)
+        400: Malformed or too many IDs
+    """
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw_ids.split(',') if part.strip()))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be a comma-separated list of integers'}), 400
+    if len(ids) > MAX_USER_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_USER_IDS} ids per request'}), 400
+    
+    found = {}
+    if ids:
+        found = dict(db.session.query(User.id, User.username).filter(User.id.in_(ids)))
+    return jsonify({
+        'success': True,
+        'users': {str(user_id): found[user_id] for user_id in ids if user_id in found},
+        'missing': [user_id for user_id in ids if user_id not in found]
+    }), 200
+
 @bp.route('/api/users', methods=['GET'])
 def get_users():
     """
-    Retrieve all registered users (admin/management endpoint).
+    List registered users one page at a time (admin/management endpoint).
     
     Returns basic user information (ID and username only).
     Excludes sensitive data like password hashes.
     
+    Pages are read with keyset pagination ("WHERE key > last key ORDER BY
+    key LIMIT n"): by id normally, or by username when searching by
+    prefix. Both walk an index, so every page costs the same no matter how
+    many accounts exist. With ?ids= the endpoint instead resolves many IDs
+    to usernames in one query (for pages that show usernames next to
+    user_id).
+    
+    Every mode needs a caller: a signed-in user's access token, or the
+    service token (X-Internal-Token) for service-to-service calls, so
+    anonymous clients cannot walk the user table or probe usernames.
+    
+    Query Parameters:
+        limit (int): Page size (optional, default 100, max 1000)
+        after (str): next_cursor from the previous page (optional)
+        q (str): Username prefix to search for (optional)
+        ids (str): Comma-separated user IDs to resolve (optional, max 1000;
+                   pagination parameters are ignored)
+    
     Returns:
-        200: JSON with 'users' array containing user objects
+        200: JSON with 'users' array and 'next_cursor' (null on the last page),
+             or with ids=: 'users' mapping id -> username and 'missing'
+        400: Invalid limit, cursor or ids
+        401: No access token (or a wrong service token)
     
     Usage:
-        GET /api/users
-        Returns: {"success": true, "users": [{"id": 1, "username": "john"}, ...]}
-    """
-    users = User.query.all()
-    result = [
-        {
-            'id': user.id,
-            'username': user.username
-        } for user in users
-    ]
-    return jsonify({'success': True, 'users': result}), 200
+        GET /api/users?limit=100
+        GET /api/users?limit=100&after=<next_cursor>
+        GET /api/users?q=jo
+        GET /api/users?ids=1,2,3
+        Returns: {"success": true, "users": [{"id": 1, "username": "john"}, ...], "next_cursor": "..."}
+    """
+    if request.headers.get(INTERNAL_TOKEN_HEADER):
+        denied = require_service_token()
+    else:
+        denied = require_token()
+    if denied:
+        return denied
+    
+    if 'ids' in request.args:
+        return _resolve_users(request.args['ids'])
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_USER_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_USER_PAGE_SIZE))
+    
+    prefix = request.args.get('q', '')
+    columns, serialize = row_serializer(User, ('id', 'username'))
+    query = db.session.query(*columns)
+    try:
+        if prefix:
+            # Prefix search: range scan on the unique username index
+            query = query.filter(User.username >= prefix, User.username < _prefix_upper_bound(prefix))
+            if request.args.get('after'):
+                query = query.filter(User.username > _decode_user_cursor(request.args['after'], str))
+            query = query.order_by(User.username)
+        else:
+            if request.args.get('after'):
+                query = query.filter(User.id > _decode_user_cursor(request.args['after'], int))
+            query = query.order_by(User.id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_user_cursor(rows[-1].username if prefix else rows[-1].id)
+    
+    result = [serialize(row) for row in rows]
+    return jsonify({'success': True, 'users': result, 'next_cursor': next_cursor}), 200
 
 @bp.route('/api/users', methods=['POST'])
 def create_user():
@@ -161,6 +356,7 @@ def create_user():
         400: Missing required fields
         409: Username already exists
         500: Database error
+        503: Password hashing pool saturated (Retry-After header set)
     
     Usage:
         POST /api/users
@@ -174,11 +370,164 @@ def create_user():
         return jsonify({'success': False, 'error': 'Username already exists'}), 409
     
     try:
-        hashed_pw = bcrypt.hash(data['password'])
-        user = User(username=data['username'], password_hash=hashed_pw)
+        user = User(username=data['username'])
+        user.set_password(data['password'])
         db.session.add(user)
         db.session.commit()
         return jsonify({'success': True, 'message': 'User created', 'id': user.id}), 201
+    except PasswordPoolBusy:
+        db.session.rollback()
+        return _password_pool_busy()
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
+
+# Upper bound on accounts accepted by POST /api/users/batch
+MAX_BATCH_USERS = 10000
+
+# Accounts checked, hashed and inserted together by POST /api/users/batch
+USER_BATCH_CHUNK = 1000
+
+def _insert_users(rows):
+    """
+    Insert a chunk of new users with one executemany and commit.
+
+    If the unique constraint fires (another request registered one of the
+    names after the duplicate check), the chunk is retried row by row so
+    only the clashing names fail.
+
+    Parameters:
+        rows (list[dict]): {'username', 'password_hash'} per user
+
+    Returns:
+        tuple: (created, clashed)
+            created (list[str]): Usernames inserted
+            clashed (list[str]): Usernames rejected by the unique constraint
+    """
+    try:
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+        return [row['username'] for row in rows], []
+    except IntegrityError:
+        db.session.rollback()
+    
+    created, clashed = [], []
+    for row in rows:
+        try:
+            db.session.execute(insert(User), [row])
+            db.session.commit()
+            created.append(row['username'])
+        except IntegrityError:
+            db.session.rollback()
+            clashed.append(row['username'])
+    return created, clashed
+
+@bp.route('/api/users/batch', methods=['POST'])
+def create_users_batch():
+    """
+    Create many user accounts in one request (bulk provisioning).
+    
+    Names already taken are found with one IN query per chunk (the unique
+    constraint catches anything registered concurrently), passwords are
+    hashed in parallel on the password pool, and each chunk is inserted
+    with a single executemany and committed. A failing user never blocks
+    the others; every user gets its own result.
+    
+    Bulk provisioning is an operator action: the request must carry the
+    service token (X-Internal-Token = INTERNAL_API_TOKEN), so anonymous
+    clients cannot tie up the password workers.
+    
+    Request Body (JSON):
+        users (list): [{"username": str, "password": str}, ...] (required, max 10000)
+        (a bare JSON array of users is accepted too)
+    
+    Returns:
+        200: JSON with 'created', 'failed' and 'results' (one entry per
+             submitted user, in request order: username, success, and
+             id or error)
+        400: Missing, empty or oversized users array
+        401: Missing or wrong service token
+        503: Password hashing pool saturated before anything was created
+    
+    Usage:
+        POST /api/users/batch (header X-Internal-Token: <INTERNAL_API_TOKEN>)
+        {"users": [{"username": "ann", "password": "pw1"}, {"username": "bob", "password": "pw2"}]}
+        Returns: {"success": true, "created": 2, "failed": 0,
+                  "results": [{"username": "ann", "success": true, "id": 7}, ...]}
+    """
+    denied = require_service_token()
+    if denied:
+        return denied
+    
+    data = request.get_json(silent=True)
+    users = data.get('users') if isinstance(data, dict) else data
+    if not isinstance(users, list) or not users:
+        return jsonify({'success': False, 'error': 'users must be a non-empty array'}), 400
+    if len(users) > MAX_BATCH_USERS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BATCH_USERS} users per request'}), 400
+    
+    results = [None] * len(users)
+    pending = {}  # username -> (position in request, password)
+    for i, entry in enumerate(users):
+        username = entry.get('username') if isinstance(entry, dict) else None
+        password = entry.get('password') if isinstance(entry, dict) else None
+        if not isinstance(username, str) or not username or not isinstance(password, str) or not password:
+            results[i] = {'username': username, 'success': False, 'error': 'Username and password required'}
+        elif username in pending:
+            results[i] = {'username': username, 'success': False, 'error': 'Duplicate username in request'}
+        else:
+            pending[username] = (i, password)
+    
+    def fail(username, error):
+        results[pending[username][0]] = {'username': username, 'success': False, 'error': error}
+    
+    names = list(pending)
+    busy = False
+    for start in range(0, len(names), USER_BATCH_CHUNK):
+        chunk = names[start:start + USER_BATCH_CHUNK]
+        if busy:
+            for username in chunk:
+                fail(username, 'Server busy, please retry')
+            continue
+        
+        taken = {row.username for row in db.session.query(User.username).filter(User.username.in_(chunk))}
+        for username in taken:
+            fail(username, 'Username already exists')
+        chunk = [username for username in chunk if username not in taken]
+        if not chunk:
+            continue
+        
+        try:
+            hashes = password_hasher.hash_many([pending[username][1] for username in chunk])
+            created, clashed = _insert_users([
+                {'username': username, 'password_hash': password_hash}
+                for username, password_hash in zip(chunk, hashes)
+            ])
+        except PasswordPoolBusy:
+            busy = True
+            for username in chunk:
+                fail(username, 'Server busy, please retry')
+            continue
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error('create_users_batch chunk failed: %s', e)
+            for username in chunk:
+                fail(username, str(e))
+            continue
+        
+        for username in clashed:
+            fail(username, 'Username already exists')
+        if created:
+            ids = dict(db.session.query(User.username, User.id).filter(User.username.in_(created)))
+            for username in created:
+                results[pending[username][0]] = {'username': username, 'success': True, 'id': ids.get(username)}
+    
+    created_count = sum(1 for result in results if result['success'])
+    if busy and created_count == 0:
+        return _password_pool_busy()
+    return jsonify({
+        'success': True,
+        'created': created_count,
+        'failed': len(results) - created_count,
+        'results': results
+    }), 200
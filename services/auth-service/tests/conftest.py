@@ -0,0 +1,68 @@
+"""
+====================================================================================
+conftest.py - Pytest Fixtures for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Runs the auth-service tests against an in-memory SQLite database
+  - Builds the schema with the shipped migrations (flask db upgrade), so every
+    test also exercises migrations/
+  - Hashes passwords with the minimum bcrypt cost in the request thread and
+    signs tokens with an ephemeral key, so tests stay fast and self-contained
+
+Fixtures:
+  - app: Auth Service app on the migrated database (one per test session)
+  - client: Flask test client; empties the user table afterwards
+  - service_headers: Service token header for service-to-service calls
+
+Usage:
+  - python -m pytest   (from the auth-service folder)
+
+====================================================================================
+"""
+
+import os
+import sys
+
+import pytest
+from flask_migrate import upgrade
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+# Config reads the environment when it is imported, so set it before the app is
+INTERNAL_TOKEN = 'test-internal-token'
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['DB_PROFILE'] = 'dev-sqlite'
+os.environ['INTERNAL_API_TOKEN'] = INTERNAL_TOKEN
+os.environ['BCRYPT_ROUNDS'] = '4'
+os.environ['PASSWORD_WORKERS'] = '0'
+
+@pytest.fixture(scope='session')
+def app():
+    """Auth Service app whose in-memory database was built by the migrations."""
+    from app import create_app
+    application = create_app()
+    application.config['TESTING'] = True
+    with application.app_context():
+        upgrade(directory=os.path.join(SERVICE_DIR, 'migrations'))
+    return application
+
+@pytest.fixture
+def client(app):
+    """Test client; the user table is emptied afterwards."""
+    yield app.test_client()
+
+    from app import db
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+
+@pytest.fixture
+def service_headers():
+    """Service token header accepted by bulk provisioning and user lookups."""
+    return {'X-Internal-Token': INTERNAL_TOKEN}
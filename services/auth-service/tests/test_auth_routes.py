@@ -0,0 +1,157 @@
+"""
+====================================================================================
+test_auth_routes.py - Auth Route Tests for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Login issues an access token that verifies with the published keys
+  - GET /api/users needs an access token or the service token, and its
+    keyset cursors visit every user once; mistyped cursors get 400
+  - Bulk provisioning needs the service token and reports every user
+
+Usage:
+  - python -m pytest tests/test_auth_routes.py
+
+====================================================================================
+"""
+
+import base64
+import json
+
+import jwt
+import pytest
+
+def register(client, username, password='secret'):
+    """Register a user through the API and return its ID."""
+    resp = client.post('/api/auth/register', json={'username': username, 'password': password})
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()['id']
+
+def login(client, username, password='secret'):
+    """Log in through the API and return the response."""
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+def bearer(client, username):
+    """Authorization header for a registered user."""
+    return {'Authorization': f"Bearer {login(client, username).get_json()['access_token']}"}
+
+def walk_pages(client, headers, limit, max_pages=20, **params):
+    """Follow next_cursor from the first page to the last; return the usernames seen."""
+    names = []
+    after = None
+    for _ in range(max_pages):
+        query = dict(params, limit=limit)
+        if after:
+            query['after'] = after
+        resp = client.get('/api/users', query_string=query, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        body = resp.get_json()
+        assert len(body['users']) <= limit
+        names += [user['username'] for user in body['users']]
+        after = body['next_cursor']
+        if after is None:
+            return names
+    pytest.fail(f'next_cursor did not reach the last page in {max_pages} pages: {names}')
+
+def cursor(value):
+    """Encode a cursor the way _encode_user_cursor does, with an arbitrary value."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip('=')
+
+def test_login_token_verifies_with_the_published_keys(app, client):
+    user_id = register(client, 'ann')
+
+    resp = login(client, 'ann')
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body['user_id'], body['token_type']) == (user_id, 'Bearer')
+
+    keys = client.get('/api/auth/keys').get_json()['keys']
+    kid = jwt.get_unverified_header(body['access_token'])['kid']
+    jwk = next(key for key in keys if key['kid'] == kid)
+    claims = jwt.decode(body['access_token'], jwt.PyJWK(jwk).key, algorithms=['EdDSA'],
+                        issuer=app.config['TOKEN_ISSUER'])
+    assert claims['sub'] == str(user_id)
+
+@pytest.mark.parametrize('username, password', [('ann', 'wrong'), ('nobody', 'secret')],
+                         ids=['wrong-password', 'unknown-user'])
+def test_bad_credentials_get_401(client, username, password):
+    register(client, 'ann')
+    resp = login(client, username, password)
+    assert resp.status_code == 401
+    assert 'access_token' not in resp.get_json()
+
+def test_users_need_a_token(client, service_headers):
+    register(client, 'ann')
+
+    assert client.get('/api/users').status_code == 401
+    assert client.get('/api/users', headers={'Authorization': 'Bearer not-a-jwt'}).status_code == 401
+    assert client.get('/api/users', query_string={'ids': '1'},
+                      headers={'X-Internal-Token': 'guess'}).status_code == 401
+    assert client.get('/api/users', headers=bearer(client, 'ann')).status_code == 200
+    assert client.get('/api/users', headers=service_headers).status_code == 200
+
+def test_ids_resolve_to_usernames(client, service_headers):
+    ann = register(client, 'ann')
+    bob = register(client, 'bob')
+
+    resp = client.get('/api/users', query_string={'ids': f'{bob},{ann},{bob + 100}'}, headers=service_headers)
+    assert resp.get_json()['users'] == {str(bob): 'bob', str(ann): 'ann'}
+    assert resp.get_json()['missing'] == [bob + 100]
+
+@pytest.mark.parametrize('limit', [1, 2, 500])
+def test_user_cursor_round_trip(client, service_headers, limit):
+    for username in ['carol', 'al', 'bob', 'alice', 'ann', 'alan']:
+        register(client, username)
+
+    assert walk_pages(client, service_headers, limit) == ['carol', 'al', 'bob', 'alice', 'ann', 'alan']
+    # Prefix search pages by username instead of id
+    assert walk_pages(client, service_headers, limit, q='al') == ['al', 'alan', 'alice']
+
+@pytest.mark.parametrize('params', [
+    {'after': 'not-a-cursor'},
+    {'after': cursor('ann')},
+    {'after': cursor(True)},
+    {'after': cursor([1])},
+    {'q': 'a', 'after': cursor(3)},
+], ids=['not-base64-json', 'id-string', 'id-bool', 'id-list', 'prefix-int'])
+def test_mistyped_user_cursor_is_rejected(client, service_headers, params):
+    register(client, 'ann')
+    resp = client.get('/api/users', query_string=params, headers=service_headers)
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == 'Invalid cursor'
+
+def test_batch_needs_the_service_token(client, service_headers):
+    register(client, 'ann')
+    body = {'users': [{'username': 'bob', 'password': 'pw'}]}
+
+    assert client.post('/api/users/batch', json=body).status_code == 401
+    assert client.post('/api/users/batch', json=body, headers=bearer(client, 'ann')).status_code == 401
+    assert client.post('/api/users/batch', json=body, headers={'X-Internal-Token': 'guess'}).status_code == 401
+    assert login(client, 'bob').status_code == 401
+
+def test_batch_reports_every_user(client, service_headers):
+    register(client, 'ann')
+    users = [
+        {'username': 'bob', 'password': 'pw1'},
+        {'username': 'ann', 'password': 'pw2'},
+        {'username': 'bob', 'password': 'pw3'},
+        {'username': 'cat'},
+        {'username': 'dan', 'password': 'pw4'},
+    ]
+
+    resp = client.post('/api/users/batch', json={'users': users}, headers=service_headers)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body['created'], body['failed']) == (2, 3)
+    assert [(r['username'], r['success'], r.get('error')) for r in body['results']] == [
+        ('bob', True, None),
+        ('ann', False, 'Username already exists'),
+        ('bob', False, 'Duplicate username in request'),
+        ('cat', False, 'Username and password required'),
+        ('dan', True, None),
+    ]
+    assert login(client, 'bob', 'pw1').status_code == 200
+    assert login(client, 'dan', 'pw4').status_code == 200
@@ -0,0 +1,157 @@
+"""
+====================================================================================
+tokens.py - Signed Access Tokens for Auth Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Issues short-lived, signed access tokens (JWT, EdDSA / Ed25519) at login
+  - Publishes the public verification keys as a JWKS document, so media-service
+    and collection-service can verify tokens in-process without calling back here
+
+Major Functions:
+  - init_app: Loads (or, in development, generates) the signing key
+  - issue_token: Sign an access token for a user
+  - jwks: Public keys in JSON Web Key Set format (served by GET /api/auth/keys)
+
+Configuration (config.py):
+  - TOKEN_SIGNING_KEY: Ed25519 private key in PEM format
+  - TOKEN_SIGNING_KEY_FILE: Path to a PEM file (used if TOKEN_SIGNING_KEY is unset)
+  - TOKEN_PREVIOUS_PUBLIC_KEYS: Retired public keys (concatenated PEM) still published
+    while tokens signed with them may be live (key rotation)
+  - TOKEN_TTL: Token lifetime in seconds
+  - TOKEN_ISSUER: 'iss' claim checked by the verifiers
+
+Security:
+  - Only the public half of the key ever leaves this service
+  - Without a configured key an ephemeral one is generated per process; tokens
+    then stop verifying after a restart, so always configure a key in production
+
+Usage:
+  - token, expires_in = issue_token(user)
+  - GET /api/auth/keys -> {"keys": [{"kty": "OKP", "crv": "Ed25519", ...}]}
+
+====================================================================================
+"""
+
+import base64
+import hashlib
+import json
+import re
+import time
+
+import jwt
+from flask import current_app
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+# Signing algorithm for every token issued by this service
+ALGORITHM = 'EdDSA'
+
+# Active signing key and key ID, set by init_app()
+_signing_key = None
+_kid = None
+
+# Published verification keys (current key first)
+_public_jwks = []
+
+def _b64url(data):
+    """Base64url-encode bytes without padding (RFC 7515)."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _public_jwk(public_key):
+    """
+    Build the JWK for an Ed25519 public key.
+
+    The key ID is the RFC 7638 thumbprint, so it is stable across restarts
+    and identical on every auth-service instance that shares the key.
+
+    Returns:
+        dict: JWK with kty, crv, x, kid, alg and use
+    """
+    raw = public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+    jwk = {'crv': 'Ed25519', 'kty': 'OKP', 'x': _b64url(raw)}
+    thumbprint = hashlib.sha256(json.dumps(jwk, separators=(',', ':'), sort_keys=True).encode()).digest()
+    return {**jwk, 'kid': _b64url(thumbprint), 'alg': ALGORITHM, 'use': 'sig'}
+
+def _load_private_key(app):
+    """
+    Return the configured Ed25519 private key, or an ephemeral one.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    pem = app.config.get('TOKEN_SIGNING_KEY')
+    path = app.config.get('TOKEN_SIGNING_KEY_FILE')
+    if not pem and path:
+        with open(path, 'rb') as f:
+            pem = f.read()
+    if pem:
+        if isinstance(pem, str):
+            pem = pem.encode()
+        key = serialization.load_pem_private_key(pem, password=None)
+        if not isinstance(key, Ed25519PrivateKey):
+            raise ValueError('TOKEN_SIGNING_KEY must be an Ed25519 private key')
+        return key
+
+    app.logger.warning(
+        'TOKEN_SIGNING_KEY is not set; using an ephemeral signing key. '
+        'Tokens will not survive a restart or verify across instances.'
+    )
+    return Ed25519PrivateKey.generate()
+
+def init_app(app):
+    """
+    Load the signing key and build the published key set.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    global _signing_key, _kid, _public_jwks
+    _signing_key = _load_private_key(app)
+    current = _public_jwk(_signing_key.public_key())
+    _kid = current['kid']
+
+    published = [current]
+    previous = app.config.get('TOKEN_PREVIOUS_PUBLIC_KEYS') or ''
+    for pem in re.findall(r'-----BEGIN PUBLIC KEY-----.+?-----END PUBLIC KEY-----', previous, re.S):
+        published.append(_public_jwk(serialization.load_pem_public_key(pem.encode())))
+    _public_jwks = published
+
+def issue_token(user):
+    """
+    Sign a short-lived access token for a user (TOKEN_TTL / TOKEN_ISSUER).
+
+    Parameters:
+        user (User): Authenticated user
+
+    Returns:
+        tuple: (token, expires_in)
+            token (str): Compact JWT
+            expires_in (int): Seconds until the token expires
+
+    Usage:
+        token, expires_in = issue_token(user)
+    """
+    ttl = int(current_app.config['TOKEN_TTL'])
+    now = int(time.time())
+    claims = {
+        'sub': str(user.id),
+        'username': user.username,
+        'iss': current_app.config['TOKEN_ISSUER'],
+        'iat': now,
+        'exp': now + ttl,
+    }
+    token = jwt.encode(claims, _signing_key, algorithm=ALGORITHM, headers={'kid': _kid})
+    return token, ttl
+
+def jwks():
+    """
+    Return the public verification keys as a JSON Web Key Set.
+
+    Returns:
+        dict: {'keys': [jwk, ...]} with the current signing key first
+    """
+    return {'keys': list(_public_jwks)}
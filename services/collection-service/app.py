@@ -15,9 +15,15 @@ Purpose:
 Major Functions:
   - create_app: Application factory function
     - Loads config from config.py
+    - Installs the fast JSON response encoder
     - Initializes database and migration extensions
+    - Applies the database engine profile (pool, timeouts, SQLite pragmas)
+    - Records request metrics and serves them on /metrics
     - Enables CORS for API access
-    - Registers routes and models
+    - Installs the access token verifier
+    - Configures the media-service client and media summary cache
+    - Hooks the session so collection statistics and rating aggregates stay current
+    - Registers routes, models and CLI commands
 
 Security:
   - Uses environment variables for secrets and DB config
@@ -57,14 +63,38 @@ def create_app():
     
     # Load configuration from config.py
     app.config.from_object(Config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    
+    # Encode JSON responses with orjson when it is installed
+    from sortedshelf_common import json_provider
+    json_provider.init_app(app)
     
     # Initialize database and migration extensions
+    # (engine pool, timeouts and SQLite pragmas come from DB_PROFILE)
+    from sortedshelf_common import engine_profiles
+    engine_profiles.apply_profile(app)
     db.init_app(app)
+    engine_profiles.init_app(app, db)
     migrate.init_app(app, db)
     
+    # Request latency, status and SQL metrics on /metrics (hooks run first)
+    from sortedshelf_common.metrics import metrics
+    metrics.init_app(app, db)
+    
     # Enable CORS for frontend access (restricted to localhost:3000 for security)
     CORS(app, origins=["http://localhost:3000"])
     
+    # Configure the shared media-service client (connection pool, limits, base URL)
+    # and the media summary cache in front of it
+    from media_client import media_client
+    from media_cache import media_summary_cache
+    media_client.init_app(app)
+    media_summary_cache.init_app(app)
+    
+    # Verify access tokens locally (keys cached from auth-service)
+    from sortedshelf_common.auth_tokens import token_verifier
+    token_verifier.init_app(app)
+    
     # Register API routes blueprint
     from routes import bp as routes_bp
     app.register_blueprint(routes_bp)
@@ -72,6 +102,17 @@ def create_app():
     # Import models to ensure they are registered with SQLAlchemy
     import models
     
+    # Keep collection_stats and media_rating_aggregate current with every
+    # CollectionMedia write
+    import collection_stats
+    import rating_aggregates
+    collection_stats.init_app(app)
+    rating_aggregates.init_app(app)
+    
+    # Register maintenance CLI commands (flask <command>)
+    import commands
+    commands.init_app(app)
+    
     return app
 
 # Allow running the service directly for development
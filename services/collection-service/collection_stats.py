@@ -0,0 +1,203 @@
+"""
+====================================================================================
+collection_stats.py - Incremental Collection Statistics for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Keeps one collection_stats row per collection (item count, rating count
+    and sum, last added) current in the same transaction as every insert,
+    delete or rating change of a CollectionMedia row, so collection lists
+    show counts and averages without aggregating collection_media
+  - Changes are applied as relative UPDATEs (item_count = item_count + 1),
+    so concurrent transactions on one collection never lose each other's work
+  - Repairs the table in bulk from collection_media (after a migration, a
+    restore, or writes that bypassed the ORM)
+
+Major Functions:
+  - init_app: Hook the session so every flush updates the affected stats rows
+  - repair_collection_stats: Recompute every row from collection_media
+
+Usage:
+  - collection_stats.init_app(app) in create_app(); nothing else is needed on the write path
+  - flask repair-collection-stats
+  - Bulk Query.update()/delete() on CollectionMedia bypasses the hooks; run
+    the repair command after such writes
+
+====================================================================================
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, literal, or_, select, update
+
+from app import db
+from models import Collection, CollectionMedia, CollectionStats
+
+def _aggregate(collection_filter):
+    """SELECT computing the stats columns from collection_media for matching collections."""
+    return select(
+        CollectionMedia.collection_id,
+        func.count(CollectionMedia.id),
+        func.count(CollectionMedia.rating),
+        func.coalesce(func.sum(CollectionMedia.rating), 0),
+        func.max(CollectionMedia.date_added)
+    ).where(collection_filter).group_by(CollectionMedia.collection_id)
+
+def _drop_deleted_collections(session, flush_context, instances):
+    """before_flush: delete the stats rows of collections being deleted (foreign key)."""
+    ids = [obj.id for obj in session.deleted if isinstance(obj, Collection) and obj.id is not None]
+    if ids:
+        session.execute(delete(CollectionStats).where(CollectionStats.collection_id.in_(ids)))
+
+def _link_changes(session):
+    """
+    Turn the flushed CollectionMedia changes into per-collection deltas.
+
+    Returns:
+        dict: collection_id -> {'items', 'ratings', 'rating_sum', 'added', 'removed'}
+            'added' is the latest date_added added, 'removed' whether any
+            item left (last_added then has to be recomputed)
+    """
+    deltas = defaultdict(lambda: {'items': 0, 'ratings': 0, 'rating_sum': 0, 'added': None, 'removed': False})
+
+    def add(collection_id, rating, date_added, sign):
+        delta = deltas[collection_id]
+        delta['items'] += sign
+        if rating is not None:
+            delta['ratings'] += sign
+            delta['rating_sum'] += sign * rating
+        if sign > 0:
+            if date_added is not None and (delta['added'] is None or date_added > delta['added']):
+                delta['added'] = date_added
+        else:
+            delta['removed'] = True
+
+    for obj in session.new:
+        if isinstance(obj, CollectionMedia):
+            add(obj.collection_id, obj.rating, obj.date_added, 1)
+    for obj in session.deleted:
+        if isinstance(obj, CollectionMedia):
+            add(obj.collection_id, obj.rating, obj.date_added, -1)
+    for obj in session.dirty:
+        if not isinstance(obj, CollectionMedia):
+            continue
+        attrs = inspect(obj).attrs
+        histories = [attrs.collection_id.history, attrs.rating.history, attrs.date_added.history]
+        if not any(h.has_changes() for h in histories):
+            continue
+        # Old values come from the history; an unchanged attribute has none
+        old = [h.deleted[0] if h.deleted else value
+               for h, value in zip(histories, (obj.collection_id, obj.rating, obj.date_added))]
+        add(*old, -1)
+        add(obj.collection_id, obj.rating, obj.date_added, 1)
+    return deltas
+
+def _apply_changes(session, flush_context):
+    """after_flush: apply this flush's changes to collection_stats."""
+    new_collections = [obj.id for obj in session.new if isinstance(obj, Collection)]
+    if new_collections:
+        session.execute(insert(CollectionStats), [
+            {'collection_id': collection_id, 'item_count': 0, 'rating_count': 0, 'rating_sum': 0}
+            for collection_id in new_collections
+        ])
+
+    for collection_id, delta in sorted(_link_changes(session).items()):
+        if delta['removed']:
+            # The removed item may have been the latest one
+            last_added = select(func.max(CollectionMedia.date_added)) \
+                .where(CollectionMedia.collection_id == collection_id).scalar_subquery()
+        elif delta['added'] is not None:
+            last_added = case(
+                (or_(CollectionStats.last_added.is_(None), CollectionStats.last_added < delta['added']),
+                 literal(delta['added'])),
+                else_=CollectionStats.last_added
+            )
+        else:
+            last_added = CollectionStats.last_added
+        result = session.execute(
+            update(CollectionStats)
+            .where(CollectionStats.collection_id == collection_id)
+            .values(
+                item_count=CollectionStats.item_count + delta['items'],
+                rating_count=CollectionStats.rating_count + delta['ratings'],
+                rating_sum=CollectionStats.rating_sum + delta['rating_sum'],
+                last_added=last_added,
+                version=CollectionStats.version + 1
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount == 0:
+            # No row yet (collection created before this table existed):
+            # compute it from collection_media, which already holds this flush
+            session.execute(insert(CollectionStats).from_select(
+                ['collection_id', 'item_count', 'rating_count', 'rating_sum', 'last_added'],
+                _aggregate(CollectionMedia.collection_id == collection_id)
+            ))
+
+def init_app(app):
+    """
+    Maintain collection_stats with every flush that touches collections or their items.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    for name, handler in (('before_flush', _drop_deleted_collections),
+                          ('after_flush', _apply_changes)):
+        if not event.contains(db.session, name, handler):
+            event.listen(db.session, name, handler)
+
+def repair_collection_stats(batch_size=1000):
+    """
+    Recompute collection_stats from collection_media for every collection.
+
+    Works through collections in ID ranges of batch_size, committing after
+    each range. Rows that already match are left alone (their version, and
+    so the collection list ETags, do not change); wrong rows are corrected
+    and missing rows created.
+
+    Parameters:
+        batch_size (int): Collections per aggregate query and commit
+
+    Returns:
+        tuple: (checked, fixed, created)
+    """
+    checked = fixed = created = 0
+    after = 0
+    while True:
+        collection_ids = [row[0] for row in db.session.execute(
+            select(Collection.id).where(Collection.id > after).order_by(Collection.id).limit(batch_size)
+        )]
+        if not collection_ids:
+            break
+        low, high = collection_ids[0], collection_ids[-1]
+        after = high
+
+        actual = {row[0]: tuple(row[1:]) for row in db.session.execute(
+            _aggregate(and_(CollectionMedia.collection_id >= low, CollectionMedia.collection_id <= high))
+        )}
+        stored = {row.collection_id: row for row in CollectionStats.query.filter(
+            CollectionStats.collection_id >= low, CollectionStats.collection_id <= high
+        )}
+        for collection_id in collection_ids:
+            item_count, rating_count, rating_sum, last_added = actual.get(collection_id, (0, 0, 0, None))
+            row = stored.get(collection_id)
+            checked += 1
+            if row is None:
+                db.session.add(CollectionStats(
+                    collection_id=collection_id, item_count=item_count, rating_count=rating_count,
+                    rating_sum=rating_sum, last_added=last_added
+                ))
+                created += 1
+            elif (row.item_count, row.rating_count, row.rating_sum, row.last_added) != \
+                    (item_count, rating_count, rating_sum, last_added):
+                row.item_count = item_count
+                row.rating_count = rating_count
+                row.rating_sum = rating_sum
+                row.last_added = last_added
+                row.version = row.version + 1
+                fixed += 1
+        db.session.commit()
+    return checked, fixed, created
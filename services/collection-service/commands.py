@@ -0,0 +1,75 @@
+"""
+====================================================================================
+commands.py - Maintenance CLI Commands for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Provides operational commands run through the Flask CLI
+  - Keeps one-off maintenance jobs out of the request path
+
+Major Commands:
+  - flask check-query-plans: Fail if a hot query stops using its index
+  - flask rebuild-media-projection: Reconcile the media projection with media-service
+  - flask repair-collection-stats: Recompute collection statistics from collection_media
+  - flask recompute-rating-aggregates: Recompute community rating aggregates from collection_media
+
+Usage:
+  - set FLASK_APP=app.py
+  - flask check-query-plans
+  - flask rebuild-media-projection
+  - flask repair-collection-stats
+  - flask recompute-rating-aggregates
+
+====================================================================================
+"""
+
+import click
+
+def init_app(app):
+    """
+    Register maintenance commands on the Flask app.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Run EXPLAIN QUERY PLAN for every route query; exit 1 on a table scan."""
+        from query_plans import check_query_plans
+        failures = check_query_plans(echo=click.echo)
+        if failures:
+            raise click.ClickException(f'{len(failures)} query plan(s) regressed: {", ".join(failures)}')
+        click.echo('All query plans use indexes')
+
+    @app.cli.command('rebuild-media-projection')
+    @click.option('--page-size', default=1000, show_default=True, help='Media items per feed call.')
+    def rebuild_media_projection_command(page_size):
+        """Reconcile the local media projection with media-service's full media feed."""
+        import requests
+        from media_client import media_client
+        from projection import rebuild_media_projection
+        try:
+            written, tombstoned = rebuild_media_projection(media_client.iter_media_feed(page_size))
+        except requests.RequestException as e:
+            raise click.ClickException(f'Media feed unavailable: {e}')
+        click.echo(f'Projected {written} media items, tombstoned {tombstoned}')
+
+    @app.cli.command('repair-collection-stats')
+    @click.option('--batch-size', default=1000, show_default=True, help='Collections per aggregate query and commit.')
+    def repair_collection_stats_command(batch_size):
+        """Recompute collection_stats from collection_media, fixing rows that drifted."""
+        from collection_stats import repair_collection_stats
+        checked, fixed, created = repair_collection_stats(batch_size)
+        click.echo(f'Checked {checked} collections: fixed {fixed}, created {created}')
+
+    @app.cli.command('recompute-rating-aggregates')
+    @click.option('--batch-size', default=1000, show_default=True, help='Media items per aggregate query and commit.')
+    def recompute_rating_aggregates_command(batch_size):
+        """Recompute media_rating_aggregate from collection_media, in media ID chunks."""
+        from rating_aggregates import recompute_rating_aggregates
+        checked, fixed, created, deleted = recompute_rating_aggregates(batch_size)
+        click.echo(f'Checked {checked} rated media items: fixed {fixed}, created {created}, deleted {deleted}')
@@ -16,6 +16,11 @@ Major Components:
     - SECRET_KEY: Secret key for session and security
     - SQLALCHEMY_DATABASE_URI: Database connection URI
     - SQLALCHEMY_TRACK_MODIFICATIONS: Disable event system for performance
+    - DB_PROFILE / DB_* / SQLITE_*: Database engine profile (pool, timeouts, SQLite pragmas)
+    - METRICS_ENABLED: Prometheus-format request metrics on /metrics
+    - LOG_LEVEL: Level of the app logger (startup and request logs)
+    - MEDIA_SERVICE_URL / MEDIA_CLIENT_*: Media-service client settings
+    - MEDIA_SUMMARY_*: Media summary cache settings
 
 Security:
   - Secrets and DB credentials loaded from environment, not hardcoded
@@ -41,6 +46,35 @@ class Config:
         SECRET_KEY (str): Secret key for session and security
         SQLALCHEMY_DATABASE_URI (str): Database connection URI
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Disable SQLAlchemy event system for performance
+        DB_PROFILE (str): Engine profile, 'dev-sqlite' or 'prod-mysql' (default: from the URI scheme)
+        DB_POOL_SIZE (int): Connections kept open per worker process (prod-mysql)
+        DB_MAX_OVERFLOW (int): Extra connections allowed under load (prod-mysql)
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection (prod-mysql)
+        DB_POOL_RECYCLE (int): Seconds before a connection is replaced, below MySQL's wait_timeout
+        DB_CONNECT_TIMEOUT (int): Seconds to establish a connection (prod-mysql)
+        DB_READ_TIMEOUT (int): Socket read/write timeout in seconds (prod-mysql)
+        DB_STATEMENT_TIMEOUT_MS (int): Server-side SELECT timeout, max_execution_time (prod-mysql)
+        SQLITE_BUSY_TIMEOUT_MS (int): Milliseconds to wait on a locked database (dev-sqlite)
+        SQLITE_MMAP_SIZE (int): Bytes of the database file memory-mapped for reads (dev-sqlite)
+        METRICS_ENABLED (bool): Record request metrics and serve them on /metrics
+        LOG_LEVEL (str): Level of app.logger, e.g. INFO or WARNING
+        AUTH_SERVICE_URL (str): Base URL of auth-service (access token keys)
+        AUTH_REQUIRED (bool): Reject requests that carry no access token
+        AUTH_TOKEN_ISSUER (str): Expected issuer of access tokens
+        AUTH_KEYS_TTL (float): Seconds cached token keys are trusted before re-fetching
+        AUTH_KEYS_MIN_REFRESH (float): Minimum seconds between token key fetches
+        AUTH_CLOCK_LEEWAY (int): Allowed clock skew for token expiry (seconds)
+        INTERNAL_API_TOKEN (str): Shared secret for service-to-service /api/internal/ calls
+        INTERNAL_API_DEV_OPEN (bool): Leave /api/internal/ open while the token is unset (development only)
+        MEDIA_SERVICE_URL (str): Base URL of media-service
+        MEDIA_CLIENT_TIMEOUT (float): Per-call timeout for media-service requests (seconds)
+        MEDIA_CLIENT_DEADLINE (float): Whole-request deadline for media-service fan-out (seconds)
+        MEDIA_CLIENT_MAX_WORKERS (int): Concurrent media-service calls per worker process
+        MEDIA_CLIENT_POOL_SIZE (int): Keep-alive connections per worker process
+        MEDIA_BATCH_SIZE (int): Media IDs per batch lookup call
+        MEDIA_SUMMARY_CACHE_SIZE (int): Media items cached per worker process (0 disables the cache)
+        MEDIA_SUMMARY_TTL (float): Seconds a cached media item is served without revalidation
+        MEDIA_SUMMARY_STALE_TTL (float): Further seconds a stale item is served while it refreshes
     """
 
     # Set the secret key for the Flask app, defaulting to 'dev' if not provided
@@ -52,5 +86,46 @@ class Config:
     # Disable SQLAlchemy event system to save resources
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Database engine profile: pool, timeouts and SQLite pragmas (see sortedshelf_common/engine_profiles.py)
+    DB_PROFILE = os.getenv('DB_PROFILE') or ('dev-sqlite' if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else 'prod-mysql')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 280))
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    DB_READ_TIMEOUT = int(os.getenv('DB_READ_TIMEOUT', 60))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # Request metrics served on /metrics (see sortedshelf_common/metrics.py)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+    # App logger level (INFO shows the database profile line at startup)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
     # Port configuration for collection service
     PORT = int(os.getenv('PORT', 5003))
+
+    # Media-service client settings (see media_client.py)
+    MEDIA_SERVICE_URL = os.getenv('MEDIA_SERVICE_URL', 'http://localhost:5002')
+    MEDIA_CLIENT_TIMEOUT = float(os.getenv('MEDIA_CLIENT_TIMEOUT', 2.0))
+    MEDIA_CLIENT_DEADLINE = float(os.getenv('MEDIA_CLIENT_DEADLINE', 3.0))
+    MEDIA_CLIENT_MAX_WORKERS = int(os.getenv('MEDIA_CLIENT_MAX_WORKERS', 8))
+    MEDIA_CLIENT_POOL_SIZE = int(os.getenv('MEDIA_CLIENT_POOL_SIZE', 16))
+    MEDIA_BATCH_SIZE = int(os.getenv('MEDIA_BATCH_SIZE', 100))
+
+    # Media summary cache in front of the client (see media_cache.py)
+    MEDIA_SUMMARY_CACHE_SIZE = int(os.getenv('MEDIA_SUMMARY_CACHE_SIZE', 10000))
+    MEDIA_SUMMARY_TTL = float(os.getenv('MEDIA_SUMMARY_TTL', 60))
+    MEDIA_SUMMARY_STALE_TTL = float(os.getenv('MEDIA_SUMMARY_STALE_TTL', 300))
+
+    # Access token verification (see sortedshelf_common/auth_tokens.py)
+    AUTH_SERVICE_URL = os.getenv('AUTH_SERVICE_URL', 'http://localhost:5001')
+    AUTH_REQUIRED = os.getenv('AUTH_REQUIRED', 'false').lower() in ('1', 'true', 'yes')
+    AUTH_TOKEN_ISSUER = os.getenv('AUTH_TOKEN_ISSUER', 'sortedshelf-auth')
+    AUTH_KEYS_TTL = float(os.getenv('AUTH_KEYS_TTL', 3600))
+    AUTH_KEYS_MIN_REFRESH = float(os.getenv('AUTH_KEYS_MIN_REFRESH', 30))
+    AUTH_CLOCK_LEEWAY = int(os.getenv('AUTH_CLOCK_LEEWAY', 30))
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+    INTERNAL_API_DEV_OPEN = os.getenv('INTERNAL_API_DEV_OPEN', 'false').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,208 @@
+"""
+====================================================================================
+media_cache.py - Media Summary Cache for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Keeps the media objects fetched from media-service in memory, so repeat
+    views of a collection need no cross-service call at all
+  - Fresh entries are served as is; stale entries (past the TTL but inside
+    the stale window) are served immediately while a background call
+    refreshes them (stale-while-revalidate); only misses and entries past
+    the stale window wait on media-service
+  - media-service pushes the IDs of changed or deleted items to
+    POST /api/internal/media-invalidate, so edits show up without waiting
+    for the TTL (which remains the fallback if a push is lost)
+
+Major Components:
+  - MediaSummaryCache class: Bounded LRU of media dicts keyed by media_id
+    - init_app: Reads MEDIA_SUMMARY_* settings from app config
+    - lookup: Split IDs into fresh hits, stale hits and misses
+    - store: Save freshly fetched media dicts
+    - invalidate: Drop entries (push from media-service)
+    - stats: Hit / stale / miss / eviction counters
+  - media_summary_cache: Shared instance registered by create_app()
+
+Configuration (config.py):
+  - MEDIA_SUMMARY_CACHE_SIZE: Media items kept per worker process (0 disables the cache)
+  - MEDIA_SUMMARY_TTL: Seconds an entry is served without revalidation
+  - MEDIA_SUMMARY_STALE_TTL: Further seconds a stale entry may be served while it refreshes
+
+Usage:
+  - Used through media_client.get_media_summaries(); not called by routes directly
+  - media_summary_cache.invalidate([1, 2])
+
+====================================================================================
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class MediaSummaryCache:
+    """
+    Thread-safe, bounded LRU of media dicts with a TTL and a stale window.
+
+    Attributes:
+        maxsize (int): Maximum number of media items kept
+        ttl (float): Seconds an entry is fresh
+        stale_ttl (float): Seconds after the TTL an entry may still be served
+        hits, stale_hits, misses, evictions, invalidations (int): Counters since start
+        refreshes, refresh_errors (int): Background refresh counters
+    """
+
+    def __init__(self):
+        self.maxsize = 10000
+        self.ttl = 60.0
+        self.stale_ttl = 300.0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self._data = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Bumped by every invalidate(); fetches that overlap one are not stored
+        self.generation = 0
+
+    def init_app(self, app):
+        """
+        Load cache settings from the Flask app config.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+        """
+        self.maxsize = app.config.get('MEDIA_SUMMARY_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('MEDIA_SUMMARY_TTL', self.ttl)
+        self.stale_ttl = app.config.get('MEDIA_SUMMARY_STALE_TTL', self.stale_ttl)
+        app.extensions['media_summary_cache'] = self
+
+    def lookup(self, media_ids):
+        """
+        Look up media IDs without fetching anything.
+
+        Parameters:
+            media_ids (list[int]): Unique IDs to look up
+
+        Returns:
+            tuple: (found, stale, missing)
+                found (dict): media_id -> media dict for fresh and stale hits
+                stale (list[int]): Hits that should be refreshed in the background
+                    (IDs already being refreshed are left out)
+                missing (list[int]): IDs that must be fetched now
+        """
+        now = time.monotonic()
+        found = {}
+        stale = []
+        missing = []
+        with self._lock:
+            for media_id in media_ids:
+                item = self._data.get(media_id)
+                if item is None:
+                    missing.append(media_id)
+                    continue
+                fresh_until, media = item
+                if now < fresh_until:
+                    self.hits += 1
+                elif now < fresh_until + self.stale_ttl:
+                    self.stale_hits += 1
+                    if media_id not in self._refreshing:
+                        self._refreshing.add(media_id)
+                        stale.append(media_id)
+                else:
+                    del self._data[media_id]
+                    missing.append(media_id)
+                    continue
+                self._data.move_to_end(media_id)
+                found[media_id] = media
+            self.misses += len(missing)
+        return found, stale, missing
+
+    def store(self, media_by_id, generation=None):
+        """
+        Save freshly fetched media dicts.
+
+        Parameters:
+            media_by_id (dict): media_id -> media dict
+            generation (int): self.generation read before the fetch started;
+                if an invalidation arrived since, nothing is stored (optional)
+        """
+        if self.maxsize <= 0 or not media_by_id:
+            return
+        fresh_until = time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            for media_id, media in media_by_id.items():
+                self._data[media_id] = (fresh_until, media)
+                self._data.move_to_end(media_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def finish_refresh(self, media_ids, failed=False):
+        """
+        Mark a background refresh as done.
+
+        Parameters:
+            media_ids (list[int]): IDs returned as 'stale' by lookup()
+            failed (bool): Whether the refresh call failed
+        """
+        with self._lock:
+            self._refreshing.difference_update(media_ids)
+            if failed:
+                self.refresh_errors += 1
+            else:
+                self.refreshes += 1
+
+    def invalidate(self, media_ids):
+        """
+        Drop cached media items (changed or deleted in media-service).
+
+        Parameters:
+            media_ids (iterable[int]): Media IDs to drop
+
+        Returns:
+            int: Number of entries that were actually cached
+        """
+        dropped = 0
+        with self._lock:
+            self.generation += 1
+            for media_id in media_ids:
+                if self._data.pop(media_id, None) is not None:
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def stats(self):
+        """
+        Return the counters and current size.
+
+        Returns:
+            dict: Counters, size, limits and hit_ratio (fresh + stale hits / lookups)
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 4) if lookups else None
+            }
+
+# Shared cache instance, configured by create_app()
+media_summary_cache = MediaSummaryCache()
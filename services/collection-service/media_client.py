@@ -0,0 +1,315 @@
+"""
+====================================================================================
+media_client.py - Media Service Client for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Single place for all cross-service reads from collection-service to media-service
+  - Reuses keep-alive HTTP connections instead of opening one per request
+  - Fans batch lookups out concurrently so a large collection costs one deadline
+  - Serves repeat lookups from the media summary cache (media_cache.py) and
+    refreshes stale entries in the background
+  - Records the time and outcome of every call in sortedshelf_common.metrics (/metrics)
+
+Major Components:
+  - MediaClient class: Pooled, concurrent client for media-service
+    - init_app: Reads MEDIA_SERVICE_URL and client limits from app config
+    - get_media_many: Batch lookup of media items by ID under a whole-request deadline
+    - get_media_summaries: get_media_many through the media summary cache
+    - iter_media_feed: Page through media-service's full media feed (projection rebuilds)
+  - media_client: Shared instance registered by create_app()
+
+Configuration (config.py):
+  - MEDIA_SERVICE_URL: Base URL of media-service
+  - MEDIA_CLIENT_TIMEOUT: Per-call timeout in seconds
+  - MEDIA_CLIENT_DEADLINE: Whole-request deadline in seconds
+  - MEDIA_CLIENT_MAX_WORKERS: Maximum concurrent calls per worker process
+  - MEDIA_CLIENT_POOL_SIZE: Keep-alive connections kept per worker process
+  - MEDIA_BATCH_SIZE: Media IDs requested per batch call
+
+Usage:
+  - from media_client import media_client
+  - found, errors = media_client.get_media_summaries([1, 2, 3])
+
+====================================================================================
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from flask import g, has_request_context
+from sortedshelf_common.auth_tokens import forward_auth_headers, internal_headers
+from sortedshelf_common.metrics import metrics
+
+from media_cache import media_summary_cache
+
+class MediaClient:
+    """
+    Pooled, concurrent HTTP client for media-service.
+
+    The connection pool and thread pool are created lazily and per process,
+    so every worker forked by a WSGI server gets its own keep-alive pool.
+
+    Attributes:
+        base_url (str): Base URL of media-service (no trailing slash)
+        timeout (float): Per-call timeout in seconds
+        deadline (float): Whole-request deadline in seconds
+        max_workers (int): Maximum concurrent calls per worker process
+        pool_size (int): Keep-alive connections kept per worker process
+        batch_size (int): Media IDs requested per batch call
+    """
+
+    def __init__(self):
+        self.base_url = 'http://localhost:5002'
+        self.timeout = 2.0
+        self.deadline = 3.0
+        self.max_workers = 8
+        self.pool_size = 16
+        self.batch_size = 100
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._executor = None
+        self._logger = None
+
+    def init_app(self, app):
+        """
+        Load client settings from the Flask app config.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+        """
+        self.base_url = app.config.get('MEDIA_SERVICE_URL', self.base_url).rstrip('/')
+        self.timeout = app.config.get('MEDIA_CLIENT_TIMEOUT', self.timeout)
+        self.deadline = app.config.get('MEDIA_CLIENT_DEADLINE', self.deadline)
+        self.max_workers = app.config.get('MEDIA_CLIENT_MAX_WORKERS', self.max_workers)
+        self.pool_size = app.config.get('MEDIA_CLIENT_POOL_SIZE', self.pool_size)
+        self.batch_size = app.config.get('MEDIA_BATCH_SIZE', self.batch_size)
+        self._logger = app.logger
+        app.extensions['media_client'] = self
+
+    def _resources(self):
+        """
+        Return the (session, executor) pair for the current process.
+
+        Recreated after a fork so connections and threads are never shared
+        between worker processes.
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='media-client'
+                    )
+                    self._pid = pid
+        return self._session, self._executor
+
+    def _get(self, session, call, path, **kwargs):
+        """
+        GET a media-service path, recording the call's time and outcome in metrics.
+
+        Parameters:
+            session (requests.Session): Pooled session from _resources()
+            call (str): Metrics label for the endpoint
+            path (str): Path below base_url
+            **kwargs: Passed on to session.get()
+
+        Returns:
+            requests.Response: Raw response from media-service
+        """
+        started = time.monotonic()
+        try:
+            resp = session.get(f'{self.base_url}{path}', **kwargs)
+        except requests.RequestException:
+            metrics.observe_call('media-service', call, time.monotonic() - started, 'error')
+            raise
+        metrics.observe_call('media-service', call, time.monotonic() - started, resp.status_code)
+        return resp
+
+    def _fetch_chunk(self, session, chunk, timeout, headers):
+        """
+        Fetch one chunk of media IDs with GET /api/media?ids=...
+
+        Returns:
+            requests.Response: Raw response from media-service
+        """
+        return self._get(
+            session, 'media_batch', '/api/media',
+            params={'ids': ','.join(str(media_id) for media_id in chunk)},
+            headers=headers,
+            timeout=timeout
+        )
+
+    def get_media_many(self, media_ids):
+        """
+        Look up many media items concurrently under one overall deadline.
+
+        IDs are split into batch_size chunks that are fetched in parallel.
+        Each call is bounded by the per-call timeout (and never outlives the
+        deadline); anything not finished when the deadline expires is
+        reported as an error instead of being waited on. The caller's access
+        token is forwarded, so media-service applies the same user scoping.
+
+        Parameters:
+            media_ids (list[int]): Media IDs to look up (duplicates allowed)
+
+        Returns:
+            tuple: (found, errors)
+                found (dict): media_id -> media dict, or None if its chunk failed
+                errors (list[str]): Warning messages for failed chunks
+            IDs absent from 'found' were reported missing by media-service.
+        """
+        unique_ids = list(dict.fromkeys(media_ids))
+        if not unique_ids:
+            return {}, []
+
+        session, executor = self._resources()
+        started = time.monotonic()
+        per_call = min(self.timeout, self.deadline)
+        headers = forward_auth_headers()
+
+        futures = {}
+        for start in range(0, len(unique_ids), self.batch_size):
+            chunk = unique_ids[start:start + self.batch_size]
+            futures[executor.submit(self._fetch_chunk, session, chunk, per_call, headers)] = chunk
+
+        remaining = self.deadline - (time.monotonic() - started)
+        done, not_done = wait(futures, timeout=max(remaining, 0))
+
+        found = {}
+        errors = []
+        for future in not_done:
+            future.cancel()
+            for media_id in futures[future]:
+                errors.append(f"Deadline exceeded for media_id {media_id}")
+                found[media_id] = None
+
+        for future in done:
+            chunk = futures[future]
+            try:
+                resp = future.result()
+            except Exception as e:
+                for media_id in chunk:
+                    errors.append(f"Exception for media_id {media_id}: {str(e)}")
+                    found[media_id] = None
+                continue
+
+            if resp.status_code == 200:
+                for media in resp.json().get('media', []):
+                    found[media['id']] = media
+            else:
+                for media_id in chunk:
+                    errors.append(f"Media-service returned status {resp.status_code} for media_id {media_id}")
+                    found[media_id] = None
+
+        return found, errors
+
+    def _refresh(self, media_ids, headers, generation):
+        """
+        Background job: re-fetch stale cache entries and store the results.
+
+        IDs media-service no longer returns are left to expire (deletions
+        are pushed to POST /api/internal/media-invalidate).
+        """
+        session, _ = self._resources()
+        failed = False
+        try:
+            for start in range(0, len(media_ids), self.batch_size):
+                resp = self._fetch_chunk(session, media_ids[start:start + self.batch_size], self.timeout, headers)
+                if resp.status_code != 200:
+                    failed = True
+                    continue
+                media_summary_cache.store({media['id']: media for media in resp.json().get('media', [])}, generation)
+        except Exception as e:
+            failed = True
+            if self._logger:
+                self._logger.warning('Media cache refresh failed for %d items: %s', len(media_ids), e)
+        finally:
+            media_summary_cache.finish_refresh(media_ids, failed=failed)
+
+    def get_media_summaries(self, media_ids):
+        """
+        Look up many media items, serving what it can from the summary cache.
+
+        Fresh entries are returned without a call; stale entries are returned
+        too and refreshed in the background; only the misses are fetched with
+        get_media_many (same deadline and error reporting). When the request
+        carries an access token, cached items owned by another user are
+        reported missing, as media-service itself would.
+
+        Parameters:
+            media_ids (list[int]): Media IDs to look up (duplicates allowed)
+
+        Returns:
+            tuple: (found, errors), as for get_media_many
+        """
+        unique_ids = list(dict.fromkeys(media_ids))
+        found, stale, missing = media_summary_cache.lookup(unique_ids)
+        headers = forward_auth_headers()
+
+        if stale:
+            _, executor = self._resources()
+            executor.submit(self._refresh, stale, headers, media_summary_cache.generation)
+
+        errors = []
+        if missing:
+            generation = media_summary_cache.generation
+            fetched, errors = self.get_media_many(missing)
+            media_summary_cache.store(
+                {media_id: media for media_id, media in fetched.items() if media is not None}, generation
+            )
+            found.update(fetched)
+
+        auth_user_id = g.get('auth_user_id') if has_request_context() else None
+        if auth_user_id is not None:
+            found = {
+                media_id: media for media_id, media in found.items()
+                if media is None or media.get('user_id') == auth_user_id
+            }
+        return found, errors
+
+    def iter_media_feed(self, page_size=1000):
+        """
+        Page through every media item via GET /api/internal/media-feed.
+
+        Parameters:
+            page_size (int): Items per call
+
+        Yields:
+            tuple: (media_list, outbox_position) per page; at least one page
+
+        Raises:
+            requests.RequestException: If a page cannot be fetched
+        """
+        session, _ = self._resources()
+        after = 0
+        while after is not None:
+            resp = self._get(
+                session, 'media_feed', '/api/internal/media-feed',
+                params={'after': after, 'limit': page_size},
+                headers=internal_headers(),
+                # A full page is a bulk read, not an interactive call
+                timeout=max(self.timeout, 30)
+            )
+            resp.raise_for_status()
+            page = resp.json()
+            yield page.get('media', []), page.get('outbox_position', 0)
+            after = page.get('next_after')
+
+# Shared client instance, configured by create_app()
+media_client = MediaClient()
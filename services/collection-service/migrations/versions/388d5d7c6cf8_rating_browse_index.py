@@ -0,0 +1,24 @@
+"""Rating browse index
+
+Revision ID: 388d5d7c6cf8
+Revises: 46ee55658e5e
+Create Date: 2026-10-18 04:28:18.009919
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '388d5d7c6cf8'
+down_revision = '46ee55658e5e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_collection_media_user_rating', 'collection_media', ['user_id', 'rating', 'date_added', 'media_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_collection_media_user_rating', table_name='collection_media')
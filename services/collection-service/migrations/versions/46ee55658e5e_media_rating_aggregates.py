@@ -0,0 +1,34 @@
+"""Media rating aggregates
+
+Revision ID: 46ee55658e5e
+Revises: 880954d6e829
+Create Date: 2026-10-18 04:28:07.841938
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '46ee55658e5e'
+down_revision = '880954d6e829'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_rating_aggregate',
+    sa.Column('media_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), nullable=False),
+    sa.Column('rating_2', sa.Integer(), nullable=False),
+    sa.Column('rating_3', sa.Integer(), nullable=False),
+    sa.Column('rating_4', sa.Integer(), nullable=False),
+    sa.Column('rating_5', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('media_id')
+    )
+
+
+def downgrade():
+    op.drop_table('media_rating_aggregate')
@@ -0,0 +1,32 @@
+"""Row versions
+
+Revision ID: 8725abd4c11e
+Revises: d150d1a4adc6
+Create Date: 2026-10-18 04:27:07.681097
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8725abd4c11e'
+down_revision = 'd150d1a4adc6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('collection', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('collection', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('collection_media', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('collection_media', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('collection_media') as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
+    with op.batch_alter_table('collection') as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
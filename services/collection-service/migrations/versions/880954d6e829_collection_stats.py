@@ -0,0 +1,33 @@
+"""Collection stats
+
+Revision ID: 880954d6e829
+Revises: 8faed8ad69d7
+Create Date: 2026-10-18 04:28:00.674989
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '880954d6e829'
+down_revision = '8faed8ad69d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('collection_stats',
+    sa.Column('collection_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('rating_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('last_added', sa.String(length=20), nullable=True),
+    sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    sa.ForeignKeyConstraint(['collection_id'], ['collection.id'], ),
+    sa.PrimaryKeyConstraint('collection_id')
+    )
+
+
+def downgrade():
+    op.drop_table('collection_stats')
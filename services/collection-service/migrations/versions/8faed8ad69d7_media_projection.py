@@ -0,0 +1,40 @@
+"""Media projection
+
+Revision ID: 8faed8ad69d7
+Revises: 8725abd4c11e
+Create Date: 2026-10-18 04:27:43.803309
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8faed8ad69d7'
+down_revision = '8725abd4c11e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_projection',
+    sa.Column('media_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('creator', sa.String(length=255), nullable=True),
+    sa.Column('year', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(length=50), nullable=True),
+    sa.Column('publish_date', sa.String(length=20), nullable=True),
+    sa.Column('cover_url', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('date_added', sa.String(length=32), nullable=True),
+    sa.Column('updated_at', sa.String(length=32), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), server_default=sa.false(), nullable=False),
+    sa.PrimaryKeyConstraint('media_id')
+    )
+
+
+def downgrade():
+    op.drop_table('media_projection')
@@ -0,0 +1,36 @@
+"""Hot query indexes
+
+Revision ID: d150d1a4adc6
+Revises: e933023c56af
+Create Date: 2026-10-18 04:24:46.382218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd150d1a4adc6'
+down_revision = 'e933023c56af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_collection_user_id', 'collection', ['user_id', 'id'], unique=False)
+    # Keep the oldest link of each (collection, media) pair so the unique constraint can be added
+    op.execute(
+        'DELETE FROM collection_media WHERE id NOT IN '
+        '(SELECT id FROM (SELECT MIN(id) AS id FROM collection_media '
+        'GROUP BY collection_id, media_id) AS keep)'
+    )
+    with op.batch_alter_table('collection_media') as batch_op:
+        batch_op.create_unique_constraint('uq_collection_media_collection_media', ['collection_id', 'media_id'])
+        batch_op.create_index('ix_collection_media_media_id', ['media_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('collection_media') as batch_op:
+        batch_op.drop_index('ix_collection_media_media_id')
+        batch_op.drop_constraint('uq_collection_media_collection_media', type_='unique')
+    op.drop_index('ix_collection_user_id', table_name='collection')
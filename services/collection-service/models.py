@@ -10,10 +10,14 @@ Purpose:
   - Defines SQLAlchemy ORM models for user collections and media relationships
   - Supports many-to-many relationships between collections and media items
   - Provides user-specific collection management functionality
+  - Versions every row (updated_at + version counter) for ETags / conditional GET
 
 Major Components:
   - Collection model: Named collections owned by users
   - CollectionMedia model: Many-to-many relationship table with additional metadata
+  - CollectionStats model: Per-collection counters kept current on every link change
+  - MediaProjection model: Local read-model of media-service items (see projection.py)
+  - MediaRatingAggregate model: Community rating count, sum and histogram per media item
 
 Security:
   - All operations use SQLAlchemy ORM to prevent SQL injection
@@ -42,16 +46,27 @@ class Collection(db.Model):
         name (str): Display name of the collection (required)
         description (str): Optional description of the collection's purpose
         date_added (datetime): When the collection was created
+        updated_at (datetime): When the collection last changed
+        version (int): Row version, incremented on every UPDATE (ETags, optimistic locking)
     
     Methods:
         to_dict(): Returns dictionary representation for JSON serialization
     """
     __tablename__ = 'collection'
+    __table_args__ = (
+        # GET /api/collections?user_id=
+        db.Index('ix_collection_user_id', 'user_id', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255))
     date_added = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # The ORM increments 'version' in every UPDATE it issues
+    __mapper_args__ = {'version_id_col': version}
 
     def to_dict(self):
         """
@@ -69,9 +84,66 @@ class Collection(db.Model):
             'user_id': self.user_id,
             'name': self.name,
             'description': self.description,
-            'date_added': self.date_added.isoformat() if self.date_added else None
+            'date_added': self.date_added.isoformat() if self.date_added else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class CollectionStats(db.Model):
+    """
+    Per-collection statistics, maintained incrementally.
+    
+    Updated in the same transaction as every insert, delete or rating
+    change of a CollectionMedia row (see collection_stats.py), so listing
+    collections with their counts never aggregates collection_media.
+    
+    Attributes:
+        collection_id (int): Primary key, the Collection
+        item_count (int): Media items in the collection
+        rating_count (int): Items with a rating
+        rating_sum (int): Sum of those ratings
+        last_added (str): Latest CollectionMedia.date_added (None if empty)
+        version (int): Incremented on every change (part of the list ETag)
+    
+    Methods:
+        to_dict(): Returns the statistics for JSON serialization
+    """
+    __tablename__ = 'collection_stats'
+    collection_id = db.Column(db.Integer, db.ForeignKey('collection.id'), primary_key=True, autoincrement=False)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    last_added = db.Column(db.String(20))
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    def to_dict(self):
+        """
+        Convert the statistics to a dictionary for JSON serialization.
+        
+        Returns:
+            dict: item_count, rating_count, average_rating (None if unrated), last_added
+        
+        Usage:
+            result['stats'] = stats.to_dict()
+        """
+        return stats_dict(self.item_count, self.rating_count, self.rating_sum, self.last_added)
+
+def stats_dict(item_count, rating_count, rating_sum, last_added):
+    """
+    Build the 'stats' object returned with a collection.
+    
+    Shared by CollectionStats.to_dict() and list queries that select the
+    columns directly (a collection without a stats row reports zeros).
+    
+    Returns:
+        dict: item_count, rating_count, average_rating, last_added
+    """
+    return {
+        'item_count': item_count or 0,
+        'rating_count': rating_count or 0,
+        'average_rating': round(rating_sum / rating_count, 2) if rating_count else None,
+        'last_added': last_added
+    }
+
 class CollectionMedia(db.Model):
     """
     Many-to-many relationship table linking collections to media items.
@@ -86,17 +158,37 @@ class CollectionMedia(db.Model):
         user_id (int): Foreign key to user who created this relationship
         date_added (str): String timestamp when media was added to collection
         rating (int): Optional user rating for this media in this collection
+        updated_at (datetime): When the link (e.g. its rating) last changed
+        version (int): Row version, incremented on every UPDATE
     
     Methods:
         to_dict(): Returns dictionary representation for JSON serialization
     """
     __tablename__ = 'collection_media'
+    __table_args__ = (
+        # A media item appears at most once per collection; also serves
+        # GET /api/collection/<id>/media
+        db.UniqueConstraint('collection_id', 'media_id', name='uq_collection_media_collection_media'),
+        # GET /api/collection-media/<media_id>
+        db.Index('ix_collection_media_media_id', 'media_id'),
+        # GET /api/collection-media/by-rating (a user's items, best rated first)
+        db.Index('ix_collection_media_user_rating', 'user_id', 'rating', 'date_added', 'media_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    collection_id = db.Column(db.Integer, db.ForeignKey('collection.id'), nullable=False)
+    # active_history: assigning to an expired link still loads the old value,
+    # which the collection_stats flush hook needs to compute its delta
+    collection_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('collection.id'), nullable=False), active_history=True)
     media_id = db.Column(db.Integer, nullable=False)  # References media-service media.id
     user_id = db.Column(db.Integer, nullable=False)
-    date_added = db.Column(db.String(20), default=lambda: datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'))
-    rating = db.Column(db.Integer)
+    date_added = db.column_property(db.Column(
+        db.String(20), default=lambda: datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')), active_history=True)
+    rating = db.column_property(db.Column(db.Integer), active_history=True)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # The ORM increments 'version' in every UPDATE it issues
+    __mapper_args__ = {'version_id_col': version}
 
     def to_dict(self):
         """
@@ -115,5 +207,114 @@ class CollectionMedia(db.Model):
             'media_id': self.media_id,
             'user_id': self.user_id,
             'date_added': self.date_added,
-            'rating': self.rating
+            'rating': self.rating,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class MediaProjection(db.Model):
+    """
+    Local copy of the media-service fields shown on collection pages.
+    
+    Maintained from media-service's change events (POST /api/internal/media-events)
+    so GET /api/collection/<id>/media is one local join instead of an HTTP
+    fan-out. Deleted items are kept as tombstones so a late, out-of-date
+    event cannot bring them back.
+    
+    Attributes:
+        media_id (int): Primary key, the media-service media.id
+        user_id (int): Owner of the media item
+        title, creator, type, publish_date, cover_url, status (str): Media fields
+        year (int): Year of release/creation
+        date_added, updated_at (str): ISO timestamps as sent by media-service
+        version (int): media-service row version this copy reflects
+        last_event_id (int): Highest outbox event applied (idempotency key)
+        deleted (bool): Tombstone; the item no longer exists in media-service
+    
+    Methods:
+        to_dict(): Same shape as media-service's Media.to_dict()
+    """
+    __tablename__ = 'media_projection'
+    media_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=True)
+    title = db.Column(db.String(255))
+    creator = db.Column(db.String(255))
+    year = db.Column(db.Integer)
+    type = db.Column(db.String(50))
+    publish_date = db.Column(db.String(20))
+    cover_url = db.Column(db.String(255))
+    status = db.Column(db.String(20))
+    date_added = db.Column(db.String(32))
+    updated_at = db.Column(db.String(32))
+    version = db.Column(db.Integer)
+    last_event_id = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    def to_dict(self):
+        """
+        Convert the projected item to the dictionary media-service would return.
+        
+        Returns:
+            dict: id, user_id, title, creator, year, type, publish_date,
+                  cover_url, status, date_added, updated_at
+        
+        Usage:
+            media_list.append(projected.to_dict())
+        """
+        return {
+            'id': self.media_id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'creator': self.creator,
+            'year': self.year,
+            'type': self.type,
+            'publish_date': self.publish_date,
+            'cover_url': self.cover_url,
+            'status': self.status,
+            'date_added': self.date_added,
+            'updated_at': self.updated_at
+        }
+
+class MediaRatingAggregate(db.Model):
+    """
+    Community rating of a media item across every user, maintained incrementally.
+    
+    Each user counts once per media item, with their highest rating across
+    collections (the same rule as GET /api/collection-media/ratings).
+    Updated in the same transaction as every rating write (see
+    rating_aggregates.py), so reading an item's aggregate is one primary
+    key lookup however many ratings it has.
+    
+    Attributes:
+        media_id (int): Primary key, the media-service media.id
+        rating_count (int): Users who rated the item
+        rating_sum (int): Sum of their ratings
+        rating_1 .. rating_5 (int): Histogram of ratings 1 to 5
+    
+    Methods:
+        to_dict(): Returns count, average and histogram for JSON serialization
+    """
+    __tablename__ = 'media_rating_aggregate'
+    media_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """
+        Convert the aggregate to a dictionary for JSON serialization.
+        
+        Returns:
+            dict: count, average (None if unrated), histogram ({'1': n, ..., '5': n})
+        
+        Usage:
+            aggregates[str(agg.media_id)] = agg.to_dict()
+        """
+        return {
+            'count': self.rating_count,
+            'average': round(self.rating_sum / self.rating_count, 2) if self.rating_count else None,
+            'histogram': {str(star): getattr(self, f'rating_{star}') for star in range(1, 6)}
         }
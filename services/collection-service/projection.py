@@ -0,0 +1,171 @@
+"""
+====================================================================================
+projection.py - Media Projection (Local Read-Model) for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Keeps a local copy of the media-service fields shown on collection pages
+    (MediaProjection), so GET /api/collection/<id>/media is answered by one
+    local join and keeps working while media-service is slow or down
+  - Applies media-service's outbox events idempotently: every row remembers
+    the last event ID applied, so redelivered or replayed events are skipped,
+    and row versions stop an older state from overwriting a newer one
+  - Rebuilds the projection from media-service's full media feed
+
+Major Functions:
+  - validate_events: Check the shape of an incoming event batch
+  - apply_media_events: Apply a batch of events to the projection
+  - rebuild_media_projection: Reconcile the projection with a full snapshot
+
+Usage:
+  - POST /api/internal/media-events (called by media-service's 'flask relay-outbox')
+  - flask rebuild-media-projection
+
+====================================================================================
+"""
+
+from app import db
+from models import MediaProjection
+
+# Media fields copied from events and snapshots into the projection
+PROJECTED_FIELDS = ('user_id', 'title', 'creator', 'year', 'type', 'publish_date',
+                    'cover_url', 'status', 'date_added', 'updated_at')
+
+# Media IDs per IN (...) query when loading or tombstoning projection rows
+_CHUNK = 500
+
+def validate_events(events):
+    """
+    Check that an event batch is well formed.
+
+    Parameters:
+        events: Decoded 'events' value from the request body
+
+    Returns:
+        str or None: Error message, or None if the batch is valid
+    """
+    if not isinstance(events, list):
+        return 'events must be a list'
+    for e in events:
+        if not isinstance(e, dict) or not isinstance(e.get('id'), int) or not isinstance(e.get('media_id'), int):
+            return 'every event needs integer id and media_id'
+        if e.get('type') == 'upsert':
+            if not isinstance(e.get('media'), dict) or not isinstance(e.get('version'), int):
+                return f"upsert event {e['id']} needs media and version"
+        elif e.get('type') != 'delete':
+            return f"event {e['id']} has unknown type {e.get('type')!r}"
+    return None
+
+def _load_rows(media_ids):
+    """Return {media_id: MediaProjection} for the rows that exist."""
+    media_ids = list(media_ids)
+    rows = {}
+    for start in range(0, len(media_ids), _CHUNK):
+        chunk = media_ids[start:start + _CHUNK]
+        rows.update({row.media_id: row for row in MediaProjection.query.filter(MediaProjection.media_id.in_(chunk))})
+    return rows
+
+def _copy_fields(row, media, version):
+    """Overwrite a projection row with a media dict at the given version."""
+    for field in PROJECTED_FIELDS:
+        setattr(row, field, media.get(field))
+    row.version = version
+    row.deleted = False
+
+def apply_media_events(events):
+    """
+    Apply outbox events to the projection (the caller commits).
+
+    An event whose ID is not above the row's last_event_id was applied
+    before and is skipped. An upsert older than the stored version (the
+    row was refreshed by a rebuild meanwhile) only advances last_event_id.
+
+    Parameters:
+        events (list[dict]): Validated events ({'id', 'media_id', 'type', 'version', 'media'})
+
+    Returns:
+        tuple: (applied, skipped, media_ids)
+            applied (int): Events that changed the projection
+            skipped (int): Duplicate or outdated events
+            media_ids (list[int]): Items whose projected state changed
+    """
+    rows = _load_rows({e['media_id'] for e in events})
+    applied = 0
+    skipped = 0
+    changed = set()
+    for e in sorted(events, key=lambda e: e['id']):
+        row = rows.get(e['media_id'])
+        if row is not None and row.last_event_id >= e['id']:
+            skipped += 1
+            continue
+        if row is None:
+            row = MediaProjection(media_id=e['media_id'], last_event_id=0, deleted=False)
+            db.session.add(row)
+            rows[e['media_id']] = row
+        row.last_event_id = e['id']
+
+        if e['type'] == 'delete':
+            row.deleted = True
+        elif not row.deleted and row.version is not None and e['version'] < row.version:
+            skipped += 1
+            continue
+        else:
+            _copy_fields(row, e['media'], e['version'])
+        applied += 1
+        changed.add(e['media_id'])
+    return applied, skipped, sorted(changed)
+
+def rebuild_media_projection(pages):
+    """
+    Reconcile the projection with a full snapshot of media-service.
+
+    Every snapshot item is written unless the projection already holds a
+    newer version, and every projected item missing from the snapshot is
+    tombstoned, unless an event newer than the snapshot touched it. Events
+    delivered while the rebuild runs are therefore never undone, so the
+    relay can keep running. Commits once per page.
+
+    Parameters:
+        pages (iterable): (media_list, outbox_position) pairs from
+            media_client.iter_media_feed(); media dicts include 'version'
+
+    Returns:
+        tuple: (written, tombstoned)
+    """
+    position = None
+    seen = set()
+    written = 0
+    for media_list, outbox_position in pages:
+        if position is None:
+            position = outbox_position
+        rows = _load_rows(media['id'] for media in media_list)
+        for media in media_list:
+            seen.add(media['id'])
+            row = rows.get(media['id'])
+            if row is None:
+                row = MediaProjection(media_id=media['id'], last_event_id=0)
+                db.session.add(row)
+            elif row.version is not None and not row.deleted and row.version > media['version']:
+                continue
+            _copy_fields(row, media, media['version'])
+            row.last_event_id = max(row.last_event_id, position)
+            written += 1
+        db.session.commit()
+
+    if position is None:
+        return 0, 0
+    stale_ids = [
+        media_id for (media_id,) in db.session.query(MediaProjection.media_id).filter(
+            MediaProjection.deleted.is_(False),
+            MediaProjection.last_event_id <= position
+        )
+        if media_id not in seen
+    ]
+    for start in range(0, len(stale_ids), _CHUNK):
+        MediaProjection.query.filter(MediaProjection.media_id.in_(stale_ids[start:start + _CHUNK])) \
+            .update({'deleted': True}, synchronize_session=False)
+    db.session.commit()
+    return written, len(stale_ids)
@@ -0,0 +1,153 @@
+"""
+====================================================================================
+query_plans.py - Query Plan Regression Checks for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Guards the indexes declared in models.py against regressions
+  - Runs EXPLAIN QUERY PLAN for the queries behind every collection route on SQLite
+  - Fails if a hot query falls back to a full table scan or a sort of all rows
+
+Major Functions:
+  - hot_queries: The statements issued by routes.py, with representative parameters
+  - explain: EXPLAIN QUERY PLAN for one statement on a SQLite connection
+  - regressions: The plan steps that scan a whole table or sort every row
+  - check_query_plans: Builds the schema in memory and explains every hot query
+
+Usage:
+  - flask check-query-plans   (exits non-zero if any plan regresses)
+  - Add a statement to hot_queries() whenever a route gains a new query
+  - tests/test_query_plans.py runs the same checks against the migrated schema
+
+====================================================================================
+"""
+
+import re
+
+from sqlalchemy import create_engine, func, select, tuple_
+
+from app import db
+from models import Collection, CollectionMedia, CollectionStats, MediaProjection, MediaRatingAggregate
+from routes import _ranked_links
+
+# Plan details that mean a query reads every row of a table
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (COVERING )?INDEX)')
+_SORTS_ALL_ROWS = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)')
+
+def hot_queries():
+    """
+    Return the queries issued by the collection routes.
+
+    Returns:
+        list[tuple[str, Executable]]: (description, statement) pairs
+    """
+    return [
+        ('GET /api/collections/<id>', select(Collection).where(Collection.id == 1)),
+        ('GET /api/collections/<id> (ETag check)',
+         select(Collection.user_id, Collection.version).where(Collection.id == 1)),
+        ('GET /api/collections?user_id=',
+         select(Collection, CollectionStats)
+         .outerjoin(CollectionStats, CollectionStats.collection_id == Collection.id)
+         .where(Collection.user_id == 1).order_by(Collection.id)),
+        ('GET /api/collection/<id>/media',
+         select(CollectionMedia.media_id, CollectionMedia.user_id, MediaProjection)
+         .outerjoin(MediaProjection, MediaProjection.media_id == CollectionMedia.media_id)
+         .where(CollectionMedia.collection_id == 1)),
+        ('POST /api/internal/media-events',
+         select(MediaProjection).where(MediaProjection.media_id.in_([1, 2, 3]))),
+        ('GET /api/collection-media/<media_id> (links)',
+         select(CollectionMedia).where(CollectionMedia.media_id == 1)),
+        ('GET /api/collection-media/<media_id> (collections)',
+         select(Collection).where(Collection.id.in_([1, 2, 3]))),
+        ('GET /api/collection-media/ratings',
+         select(CollectionMedia.media_id, func.max(CollectionMedia.rating)).where(
+             CollectionMedia.user_id == 1, CollectionMedia.media_id.in_([1, 2, 3]),
+             CollectionMedia.rating.isnot(None)).group_by(CollectionMedia.media_id)),
+        ('GET /api/collection-media?media_ids=',
+         select(CollectionMedia.media_id, Collection.id, Collection.name, Collection.description)
+         .join(Collection, Collection.id == CollectionMedia.collection_id)
+         .where(CollectionMedia.media_id.in_([1, 2, 3]), Collection.user_id == 1)),
+        ('POST /api/collection-media (existing links)',
+         select(CollectionMedia.collection_id).where(
+             CollectionMedia.media_id == 1, CollectionMedia.collection_id.in_([1, 2, 3]))),
+        ('collection_stats update (last_added after a removal)',
+         select(func.max(CollectionMedia.date_added)).where(CollectionMedia.collection_id == 1)),
+        ('GET /api/collection-media/by-rating (rated)',
+         _ranked_links(1, rated=True).where(
+             tuple_(CollectionMedia.rating, CollectionMedia.date_added, CollectionMedia.media_id) < tuple_(5, '2025', 1))
+         .order_by(CollectionMedia.rating.desc(), CollectionMedia.date_added.desc(), CollectionMedia.media_id.desc())
+         .limit(51)),
+        ('GET /api/collection-media/by-rating (unrated)',
+         _ranked_links(1, rated=False)
+         .order_by(CollectionMedia.date_added.desc(), CollectionMedia.media_id.desc()).limit(51)),
+        ('GET /api/collection-media/rating-aggregates',
+         select(MediaRatingAggregate).where(MediaRatingAggregate.media_id.in_([1, 2, 3]))),
+        ('rating aggregate update (users\' ratings before/after a flush)',
+         select(CollectionMedia.user_id, CollectionMedia.media_id, func.max(CollectionMedia.rating)).where(
+             CollectionMedia.media_id.in_([1, 2, 3]), CollectionMedia.user_id.in_([1, 2]),
+             CollectionMedia.rating.isnot(None)).group_by(CollectionMedia.user_id, CollectionMedia.media_id)),
+        ('flask recompute-rating-aggregates (media IDs)',
+         select(CollectionMedia.media_id).where(CollectionMedia.media_id > 0)
+         .group_by(CollectionMedia.media_id).order_by(CollectionMedia.media_id).limit(1000)),
+        ('flask repair-collection-stats',
+         select(CollectionMedia.collection_id, func.count(CollectionMedia.id), func.max(CollectionMedia.date_added))
+         .where(CollectionMedia.collection_id >= 1, CollectionMedia.collection_id <= 1000)
+         .group_by(CollectionMedia.collection_id)),
+    ]
+
+def explain(conn, stmt):
+    """
+    Run EXPLAIN QUERY PLAN for a statement on a SQLite connection.
+
+    Parameters:
+        conn (Connection): Open connection to a SQLite database with the schema
+        stmt (Executable): Statement from hot_queries()
+
+    Returns:
+        list[str]: The detail column of every plan row
+    """
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    positional = tuple(params[key] for key in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', positional)]
+
+def regressions(name, plan):
+    """
+    Return the plan steps that read every row of a table or sort every row.
+
+    Parameters:
+        name (str): Description of the query (from hot_queries())
+        plan (list[str]): Output of explain()
+
+    Returns:
+        list[str]: Offending steps (empty if the plan uses indexes)
+    """
+    return [step for step in plan if _FULL_SCAN.search(step) or _SORTS_ALL_ROWS.search(step)]
+
+def check_query_plans(echo=print):
+    """
+    Explain every hot query against an in-memory SQLite copy of the schema.
+
+    Parameters:
+        echo (callable): Receives one report line per query
+
+    Returns:
+        list[str]: Descriptions of queries whose plan regressed (empty if all pass)
+    """
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    failures = []
+
+    with engine.connect() as conn:
+        for name, stmt in hot_queries():
+            plan = explain(conn, stmt)
+            bad = regressions(name, plan)
+            echo(f"{'FAIL' if bad else 'ok  '} {name}: {'; '.join(plan)}")
+            if bad:
+                failures.append(name)
+
+    engine.dispose()
+    return failures
@@ -0,0 +1,236 @@
+"""
+====================================================================================
+rating_aggregates.py - Community Rating Aggregates for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Keeps one media_rating_aggregate row per rated media item (rating count,
+    sum and a 1-5 histogram over every user) current in the same transaction
+    as every rating write, so community averages are read by primary key
+    instead of a GROUP BY over collection_media
+  - A user counts once per item, with their highest rating across
+    collections; each flush compares the affected users' ratings before and
+    after it and applies the difference as relative UPDATEs
+  - Recomputes the table in bulk, in media ID chunks
+
+Major Functions:
+  - init_app: Hook the session so every flush updates the affected aggregates
+  - get_rating_aggregates: Aggregates for many media items (one IN query per chunk)
+  - recompute_rating_aggregates: Rebuild every aggregate from collection_media
+
+Usage:
+  - rating_aggregates.init_app(app) in create_app(); nothing else is needed on the write path
+  - GET /api/collection-media/rating-aggregates?media_ids=10,11
+  - flask recompute-rating-aggregates
+  - Bulk Query.update()/delete() on CollectionMedia bypasses the hooks; run
+    the recompute command after such writes
+
+====================================================================================
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, select, update
+
+from app import db
+from models import CollectionMedia, MediaRatingAggregate
+
+# Media IDs per IN (...) query
+_CHUNK = 500
+
+# Histogram buckets; ratings outside them still count towards count and sum
+STARS = (1, 2, 3, 4, 5)
+
+def _user_ratings(pairs):
+    """
+    Return {(user_id, media_id): highest rating} for the given pairs as the database has them now.
+
+    Pairs without a rating are left out.
+    """
+    pairs = set(pairs)
+    ratings = {}
+    media_ids = sorted({media_id for _, media_id in pairs})
+    user_ids = sorted({user_id for user_id, _ in pairs})
+    for start in range(0, len(media_ids), _CHUNK):
+        rows = db.session.execute(
+            select(CollectionMedia.user_id, CollectionMedia.media_id, func.max(CollectionMedia.rating))
+            .where(CollectionMedia.media_id.in_(media_ids[start:start + _CHUNK]),
+                   CollectionMedia.user_id.in_(user_ids),
+                   CollectionMedia.rating.isnot(None))
+            .group_by(CollectionMedia.user_id, CollectionMedia.media_id)
+        )
+        ratings.update({(user_id, media_id): rating for user_id, media_id, rating in rows
+                        if (user_id, media_id) in pairs})
+    return ratings
+
+def _aggregate(media_filter):
+    """SELECT computing the aggregate columns from collection_media for matching media items."""
+    per_user = select(
+        CollectionMedia.media_id,
+        func.max(CollectionMedia.rating).label('rating')
+    ).where(CollectionMedia.rating.isnot(None), media_filter) \
+        .group_by(CollectionMedia.media_id, CollectionMedia.user_id).subquery()
+    return select(
+        per_user.c.media_id,
+        func.count(),
+        func.sum(per_user.c.rating),
+        *[func.sum(case((per_user.c.rating == star, 1), else_=0)) for star in STARS]
+    ).group_by(per_user.c.media_id)
+
+# Columns filled by _aggregate(), in its select order
+_AGGREGATE_COLUMNS = ['media_id', 'rating_count', 'rating_sum'] + [f'rating_{star}' for star in STARS]
+
+def _pair(user_id, media_id):
+    """(user_id, media_id) as integers, matching what the database returns."""
+    return int(user_id), int(media_id)
+
+def _snapshot_ratings(session, flush_context, instances):
+    """before_flush: record the current rating of every (user, media) pair this flush may change."""
+    pairs = set()
+    for obj in session.new:
+        if isinstance(obj, CollectionMedia) and obj.rating is not None:
+            pairs.add(_pair(obj.user_id, obj.media_id))
+    for obj in session.deleted:
+        if isinstance(obj, CollectionMedia) and obj.rating is not None:
+            pairs.add(_pair(obj.user_id, obj.media_id))
+    for obj in session.dirty:
+        if not isinstance(obj, CollectionMedia):
+            continue
+        attrs = inspect(obj).attrs
+        histories = [attrs.user_id.history, attrs.media_id.history, attrs.rating.history]
+        if not any(h.has_changes() for h in histories):
+            continue
+        pairs.add(_pair(obj.user_id, obj.media_id))
+        user_ids = attrs.user_id.history.deleted or [obj.user_id]
+        media_ids = attrs.media_id.history.deleted or [obj.media_id]
+        pairs.add(_pair(user_ids[0], media_ids[0]))
+    if pairs:
+        session.info['rating_aggregate_before'] = (pairs, _user_ratings(pairs))
+
+def _apply_changes(session, flush_context):
+    """after_flush: apply the change in each affected user's rating to the aggregates."""
+    snapshot = session.info.pop('rating_aggregate_before', None)
+    if snapshot is None:
+        return
+    pairs, before = snapshot
+    after = _user_ratings(pairs)
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    for user_id, media_id in pairs:
+        old, new = before.get((user_id, media_id)), after.get((user_id, media_id))
+        if old == new:
+            continue
+        delta = deltas[media_id]
+        for rating, sign in ((old, -1), (new, 1)):
+            if rating is None:
+                continue
+            delta['rating_count'] += sign
+            delta['rating_sum'] += sign * rating
+            if rating in STARS:
+                delta[f'rating_{rating}'] += sign
+
+    for media_id, delta in sorted(deltas.items()):
+        changes = {column: value for column, value in delta.items() if value}
+        if not changes:
+            continue
+        result = session.execute(
+            update(MediaRatingAggregate)
+            .where(MediaRatingAggregate.media_id == media_id)
+            .values({column: getattr(MediaRatingAggregate, column) + value for column, value in changes.items()}),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount == 0:
+            # No row yet (first rating, or ratings written before this table
+            # existed): compute it from collection_media, which holds this flush
+            session.execute(insert(MediaRatingAggregate).from_select(
+                _AGGREGATE_COLUMNS, _aggregate(CollectionMedia.media_id == media_id)
+            ))
+
+def _discard_snapshot(session, previous_transaction):
+    """after_soft_rollback: a failed flush leaves no snapshot behind."""
+    session.info.pop('rating_aggregate_before', None)
+
+def init_app(app):
+    """
+    Maintain media_rating_aggregate with every flush that writes ratings.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    for name, handler in (('before_flush', _snapshot_ratings),
+                          ('after_flush', _apply_changes),
+                          ('after_soft_rollback', _discard_snapshot)):
+        if not event.contains(db.session, name, handler):
+            event.listen(db.session, name, handler)
+
+def get_rating_aggregates(media_ids):
+    """
+    Look up the aggregates of many media items.
+
+    Parameters:
+        media_ids (list[int]): Media IDs
+
+    Returns:
+        dict: media_id -> MediaRatingAggregate (items nobody rated are omitted)
+    """
+    found = {}
+    for start in range(0, len(media_ids), _CHUNK):
+        chunk = media_ids[start:start + _CHUNK]
+        found.update({row.media_id: row for row in MediaRatingAggregate.query.filter(
+            MediaRatingAggregate.media_id.in_(chunk), MediaRatingAggregate.rating_count > 0)})
+    return found
+
+def recompute_rating_aggregates(batch_size=1000):
+    """
+    Rebuild media_rating_aggregate from collection_media.
+
+    Walks the media IDs present in collection_media in chunks of batch_size,
+    committing after each chunk. Each chunk covers the whole ID range since
+    the previous one, so aggregates of items that lost all their ratings
+    are deleted too. Rows that already match are left alone.
+
+    Parameters:
+        batch_size (int): Media items per aggregate query and commit
+
+    Returns:
+        tuple: (checked, fixed, created, deleted)
+    """
+    checked = fixed = created = deleted = 0
+    after = 0
+    while True:
+        media_ids = [row[0] for row in db.session.execute(
+            select(CollectionMedia.media_id).where(CollectionMedia.media_id > after)
+            .group_by(CollectionMedia.media_id).order_by(CollectionMedia.media_id).limit(batch_size)
+        )]
+        # The last pass covers every stored row above the highest rated item
+        in_range = [MediaRatingAggregate.media_id > after]
+        if media_ids:
+            in_range.append(MediaRatingAggregate.media_id <= media_ids[-1])
+
+        actual = {row[0]: dict(zip(_AGGREGATE_COLUMNS, row)) for row in db.session.execute(
+            _aggregate(and_(CollectionMedia.media_id > after, CollectionMedia.media_id <= media_ids[-1]))
+        )} if media_ids else {}
+        stored = {row.media_id: row for row in MediaRatingAggregate.query.filter(*in_range)}
+
+        for media_id, values in actual.items():
+            checked += 1
+            row = stored.pop(media_id, None)
+            if row is None:
+                db.session.add(MediaRatingAggregate(**values))
+                created += 1
+            elif any(getattr(row, column) != value for column, value in values.items()):
+                for column, value in values.items():
+                    setattr(row, column, value)
+                fixed += 1
+        if stored:
+            db.session.execute(delete(MediaRatingAggregate).where(MediaRatingAggregate.media_id.in_(list(stored))))
+            deleted += len(stored)
+        db.session.commit()
+
+        if not media_ids:
+            break
+        after = media_ids[-1]
+    return checked, fixed, created, deleted
@@ -13,18 +13,34 @@ Purpose:
   - Supports user-specific collection organization with flexible metadata
 
 Major Endpoints:
-  - GET /api/collections: List user's collections
+  - GET /api/collections: List user's collections with their item counts and ratings
   - POST /api/collections: Create new collection
   - GET /api/collections/<id>: Get collection details
   - PUT /api/collection/<id>: Update collection
   - GET /api/collection/<id>/media: Get media in collection
   - POST /api/collection-media: Link media to collections
+  - GET /api/collection-media/ratings: Batch rating lookup for a user's media
+  - GET /api/collection-media/rating-aggregates: Community rating of many media items
+  - GET /api/collection-media/by-rating: A user's media IDs, best rated first (keyset pages)
+  - GET /api/collection-media?media_ids=: Batch collection membership for media items
+  - POST /api/internal/media-invalidate: media-service push of changed media IDs
+  - POST /api/internal/media-events: media-service outbox events for the media projection
+  - GET /api/internal/media-cache/stats: Media summary cache counters (for sizing)
 
 Security:
   - Input validation on all endpoints
   - SQLAlchemy ORM prevents SQL injection
   - User ID filtering ensures data isolation
-  - Cross-service communication via HTTP requests
+  - Collection reads carry strong ETags and answer If-None-Match with 304
+    (checked against row versions before the collections are loaded)
+  - Every user-scoped request needs an access token, and may only touch
+    that user's data
+    (verified locally by sortedshelf_common/auth_tokens.py, 403 otherwise)
+  - Cross-service communication via the pooled client in media_client.py
+    (media objects are cached; media-service pushes invalidations)
+  - Collection pages read media fields from the local projection (projection.py),
+    falling back to media-service only for items not projected yet
+  - /api/internal/ endpoints require the service token (sortedshelf_common/auth_tokens.py)
 
 Usage:
   - Registered as blueprint in app.py
@@ -34,9 +50,21 @@ Usage:
 ====================================================================================
 """
 
-from flask import Blueprint, request, jsonify
+import base64
+import json
+
+from flask import Blueprint, request, jsonify, g
+from sqlalchemy import and_, exists, func, or_, select, tuple_
+from sqlalchemy.orm import aliased, load_only
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from sortedshelf_common.auth_tokens import forbid_other_user, require_token
+from sortedshelf_common.conditional import etag_for, etag_for_rows, not_modified, with_etag
+from sortedshelf_common.json_provider import parse_fields, pick_fields, row_serializer
 from app import db
-from models import Collection, CollectionMedia
+from models import Collection, CollectionMedia, CollectionStats, MediaProjection, stats_dict
+from media_cache import media_summary_cache
+from media_client import media_client
 
 bp = Blueprint('routes', __name__)
 
@@ -58,6 +86,7 @@ def update_collection(collection_id):
         200: Success message
         400: No fields to update
         404: Collection not found
+        409: The collection was changed by another request at the same time
         500: Database error
     
     Usage:
@@ -67,6 +96,9 @@ def update_collection(collection_id):
     col = Collection.query.get(collection_id)
     if not col:
         return jsonify({'success': False, 'error': 'Collection not found'}), 404
+    denied = forbid_other_user(col.user_id)
+    if denied:
+        return denied
     
     data = request.get_json()
     updated = False
@@ -84,54 +116,101 @@ def update_collection(collection_id):
     try:
         db.session.commit()
         return jsonify({'success': True, 'message': 'Collection updated'}), 200
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Collection was modified by another request, please retry'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Media fields a client may request with ?fields= (the keys of MediaProjection.to_dict())
+MEDIA_READ_FIELDS = ('id', 'user_id', 'title', 'creator', 'year', 'type', 'publish_date',
+                     'cover_url', 'status', 'date_added', 'updated_at')
+
+# Media fields whose MediaProjection attribute has another name
+PROJECTION_ATTRS = {'id': 'media_id'}
+
 @bp.route('/api/collection/<int:collection_id>/media', methods=['GET'])
 def get_collection_media(collection_id):
     """
     Get all media items linked to a specific collection.
     
-    Fetches collection-media relationships and retrieves full media details
-    from the media-service via HTTP requests.
+    Joins the collection's links to the local media projection, which
+    media-service keeps current through its outbox events, so a normal
+    page is one local query. Items not projected yet (e.g. before the
+    first rebuild) are fetched through the shared media client: cached
+    items are served from memory and only the misses call media-service,
+    batched and concurrent under one deadline.
     
     Parameters:
         collection_id (int): ID of the collection
     
+    Query Parameters:
+        fields (str): Comma-separated media fields to return, e.g.
+                      "id,title,cover_url" (optional); only those projection
+                      columns are loaded
+    
     Returns:
-        200: JSON with 'media' array containing full media objects
+        200: JSON with 'media' array containing full media objects (or the requested fields)
         Includes 'warnings' array if some media items couldn't be fetched
+        400: Unknown field in fields
+        401: No access token
+        403: The collection belongs to another user
+        404: Collection not found
     
     Usage:
         GET /api/collection/123/media
+        GET /api/collection/123/media?fields=id,title,cover_url
         Returns: {"success": true, "media": [...], "warnings": [...]}
     """
-    from models import CollectionMedia
+    try:
+        fields = parse_fields(request.args.get('fields'), MEDIA_READ_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    # Get all media links for this collection
-    links = CollectionMedia.query.filter_by(collection_id=collection_id).all()
+    # Ownership comes from the collection itself, never from its links
+    owner = db.session.query(Collection.user_id).filter(Collection.id == collection_id).scalar()
+    if owner is None:
+        return jsonify({'success': False, 'error': 'Collection not found'}), 404
+    denied = forbid_other_user(owner)
+    if denied:
+        return denied
+    
+    # Media links for this collection with their projected media fields
+    query = db.session.query(CollectionMedia.media_id, CollectionMedia.user_id, MediaProjection).outerjoin(
+        MediaProjection, MediaProjection.media_id == CollectionMedia.media_id
+    ).filter(CollectionMedia.collection_id == collection_id)
+    if fields is not None:
+        # Owner and tombstone are needed for the visibility check below
+        attrs = {PROJECTION_ATTRS.get(field, field) for field in fields} | {'user_id', 'deleted'}
+        query = query.options(load_only(*[getattr(MediaProjection, attr) for attr in sorted(attrs)]))
+    links = query.all()
     media_list = []
-    errors = []
     
     if not links:
         return jsonify({'success': True, 'media': []}), 200
     
-    # Fetch media details from media-service for each linked media item
-    import requests
-    for link in links:
-        try:
-            resp = requests.get(f'http://localhost:5002/api/media/{link.media_id}', timeout=2)
-            if resp.status_code == 200:
-                media = resp.json().get('media')
-                if media:
-                    media_list.append(media)
-                else:
-                    errors.append(f"No media found for media_id {link.media_id}")
+    found = {}
+    errors = []
+    auth_user_id = g.get('auth_user_id')
+    unprojected = [media_id for media_id, _, projected in links if projected is None]
+    if unprojected:
+        # Not in the projection yet: summary cache, misses from media-service
+        found, errors = media_client.get_media_summaries(unprojected)
+        found = {media_id: pick_fields(media, fields) for media_id, media in found.items()}
+    for media_id, _, projected in links:
+        if projected is not None and not projected.deleted and projected.user_id == auth_user_id:
+            if fields is None:
+                found[media_id] = projected.to_dict()
             else:
-                errors.append(f"Media-service returned status {resp.status_code} for media_id {link.media_id}")
-        except Exception as e:
-            errors.append(f"Exception for media_id {link.media_id}: {str(e)}")
+                found[media_id] = {field: getattr(projected, PROJECTION_ATTRS.get(field, field)) for field in fields}
+    
+    # Preserve link order; report ids that no longer exist (or are not visible)
+    for media_id, _, _ in links:
+        if media_id not in found:
+            errors.append(f"No media found for media_id {media_id}")
+        elif found[media_id] is not None:
+            media_list.append(found[media_id])
     
     result = {'success': True, 'media': media_list}
     if errors:
@@ -139,6 +218,38 @@ def get_collection_media(collection_id):
     
     return jsonify(result), 200
 
+def _collection_response(collection_id):
+    """
+    Build the single-collection response shared by both GET endpoints.
+    
+    The (owner, version) pair is read first so a matching If-None-Match
+    is answered with 304 before the collection itself is loaded; then only
+    the requested columns are selected (?fields=, default DEFAULT_FIELDS).
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), READ_FIELDS) or DEFAULT_FIELDS
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    head = db.session.query(Collection.user_id, Collection.version).filter(Collection.id == collection_id).first()
+    if not head:
+        return jsonify({'success': False, 'error': 'Collection not found'}), 404
+    denied = forbid_other_user(head.user_id)
+    if denied:
+        return denied
+    variant = () if fields == DEFAULT_FIELDS else (','.join(fields),)
+    cached = not_modified(etag_for('collection', collection_id, head.version, *variant))
+    if cached:
+        return cached
+    
+    columns, serialize = row_serializer(Collection, fields)
+    row = db.session.query(*columns, Collection.version).filter(Collection.id == collection_id).first()
+    if not row:
+        return jsonify({'success': False, 'error': 'Collection not found'}), 404
+    
+    response = jsonify({'success': True, 'collection': serialize(row)})
+    return with_etag(response, etag_for('collection', collection_id, row.version, *variant)), 200
+
 @bp.route('/api/collection/<int:collection_id>', methods=['GET'])
 def get_collection(collection_id):
     """
@@ -150,25 +261,20 @@ def get_collection(collection_id):
     Parameters:
         collection_id (int): ID of the collection
     
+    Query Parameters:
+        fields (str): Comma-separated fields to return, e.g. "id,name" (optional)
+    
     Returns:
-        200: JSON with collection details
+        200: JSON with collection details and a strong ETag
+        304: Not modified (If-None-Match matched the current ETag)
+        400: Unknown field in fields
         404: Collection not found
     
     Usage:
         GET /api/collection/123
         Returns: {"success": true, "collection": {"id": 123, "name": "...", ...}}
     """
-    col = Collection.query.get(collection_id)
-    if not col:
-        return jsonify({'success': False, 'error': 'Collection not found'}), 404
-    
-    result = {
-        'id': col.id,
-        'name': col.name,
-        'description': col.description,
-        'date_added': col.date_added.isoformat() if hasattr(col, 'date_added') and col.date_added else None
-    }
-    return jsonify({'success': True, 'collection': result}), 200
+    return _collection_response(collection_id)
 
 @bp.route('/api/collections/<int:collection_id>', methods=['GET'])
 def get_collection_new(collection_id):
@@ -181,59 +287,99 @@ def get_collection_new(collection_id):
     Parameters:
         collection_id (int): ID of the collection
     
+    Query Parameters:
+        fields (str): Comma-separated fields to return, e.g. "id,name" (optional)
+    
     Returns:
-        200: JSON with collection details
+        200: JSON with collection details and a strong ETag
+        304: Not modified (If-None-Match matched the current ETag)
+        400: Unknown field in fields
         404: Collection not found
     
     Usage:
         GET /api/collections/123
         Returns: {"success": true, "collection": {"id": 123, "name": "...", ...}}
     """
-    col = Collection.query.get(collection_id)
-    if not col:
-        return jsonify({'success': False, 'error': 'Collection not found'}), 404
-    
-    result = {
-        'id': col.id,
-        'name': col.name,
-        'description': col.description,
-        'date_added': col.date_added.isoformat() if hasattr(col, 'date_added') and col.date_added else None
-    }
-    return jsonify({'success': True, 'collection': result}), 200
+    return _collection_response(collection_id)
+
+# Collection fields a client may request with ?fields= (the keys of Collection.to_dict())
+READ_FIELDS = ('id', 'user_id', 'name', 'description', 'date_added', 'updated_at')
+
+# Fields of a collection when no ?fields= is given (lists add 'stats')
+DEFAULT_FIELDS = ('id', 'name', 'description', 'date_added', 'updated_at')
 
 @bp.route('/api/collections', methods=['GET'])
 def list_collections():
     """
     List all collections for a specific user.
     
-    Returns user-specific collections with basic information.
+    Returns user-specific collections with basic information and their
+    statistics (from collection_stats, kept current on every write), in a
+    single query over the collection and stats indexes.
     Used by frontend to display collection lists and navigation.
     
     Query Parameters:
         user_id (int): ID of the user whose collections to retrieve (required)
+        fields (str): Comma-separated fields to return, from the collection
+                      fields and 'stats' (optional); only those columns are
+                      selected, and stats are not joined unless requested
     
     Returns:
-        200: JSON with 'collections' array
-        400: Missing user_id parameter
+        200: JSON with 'collections' array and a strong ETag
+        304: Not modified (If-None-Match matched the current ETag)
+        400: Missing user_id parameter or unknown field
     
     Usage:
         GET /api/collections?user_id=123
-        Returns: {"success": true, "collections": [...]}
+        GET /api/collections?user_id=123&fields=id,name
+        Returns: {"success": true, "collections": [{"id": 1, "name": "...",
+                  "stats": {"item_count": 12, "rating_count": 4, "average_rating": 4.25,
+                            "last_added": "2025-01-02 10:00:00"}}, ...]}
     """
     user_id = request.args.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'error': 'user_id required'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
     
-    collections = Collection.query.filter_by(user_id=user_id).all()
-    result = [
-        {
-            'id': col.id,
-            'name': col.name,
-            'description': col.description,
-            'date_added': col.date_added.isoformat() if col.date_added else None
-        } for col in collections
-    ]
-    return jsonify({'success': True, 'collections': result}), 200
+    try:
+        fields = parse_fields(request.args.get('fields'), READ_FIELDS + ('stats',)) or DEFAULT_FIELDS + ('stats',)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    with_stats = 'stats' in fields
+    fields = tuple(field for field in fields if field != 'stats')
+    
+    # One query for the collections (just the requested columns) and their
+    # stats; collections without a stats row yet (before
+    # 'flask repair-collection-stats') report zeros
+    columns, serialize = row_serializer(Collection, fields)
+    query = db.session.query(*columns, Collection.version.label('collection_version'))
+    if with_stats:
+        query = query.add_columns(
+            CollectionStats.item_count, CollectionStats.rating_count, CollectionStats.rating_sum,
+            CollectionStats.last_added, CollectionStats.version.label('stats_version')
+        ).outerjoin(CollectionStats, CollectionStats.collection_id == Collection.id)
+    rows = query.filter(Collection.user_id == user_id).order_by(Collection.id).all()
+    
+    # The list's ETag covers the fieldset and every collection (and stats)
+    # version, so any create, update or change to a collection's items changes it
+    etag = etag_for_rows(
+        f"collections-{user_id}-{','.join(fields)}{'-stats' if with_stats else ''}",
+        [(row.id, f'{row.collection_version}.{row.stats_version or 0}' if with_stats else row.collection_version)
+         for row in rows]
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    result = []
+    for row in rows:
+        entry = serialize(row)
+        if with_stats:
+            entry['stats'] = stats_dict(row.item_count, row.rating_count, row.rating_sum, row.last_added)
+        result.append(entry)
+    return with_etag(jsonify({'success': True, 'collections': result}), etag), 200
 
 @bp.route('/api/collections', methods=['POST'])
 def add_collection():
@@ -262,6 +408,9 @@ def add_collection():
     
     if not user_id or not name:
         return jsonify({'success': False, 'error': 'user_id and name required'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
     
     try:
         # Validate user_id is integer
@@ -300,6 +449,10 @@ def add_collection_media():
     Returns:
         201: Success with new relationship ID
         400: Missing required fields
+        401: No access token
+        403: user_id or the collection belongs to another user
+        404: Collection not found
+        409: Media already in collection
         500: Database error
     
     Usage:
@@ -310,6 +463,15 @@ def add_collection_media():
     
     if not data or not data.get('user_id') or not data.get('collection_id') or not data.get('media_id'):
         return jsonify({'success': False, 'error': 'user_id, collection_id, and media_id required'}), 400
+    denied = forbid_other_user(data['user_id'])
+    if denied:
+        return denied
+    owner = db.session.query(Collection.user_id).filter(Collection.id == data['collection_id']).scalar()
+    if owner is None:
+        return jsonify({'success': False, 'error': 'Collection not found'}), 404
+    denied = forbid_other_user(owner)
+    if denied:
+        return denied
     
     try:
         link = CollectionMedia(
@@ -322,10 +484,314 @@ def add_collection_media():
         db.session.add(link)
         db.session.commit()
         return jsonify({'success': True, 'message': 'Media added to collection', 'id': link.id}), 201
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Media already in collection'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Upper bound on media IDs accepted by GET /api/collection-media/ratings
+MAX_RATING_IDS = 1000
+
+# Upper bound on media IDs accepted by GET /api/collection-media?media_ids=
+MAX_MEMBERSHIP_IDS = 500
+
+def _parse_id_list(raw):
+    """
+    Parse a comma-separated list of integer IDs from a query string value.
+    
+    Parameters:
+        raw (str): Comma-separated IDs, e.g. "1,2,3"
+    
+    Returns:
+        list[int]: IDs in request order with duplicates removed
+    
+    Raises:
+        ValueError: If any entry is not an integer
+    """
+    return list(dict.fromkeys(int(part) for part in raw.split(',') if part.strip()))
+
+@bp.route('/api/collection-media', methods=['GET'])
+def get_collections_for_media_batch():
+    """
+    Get the collections containing each of many media items, in one call.
+    
+    Batch form of GET /api/collection-media/<media_id> for list pages:
+    a whole page of collection badges is answered by one join query,
+    scoped to the user's own collections.
+    
+    Query Parameters:
+        user_id (int): Owner of the collections (required)
+        media_ids (str): Comma-separated media IDs (required, max 500)
+    
+    Returns:
+        200: JSON with 'collections' object mapping every requested
+             media_id -> [{id, name, description}] (empty list if none)
+        400: Missing or invalid parameters
+    
+    Usage:
+        GET /api/collection-media?user_id=1&media_ids=10,11
+        Returns: {"success": true, "collections": {"10": [{"id": 3, "name": "Favorites", ...}], "11": []}}
+    """
+    try:
+        user_id = int(request.args.get('user_id', ''))
+        media_ids = _parse_id_list(request.args.get('media_ids', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'user_id and media_ids must be integers'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    
+    if len(media_ids) > MAX_MEMBERSHIP_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_MEMBERSHIP_IDS} media_ids per request'}), 400
+    
+    result = {str(media_id): [] for media_id in media_ids}
+    if media_ids:
+        rows = db.session.query(
+            CollectionMedia.media_id, Collection.id, Collection.name, Collection.description
+        ).join(Collection, Collection.id == CollectionMedia.collection_id).filter(
+            CollectionMedia.media_id.in_(media_ids),
+            Collection.user_id == user_id
+        )
+        for media_id, col_id, name, description in rows:
+            result[str(media_id)].append({'id': col_id, 'name': name, 'description': description})
+    
+    return jsonify({'success': True, 'collections': result}), 200
+
+@bp.route('/api/collection-media/ratings', methods=['GET'])
+def get_media_ratings():
+    """
+    Get a user's ratings for many media items in one call.
+    
+    Used by media-service's streaming export to merge ratings one chunk
+    at a time. When an item is rated in several collections, the highest
+    rating is returned.
+    
+    Query Parameters:
+        user_id (int): ID of the user whose ratings to return (required)
+        media_ids (str): Comma-separated media IDs (required, max 1000)
+    
+    Returns:
+        200: JSON with 'ratings' object mapping media_id -> rating
+             (unrated items are omitted)
+        400: Missing or invalid parameters
+    
+    Usage:
+        GET /api/collection-media/ratings?user_id=1&media_ids=10,11,12
+        Returns: {"success": true, "ratings": {"10": 5, "12": 3}}
+    """
+    try:
+        user_id = int(request.args.get('user_id', ''))
+        media_ids = _parse_id_list(request.args.get('media_ids', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'user_id and media_ids must be integers'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    
+    if len(media_ids) > MAX_RATING_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_RATING_IDS} media_ids per request'}), 400
+    
+    ratings = {}
+    if media_ids:
+        rows = db.session.query(CollectionMedia.media_id, func.max(CollectionMedia.rating)).filter(
+            CollectionMedia.user_id == user_id,
+            CollectionMedia.media_id.in_(media_ids),
+            CollectionMedia.rating.isnot(None)
+        ).group_by(CollectionMedia.media_id)
+        ratings = {str(media_id): rating for media_id, rating in rows}
+    
+    return jsonify({'success': True, 'ratings': ratings}), 200
+
+# Page sizes for GET /api/collection-media/by-rating
+DEFAULT_RATING_PAGE_SIZE = 50
+MAX_RATING_PAGE_SIZE = 500
+
+def _encode_rating_cursor(rating, date_added, media_id):
+    """Encode the sort key of the last item of a page as an opaque cursor."""
+    raw = json.dumps([rating, date_added, media_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_rating_cursor(cursor):
+    """
+    Decode a cursor produced by _encode_rating_cursor.
+    
+    Returns:
+        tuple: (rating, date_added, media_id); rating is None once paging
+            has reached the unrated items
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        rating, date_added, media_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(media_id, int) or not isinstance(date_added, str) or \
+            (rating is not None and not isinstance(rating, int)):
+        raise ValueError('Invalid cursor')
+    return rating, date_added, media_id
+
+def _ranked_links(user_id, rated):
+    """
+    SELECT a user's links that represent their media item in the rating order.
+    
+    An item in several collections has one link per collection; only the
+    best ranked one is kept (highest rating, then latest date_added, then
+    highest link id), so every media item appears once with the rating
+    GET /api/collection-media/ratings reports for it.
+    
+    Parameters:
+        user_id (int): Owner of the links
+        rated (bool): Rated links (True) or unrated links (False)
+    """
+    link = CollectionMedia
+    other = aliased(CollectionMedia)
+    later = or_(other.date_added > link.date_added,
+                and_(other.date_added == link.date_added, other.id > link.id))
+    if rated:
+        better = or_(other.rating > link.rating, and_(other.rating == link.rating, later))
+    else:
+        better = or_(other.rating.isnot(None), later)
+    return select(link.media_id, link.rating, link.date_added).where(
+        link.user_id == user_id,
+        link.rating.isnot(None) if rated else link.rating.is_(None),
+        ~exists().where(other.media_id == link.media_id, other.user_id == link.user_id, better)
+    )
+
+@bp.route('/api/collection-media/by-rating', methods=['GET'])
+def get_media_by_rating():
+    """
+    List a user's media IDs ordered by their rating, one page at a time.
+    
+    Items are ordered by rating (highest first), ties broken by the date
+    they were added (newest first); unrated items follow, newest first.
+    Pages are read with keyset pagination over the (user_id, rating,
+    date_added, media_id) index, so every page costs the same however
+    large the library is. The page's media objects are then fetched in
+    one call with GET /api/media?ids=<media_ids> on media-service (which
+    returns them in request order), or embedded here with include=media.
+    
+    Query Parameters:
+        user_id (int): ID of the user whose items to list (required)
+        limit (int): Page size (optional, default 50, max 500)
+        after (str): next_cursor from the previous page (optional)
+        include (str): "media" to embed each item's media object (optional)
+    
+    Returns:
+        200: JSON with 'items' ({media_id, rating, date_added[, media]})
+             and 'next_cursor' (null on the last page)
+        400: Invalid user_id, limit or cursor
+    
+    Usage:
+        GET /api/collection-media/by-rating?user_id=1&limit=50
+        GET /api/collection-media/by-rating?user_id=1&limit=50&after=<next_cursor>
+        Returns: {"success": true, "items": [{"media_id": 12, "rating": 5,
+                  "date_added": "2025-01-02 10:00:00"}, ...], "next_cursor": "..."}
+    """
+    try:
+        user_id = int(request.args.get('user_id', ''))
+        limit = int(request.args.get('limit', DEFAULT_RATING_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'user_id and limit must be integers'}), 400
+    limit = max(1, min(limit, MAX_RATING_PAGE_SIZE))
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    
+    after = None
+    if request.args.get('after'):
+        try:
+            after = _decode_rating_cursor(request.args['after'])
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
+    rows = []
+    # Rated items first, unless the cursor is already past them
+    if after is None or after[0] is not None:
+        stmt = _ranked_links(user_id, rated=True)
+        if after is not None:
+            stmt = stmt.where(tuple_(CollectionMedia.rating, CollectionMedia.date_added, CollectionMedia.media_id)
+                              < tuple_(*after))
+        rows = db.session.execute(stmt.order_by(
+            CollectionMedia.rating.desc(), CollectionMedia.date_added.desc(), CollectionMedia.media_id.desc()
+        ).limit(limit + 1)).all()
+    # Then unrated items, if the page still has room
+    if len(rows) <= limit:
+        stmt = _ranked_links(user_id, rated=False)
+        if after is not None and after[0] is None:
+            stmt = stmt.where(tuple_(CollectionMedia.date_added, CollectionMedia.media_id) < tuple_(*after[1:]))
+        rows += db.session.execute(stmt.order_by(
+            CollectionMedia.date_added.desc(), CollectionMedia.media_id.desc()
+        ).limit(limit + 1 - len(rows))).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_rating_cursor(rows[-1].rating, rows[-1].date_added, rows[-1].media_id)
+    
+    items = [{'media_id': media_id, 'rating': rating, 'date_added': date_added} for media_id, rating, date_added in rows]
+    result = {'success': True, 'items': items, 'next_cursor': next_cursor}
+    
+    if items and request.args.get('include') == 'media':
+        media_ids = [item['media_id'] for item in items]
+        # Local projection first (tombstones mean deleted); the rest through the media client
+        found = {
+            projected.media_id: None if projected.deleted else projected.to_dict()
+            for projected in MediaProjection.query.filter(MediaProjection.media_id.in_(media_ids))
+        }
+        unprojected = [media_id for media_id in media_ids if media_id not in found]
+        errors = []
+        if unprojected:
+            fetched, errors = media_client.get_media_summaries(unprojected)
+            found.update(fetched)
+        for item in items:
+            item['media'] = found.get(item['media_id'])
+        if errors:
+            result['warnings'] = errors
+    
+    return jsonify(result), 200
+
+@bp.route('/api/collection-media/rating-aggregates', methods=['GET'])
+def get_rating_aggregates_batch():
+    """
+    Get the community rating of many media items in one call.
+    
+    Aggregates are maintained on every rating write (rating_aggregates.py),
+    so each item costs one primary key lookup however many users rated it.
+    Every user counts once per item, with their highest rating.
+    
+    Query Parameters:
+        media_ids (str): Comma-separated media IDs (required, max 1000)
+    
+    Returns:
+        200: JSON with 'aggregates' object mapping media_id ->
+             {count, average, histogram} (items nobody rated are omitted)
+        400: Missing or invalid media_ids
+    
+    Usage:
+        GET /api/collection-media/rating-aggregates?media_ids=10,11
+        Returns: {"success": true, "aggregates": {"10": {"count": 3, "average": 4.33,
+                  "histogram": {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1}}}}
+    """
+    from rating_aggregates import get_rating_aggregates
+    
+    try:
+        media_ids = _parse_id_list(request.args.get('media_ids', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'media_ids must be integers'}), 400
+    if not media_ids:
+        return jsonify({'success': False, 'error': 'media_ids required'}), 400
+    if len(media_ids) > MAX_RATING_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_RATING_IDS} media_ids per request'}), 400
+    
+    aggregates = get_rating_aggregates(media_ids)
+    return jsonify({
+        'success': True,
+        'aggregates': {str(media_id): agg.to_dict() for media_id, agg in aggregates.items()}
+    }), 200
+
 @bp.route('/api/collection-media/<int:media_id>', methods=['GET'])
 def get_media_collections(media_id):
     """
@@ -339,6 +805,8 @@ def get_media_collections(media_id):
     
     Returns:
         200: JSON with 'collections' array containing collection details
+             (only the caller's collections)
+        401: No access token
     
     Usage:
         GET /api/collection-media/789
@@ -346,7 +814,10 @@ def get_media_collections(media_id):
     """
     from models import Collection, CollectionMedia
     
-    links = CollectionMedia.query.filter_by(media_id=media_id).all()
+    denied = require_token()
+    if denied:
+        return denied
+    links = CollectionMedia.query.filter_by(media_id=media_id, user_id=g.auth_user_id)
     collection_ids = [link.collection_id for link in links]
     collections = Collection.query.filter(Collection.id.in_(collection_ids)).all()
     
@@ -361,6 +832,7 @@ def link_media_to_collections():
     Link a media item to one or more collections.
     
     Allows bulk linking of a single media item to multiple collections.
+    Collections that already contain the media item are left unchanged.
     Includes CORS preflight handling for browser requests.
     
     Request Body (JSON):
@@ -372,6 +844,9 @@ def link_media_to_collections():
         200: CORS preflight response (OPTIONS)
         201: Success message (POST)
         400: Missing required fields
+        401: No access token
+        403: user_id is not the token's user, or a collection is missing or
+             belongs to another user (nothing is linked)
         500: Database error
     
     Usage:
@@ -389,12 +864,33 @@ def link_media_to_collections():
 
     if not user_id or not media_id or not collection_ids:
         return jsonify({'error': 'user_id, media_id, and collection_ids required'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    if not isinstance(collection_ids, list):
+        return jsonify({'error': 'collection_ids must be a list'}), 400
+    collection_ids = [col_id for col_id in dict.fromkeys(collection_ids) if isinstance(col_id, int)]
+
+    # Only the caller's own collections may be linked to
+    owned = {
+        row.id for row in db.session.query(Collection.id)
+        .filter(Collection.id.in_(collection_ids), Collection.user_id == g.auth_user_id)
+    }
+    not_owned = [col_id for col_id in collection_ids if col_id not in owned]
+    if not_owned:
+        return jsonify({'error': f"Collections not found or not yours: {', '.join(map(str, not_owned))}"}), 403
 
     from models import CollectionMedia
     try:
+        # Skip collections that already contain this media item (unique per collection)
+        existing = {
+            row.collection_id for row in db.session.query(CollectionMedia.collection_id)
+            .filter(CollectionMedia.media_id == media_id, CollectionMedia.collection_id.in_(collection_ids))
+        }
+        
         # Create relationship for each collection
         for col_id in collection_ids:
-            if isinstance(col_id, int):
+            if col_id not in existing:
                 mapping = CollectionMedia(
                     collection_id=col_id, 
                     media_id=media_id, 
@@ -406,4 +902,88 @@ def link_media_to_collections():
         return jsonify({'success': True}), 201
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+# Upper bound on media IDs accepted by one invalidation push
+MAX_INVALIDATE_IDS = 10000
+
+@bp.route('/api/internal/media-invalidate', methods=['POST'])
+def invalidate_media():
+    """
+    Drop changed or deleted media items from the media summary cache.
+    
+    Called by media-service after it commits a change to existing items.
+    Dropping entries can only cause extra fetches, so the endpoint needs no
+    ownership check.
+    
+    Request Body (JSON):
+        media_ids (list[int]): IDs of changed or deleted media items
+    
+    Returns:
+        200: JSON with 'invalidated' (entries that were cached in this worker)
+        400: Missing or malformed media_ids
+    
+    Usage:
+        POST /api/internal/media-invalidate
+        {"media_ids": [12, 15]}
+    """
+    data = request.get_json(silent=True) or {}
+    media_ids = data.get('media_ids')
+    if not isinstance(media_ids, list) or not all(isinstance(media_id, int) for media_id in media_ids):
+        return jsonify({'success': False, 'error': 'media_ids must be a list of integers'}), 400
+    if len(media_ids) > MAX_INVALIDATE_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_INVALIDATE_IDS} media_ids per request'}), 400
+    
+    return jsonify({'success': True, 'invalidated': media_summary_cache.invalidate(media_ids)}), 200
+
+@bp.route('/api/internal/media-cache/stats', methods=['GET'])
+def media_cache_stats():
+    """
+    Report media summary cache counters for this worker process.
+    
+    Returns:
+        200: JSON with 'cache': hits, stale_hits, misses, evictions,
+             invalidations, refreshes, size and hit_ratio
+    
+    Usage:
+        GET /api/internal/media-cache/stats
+    """
+    return jsonify({'success': True, 'cache': media_summary_cache.stats()}), 200
+
+@bp.route('/api/internal/media-events', methods=['POST'])
+def receive_media_events():
+    """
+    Apply a batch of media-service outbox events to the media projection.
+    
+    Called by media-service's 'flask relay-outbox' in event ID order.
+    Redelivered events are skipped, so the relay may safely retry a batch.
+    
+    Request Body (JSON):
+        events (list): {id, media_id, type ('upsert' or 'delete'), version, media}
+    
+    Returns:
+        200: JSON with 'applied' and 'skipped' counts
+        400: Malformed events
+        500: Database error (nothing applied; the relay retries)
+    
+    Usage:
+        POST /api/internal/media-events
+        {"events": [{"id": 41, "media_id": 12, "type": "upsert", "version": 3, "media": {...}}]}
+    """
+    from projection import apply_media_events, validate_events
+    
+    events = (request.get_json(silent=True) or {}).get('events')
+    error = validate_events(events)
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    try:
+        applied, skipped, changed = apply_media_events(events)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    # Items fetched over HTTP before they were projected may be cached too
+    media_summary_cache.invalidate(changed)
+    return jsonify({'success': True, 'applied': applied, 'skipped': skipped}), 200
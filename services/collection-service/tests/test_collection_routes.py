@@ -0,0 +1,185 @@
+"""
+====================================================================================
+test_collection_routes.py - Collection Route Tests for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - GET /api/collection-media/by-rating keyset pagination: following
+    next_cursor visits every item once, in order, across the rated items
+    and the unrated (NULL rating) region
+  - Hand-edited or mistyped cursors are rejected with 400
+  - Collections and collection lists answer a matching If-None-Match with
+    304 until they change
+  - Requests without a token get 401, requests for another user's data 403
+
+Usage:
+  - python -m pytest tests/test_collection_routes.py
+
+====================================================================================
+"""
+
+import base64
+import json
+
+import pytest
+
+def add_collection(client, auth_headers, user_id=1, name='Shelf'):
+    """Create a collection through the API and return its ID."""
+    resp = client.post('/api/collections', json={'user_id': user_id, 'name': name}, headers=auth_headers(user_id))
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()['id']
+
+def add_link(client, auth_headers, collection_id, media_id, user_id=1, **fields):
+    """Add a media item to a collection through the API."""
+    body = {'user_id': user_id, 'collection_id': collection_id, 'media_id': media_id}
+    body.update(fields)
+    resp = client.post('/api/collection', json=body, headers=auth_headers(user_id))
+    assert resp.status_code == 201, resp.get_json()
+
+def walk_pages(client, headers, limit, max_pages=20, **params):
+    """Follow next_cursor from the first page to the last; return the items seen."""
+    items = []
+    after = None
+    for _ in range(max_pages):
+        query = dict(params, limit=limit)
+        if after:
+            query['after'] = after
+        resp = client.get('/api/collection-media/by-rating', query_string=query, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        body = resp.get_json()
+        assert len(body['items']) <= limit
+        items += [(item['media_id'], item['rating']) for item in body['items']]
+        after = body['next_cursor']
+        if after is None:
+            return items
+    pytest.fail(f'next_cursor did not reach the last page in {max_pages} pages: {items}')
+
+def cursor(*parts):
+    """Encode a cursor the way _encode_rating_cursor does, with arbitrary contents."""
+    raw = json.dumps(list(parts)).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+@pytest.fixture
+def rated_library(client, auth_headers):
+    """
+    Two collections of user 1 with rated, unrated and repeated items.
+
+    Returns:
+        list: (media_id, rating) in the order by-rating must return them
+    """
+    first = add_collection(client, auth_headers, name='First')
+    second = add_collection(client, auth_headers, name='Second')
+    for collection_id, media_id, day, rating in [
+        (first, 1, 1, 5), (first, 2, 2, 3), (first, 3, 3, None), (first, 4, 4, None),
+        (first, 5, 5, 5), (first, 6, 3, None), (first, 7, 2, None),
+        # In two collections: listed once, with the better ranked link
+        (second, 2, 6, 4), (second, 3, 7, None),
+    ]:
+        add_link(client, auth_headers, collection_id, media_id,
+                 date_added=f'2024-01-{day:02d} 00:00:00', rating=rating)
+    add_link(client, auth_headers, add_collection(client, auth_headers, user_id=2), 8, user_id=2, rating=5)
+    return [(5, 5), (1, 5), (2, 4), (3, None), (4, None), (6, None), (7, None)]
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 500])
+def test_rating_cursor_round_trip_includes_unrated_items(client, auth_headers, rated_library, limit):
+    # Small pages put cursors on both sides of the rated/unrated boundary
+    assert walk_pages(client, auth_headers(1), limit, user_id=1) == rated_library
+
+@pytest.mark.parametrize('after', [
+    'not-a-cursor',
+    cursor('5', '2024-01-01 00:00:00', 1),
+    cursor(5, 20240101, 1),
+    cursor(5, '2024-01-01 00:00:00', '1'),
+    cursor(5, '2024-01-01 00:00:00'),
+    cursor({'rating': 5}, '2024-01-01 00:00:00', 1),
+], ids=['not-base64-json', 'rating-string', 'date-int', 'id-string', 'id-missing', 'rating-object'])
+def test_mistyped_rating_cursor_is_rejected(client, auth_headers, after):
+    resp = client.get('/api/collection-media/by-rating', query_string={'user_id': 1, 'after': after},
+                      headers=auth_headers(1))
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == 'Invalid cursor'
+
+def test_rating_pages_need_a_token_for_the_requested_user(client, auth_headers, rated_library):
+    assert client.get('/api/collection-media/by-rating', query_string={'user_id': 1}).status_code == 401
+    resp = client.get('/api/collection-media/by-rating', query_string={'user_id': 1}, headers=auth_headers(2))
+    assert resp.status_code == 403
+
+def test_collection_etag_answers_304_until_the_collection_changes(client, auth_headers):
+    collection_id = add_collection(client, auth_headers, name='Old name')
+    headers = auth_headers(1)
+
+    first = client.get(f'/api/collections/{collection_id}', headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get(f'/api/collections/{collection_id}', headers={**headers, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+    assert client.put(f'/api/collection/{collection_id}', json={'name': 'New name'}, headers=headers).status_code == 200
+    changed = client.get(f'/api/collections/{collection_id}', headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['collection']['name'] == 'New name'
+
+def test_list_etag_changes_when_an_item_is_added(client, auth_headers):
+    collection_id = add_collection(client, auth_headers)
+    headers = auth_headers(1)
+    query = {'user_id': 1}
+
+    etag = client.get('/api/collections', query_string=query, headers=headers).headers['ETag']
+    cached = client.get('/api/collections', query_string=query, headers={**headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+
+    # Only collection_stats changes, so the list ETag must cover its version
+    add_link(client, auth_headers, collection_id, 10, rating=4)
+    changed = client.get('/api/collections', query_string=query, headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.get_json()['collections'][0]['stats']['item_count'] == 1
+
+def test_list_needs_a_token_for_the_requested_user(client, auth_headers):
+    add_collection(client, auth_headers)
+
+    assert client.get('/api/collections', query_string={'user_id': 1}).status_code == 401
+    assert client.get('/api/collections', query_string={'user_id': 1}, headers=auth_headers(2)).status_code == 403
+    assert client.post('/api/collections', json={'user_id': 1, 'name': 'Taken'},
+                       headers=auth_headers(2)).status_code == 403
+
+@pytest.mark.parametrize('path', ['/api/collections/{}', '/api/collection/{}', '/api/collection/{}/media'])
+def test_collection_is_only_visible_to_its_owner(client, auth_headers, path):
+    collection_id = add_collection(client, auth_headers)
+
+    assert client.get(path.format(collection_id)).status_code == 401
+    assert client.get(path.format(collection_id), headers=auth_headers(2)).status_code == 403
+    assert client.get(path.format(collection_id + 1), headers=auth_headers(2)).status_code == 404
+
+def test_collection_is_only_changed_by_its_owner(client, auth_headers):
+    collection_id = add_collection(client, auth_headers, name='Mine')
+
+    assert client.put(f'/api/collection/{collection_id}', json={'name': 'Taken'}).status_code == 401
+    assert client.put(f'/api/collection/{collection_id}', json={'name': 'Taken'},
+                      headers=auth_headers(2)).status_code == 403
+    assert client.get(f'/api/collections/{collection_id}',
+                      headers=auth_headers(1)).get_json()['collection']['name'] == 'Mine'
+
+def test_media_is_only_added_to_own_collections(client, auth_headers):
+    mine = add_collection(client, auth_headers)
+    theirs = add_collection(client, auth_headers, user_id=2)
+    headers = auth_headers(1)
+
+    # The token's user must own the collection, not just match user_id
+    single = {'user_id': 1, 'collection_id': theirs, 'media_id': 10}
+    assert client.post('/api/collection', json=single).status_code == 401
+    assert client.post('/api/collection', json=single, headers=headers).status_code == 403
+    assert client.post('/api/collection', json=dict(single, collection_id=theirs + 1),
+                       headers=headers).status_code == 404
+
+    # One foreign collection refuses the whole batch
+    batch = {'user_id': 1, 'media_id': 10, 'collection_ids': [mine, theirs]}
+    resp = client.post('/api/collection-media', json=batch, headers=headers)
+    assert resp.status_code == 403
+    assert client.get('/api/collection-media/10', headers=headers).get_json()['collections'] == []
+    assert client.get('/api/collection-media/10', headers=auth_headers(2)).get_json()['collections'] == []
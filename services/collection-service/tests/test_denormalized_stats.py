@@ -0,0 +1,94 @@
+"""
+====================================================================================
+test_denormalized_stats.py - Collection Stats and Rating Aggregate Tests for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - The flush hooks keep collection_stats and media_rating_aggregate equal
+    to a full recompute through inserts, rating changes and deletes
+  - A user counts once per media item, with their highest rating
+
+Usage:
+  - python -m pytest tests/test_denormalized_stats.py
+
+====================================================================================
+"""
+
+from app import db
+from collection_stats import repair_collection_stats
+from models import Collection, CollectionMedia, MediaRatingAggregate
+from rating_aggregates import recompute_rating_aggregates
+
+def add_collection(session, user_id, name='Shelf'):
+    """Create a collection in the session and return it (flushed)."""
+    col = Collection(user_id=user_id, name=name)
+    session.add(col)
+    session.flush()
+    return col
+
+def assert_matches_recompute():
+    """The maintained rows equal what the repair commands would write."""
+    checked, fixed, created = repair_collection_stats()
+    assert (fixed, created) == (0, 0)
+    # The hooks keep an item's row at zero once nobody rates it; the recompute drops it
+    unrated = MediaRatingAggregate.query.filter(MediaRatingAggregate.rating_count == 0).count()
+    checked, fixed, created, deleted = recompute_rating_aggregates()
+    assert (fixed, created, deleted) == (0, 0, unrated)
+
+def test_hooks_match_a_full_recompute(app, client):
+    with app.app_context():
+        first = add_collection(db.session, 1, 'First')
+        second = add_collection(db.session, 1, 'Second')
+        theirs = add_collection(db.session, 2, 'Theirs')
+        links = [
+            CollectionMedia(collection_id=first.id, media_id=10, user_id=1, rating=5),
+            CollectionMedia(collection_id=second.id, media_id=10, user_id=1, rating=3),
+            CollectionMedia(collection_id=first.id, media_id=11, user_id=1),
+            CollectionMedia(collection_id=theirs.id, media_id=10, user_id=2, rating=4),
+        ]
+        db.session.add_all(links)
+        db.session.commit()
+        assert_matches_recompute()
+
+        # Rating change, rating removed and a deleted link, in one transaction
+        links[0].rating = 2
+        links[3].rating = None
+        db.session.delete(links[2])
+        db.session.commit()
+        assert_matches_recompute()
+
+        # Nobody rates the item any more
+        links[1].rating = None
+        links[0].rating = None
+        db.session.commit()
+        assert_matches_recompute()
+
+def test_stats_and_aggregates_are_served(client, auth_headers):
+    headers = auth_headers(1)
+    first = client.post('/api/collections', json={'user_id': 1, 'name': 'First'}, headers=headers).get_json()['id']
+    second = client.post('/api/collections', json={'user_id': 1, 'name': 'Second'}, headers=headers).get_json()['id']
+    for collection_id, media_id, rating in [(first, 10, 5), (first, 11, None), (second, 10, 3)]:
+        client.post('/api/collection', headers=headers, json={
+            'user_id': 1, 'collection_id': collection_id, 'media_id': media_id, 'rating': rating,
+            'date_added': f'2024-01-0{media_id - 9} 00:00:00'
+        })
+    theirs = client.post('/api/collections', json={'user_id': 2, 'name': 'Theirs'},
+                         headers=auth_headers(2)).get_json()['id']
+    client.post('/api/collection', json={'user_id': 2, 'collection_id': theirs, 'media_id': 10, 'rating': 4},
+                headers=auth_headers(2))
+
+    listed = client.get('/api/collections', query_string={'user_id': 1}, headers=headers).get_json()
+    assert [c['stats'] for c in listed['collections']] == [
+        {'item_count': 2, 'rating_count': 1, 'average_rating': 5.0, 'last_added': '2024-01-02 00:00:00'},
+        {'item_count': 1, 'rating_count': 1, 'average_rating': 3.0, 'last_added': '2024-01-01 00:00:00'},
+    ]
+
+    # User 1 counts once, with 5 (not 3); items nobody rated are omitted
+    resp = client.get('/api/collection-media/rating-aggregates', query_string={'media_ids': '10,11'},
+                      headers=headers)
+    assert resp.get_json()['aggregates'] == {
+        '10': {'count': 2, 'average': 4.5, 'histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}}
+    }
@@ -0,0 +1,114 @@
+"""
+====================================================================================
+test_media_events.py - Media Projection Event Tests for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - POST /api/internal/media-events applies each outbox event once:
+    a replayed batch is skipped, and an upsert older than the projected
+    version cannot overwrite it
+  - Deletes leave a tombstone that hides the item from collection pages
+  - The endpoint takes the service token and rejects malformed batches
+
+Usage:
+  - python -m pytest tests/test_media_events.py
+
+====================================================================================
+"""
+
+import pytest
+
+from models import MediaProjection
+
+def upsert(event_id, media_id, version, title, user_id=1):
+    """Build an upsert event as media-service's outbox sends it."""
+    media = {'id': media_id, 'user_id': user_id, 'title': title, 'creator': 'Creator', 'type': 'book'}
+    return {'id': event_id, 'media_id': media_id, 'type': 'upsert', 'version': version, 'media': media}
+
+def delete(event_id, media_id):
+    """Build a delete event as media-service's outbox sends it."""
+    return {'id': event_id, 'media_id': media_id, 'type': 'delete', 'version': None, 'media': None}
+
+@pytest.fixture
+def send_events(client, service_headers):
+    """Post a batch of events with the service token; return the decoded response."""
+    def send(*events):
+        resp = client.post('/api/internal/media-events', json={'events': list(events)}, headers=service_headers)
+        assert resp.status_code == 200, resp.get_json()
+        return resp.get_json()
+    return send
+
+def projected(app, media_id):
+    """(title, version, last_event_id, deleted) of a projection row, or None."""
+    with app.app_context():
+        row = MediaProjection.query.get(media_id)
+        return row and (row.title, row.version, row.last_event_id, row.deleted)
+
+def test_replayed_batch_is_skipped(app, send_events):
+    batch = [upsert(1, 10, 1, 'First'), upsert(2, 11, 1, 'Other'), upsert(3, 10, 2, 'Second')]
+
+    assert send_events(*batch) == {'success': True, 'applied': 3, 'skipped': 0}
+    # The relay retries a batch whose response it never saw
+    assert send_events(*batch) == {'success': True, 'applied': 0, 'skipped': 3}
+
+    assert projected(app, 10) == ('Second', 2, 3, False)
+    assert projected(app, 11) == ('Other', 1, 2, False)
+
+def test_older_version_does_not_overwrite_a_newer_one(app, send_events):
+    send_events(upsert(5, 10, 3, 'Newer'))
+
+    # A later event carrying an older state (e.g. after a rebuild) only advances the event position
+    assert send_events(upsert(6, 10, 2, 'Older')) == {'success': True, 'applied': 0, 'skipped': 1}
+    assert projected(app, 10) == ('Newer', 3, 6, False)
+
+def test_delete_hides_the_item_from_collection_pages(app, client, auth_headers, send_events):
+    headers = auth_headers(1)
+    collection_id = client.post('/api/collections', json={'user_id': 1, 'name': 'Shelf'},
+                                headers=headers).get_json()['id']
+    for media_id in (10, 11):
+        client.post('/api/collection', json={'user_id': 1, 'collection_id': collection_id, 'media_id': media_id},
+                    headers=headers)
+    send_events(upsert(1, 10, 1, 'Kept'), upsert(2, 11, 1, 'Removed'))
+
+    page = client.get(f'/api/collection/{collection_id}/media', headers=headers).get_json()
+    assert [media['title'] for media in page['media']] == ['Kept', 'Removed']
+    assert 'warnings' not in page
+
+    assert send_events(delete(3, 11)) == {'success': True, 'applied': 1, 'skipped': 0}
+    assert projected(app, 11)[3] is True
+    page = client.get(f'/api/collection/{collection_id}/media', headers=headers).get_json()
+    assert [media['title'] for media in page['media']] == ['Kept']
+    assert page['warnings'] == ['No media found for media_id 11']
+
+def test_another_users_media_is_not_shown(client, auth_headers, send_events):
+    headers = auth_headers(1)
+    collection_id = client.post('/api/collections', json={'user_id': 1, 'name': 'Shelf'},
+                                headers=headers).get_json()['id']
+    client.post('/api/collection', json={'user_id': 1, 'collection_id': collection_id, 'media_id': 10},
+                headers=headers)
+    send_events(upsert(1, 10, 1, 'Not yours', user_id=2))
+
+    page = client.get(f'/api/collection/{collection_id}/media', headers=headers).get_json()
+    assert page['media'] == []
+    assert page['warnings'] == ['No media found for media_id 10']
+
+def test_events_need_the_service_token(client, auth_headers, service_headers):
+    body = {'events': [upsert(1, 10, 1, 'Title')]}
+    assert client.post('/api/internal/media-events', json=body).status_code == 401
+    assert client.post('/api/internal/media-events', json=body, headers=auth_headers(1)).status_code == 401
+    assert client.post('/api/internal/media-events', json=body,
+                       headers={'X-Internal-Token': 'guess'}).status_code == 401
+
+@pytest.mark.parametrize('events', [
+    None,
+    [{'id': '1', 'media_id': 10, 'type': 'delete'}],
+    [{'id': 1, 'media_id': 10, 'type': 'upsert', 'version': 1}],
+    [{'id': 1, 'media_id': 10, 'type': 'rename'}],
+], ids=['not-a-list', 'id-string', 'upsert-without-media', 'unknown-type'])
+def test_malformed_batch_is_rejected(app, client, service_headers, events):
+    resp = client.post('/api/internal/media-events', json={'events': events}, headers=service_headers)
+    assert resp.status_code == 400
+    assert projected(app, 10) is None
@@ -0,0 +1,38 @@
+"""
+====================================================================================
+test_query_plans.py - Query Plan Tests for Collection Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Runs EXPLAIN QUERY PLAN for every query in query_plans.hot_queries() against
+    the migrated schema and fails if one scans a whole table or sorts every row
+  - Checks that the migrations build the schema declared in models.py
+
+Usage:
+  - python -m pytest tests/test_query_plans.py
+
+====================================================================================
+"""
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from app import db
+from query_plans import explain, hot_queries, regressions
+
+HOT_QUERIES = hot_queries()
+
+@pytest.mark.parametrize('name, stmt', HOT_QUERIES, ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_an_index(app, name, stmt):
+    with app.app_context(), db.engine.connect() as conn:
+        plan = explain(conn, stmt)
+    assert regressions(name, plan) == [], f'{name}: {"; ".join(plan)}'
+
+def test_migrations_match_models(app):
+    with app.app_context(), db.engine.connect() as conn:
+        context = MigrationContext.configure(conn)
+        assert compare_metadata(context, db.metadata) == []
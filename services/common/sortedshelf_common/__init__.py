@@ -0,0 +1,25 @@
+"""
+====================================================================================
+sortedshelf_common - Shared Modules for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - One copy of the infrastructure every service uses, installed into each
+    service's venv from services/common (see requirements.txt)
+
+Modules:
+  - auth_tokens: Access token verification and service-to-service headers
+  - conditional: Conditional GET (ETag / 304) helpers
+  - engine_profiles: Database engine options and SQLite pragmas from DB_PROFILE
+  - json_provider: Fast JSON encoding and compiled row serializers
+  - metrics: Request, SQL and outbound call metrics on /metrics
+
+Usage:
+  - pip install -r requirements.txt (in a service folder) installs it
+  - from sortedshelf_common.json_provider import row_serializer
+
+====================================================================================
+"""
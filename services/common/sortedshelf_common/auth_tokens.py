@@ -0,0 +1,379 @@
+"""
+====================================================================================
+auth_tokens.py - Access Token Verification for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Verifies the signed access tokens issued by auth-service at login, in-process
+  - Keeps auth-service off the hot path: public keys are fetched from
+    GET /api/auth/keys once and cached, so a request costs one local signature
+    check instead of a network call, and a token already seen by this worker
+    costs a dictionary lookup
+
+Major Components:
+  - TokenVerifier class: Cached-key JWT verifier hooked into before_request
+    - init_app: Reads AUTH_* settings and installs the request hook
+    - verify: Validate a token and return its claims
+  - token_verifier: Shared instance registered by create_app()
+  - forbid_other_user: 401/403 response unless the token belongs to the requested user
+  - require_token: 401 response for an anonymous request
+  - require_service_token: 401 response unless the request carries the service token
+  - forward_auth_headers: Authorization header to pass on to other services
+  - internal_headers: Service token header for calls to /api/internal/ endpoints
+
+Configuration (config.py):
+  - AUTH_SERVICE_URL: Base URL of auth-service (for the key set)
+  - AUTH_REQUIRED: Reject every request without a token (user-scoped requests
+    need one either way)
+  - AUTH_TOKEN_ISSUER: Expected 'iss' claim
+  - AUTH_KEYS_TTL: Seconds a fetched key set is trusted before re-fetching
+  - AUTH_KEYS_MIN_REFRESH: Minimum seconds between key fetches (unknown 'kid' flood guard)
+  - AUTH_CLOCK_LEEWAY: Allowed clock skew in seconds for exp/iat
+  - INTERNAL_API_TOKEN: Shared secret for service-to-service /api/internal/ calls
+  - INTERNAL_API_DEV_OPEN: Development only; leave /api/internal/ open while
+    INTERNAL_API_TOKEN is unset
+
+Security:
+  - Only EdDSA tokens are accepted (no 'none', no algorithm switching)
+  - A present but invalid or expired token is always rejected with 401
+  - The authenticated user ID is available as g.auth_user_id (None if anonymous)
+  - A user_id (or owner) taken from the request is never trusted on its own:
+    forbid_other_user answers 401 without a token and 403 for another
+    user's data, whatever AUTH_REQUIRED says
+  - If auth-service is unreachable the last good key set keeps being used
+  - /api/internal/ endpoints take no user token; they require the
+    X-Internal-Token header to match INTERNAL_API_TOKEN, and fail closed
+    (401) while the token is unset unless INTERNAL_API_DEV_OPEN is set;
+    require_service_token applies the same check to operator endpoints
+    outside /api/internal/ (e.g. auth-service's bulk provisioning)
+  - /metrics (metrics.py) takes no token, so scrapers can reach it; keep it
+    off the public network
+
+Usage:
+  - token_verifier.init_app(app) in create_app()
+    (auth-service: token_verifier.init_app(app, local_keys=tokens.jwks))
+  - denied = forbid_other_user(user_id); if denied: return denied
+  - denied = require_token(); if denied: return denied (reads scoped to the caller)
+
+====================================================================================
+"""
+
+import hmac
+import threading
+import time
+
+import jwt
+import requests
+from flask import g, has_request_context, jsonify, request
+
+# The only algorithm auth-service signs with
+ALGORITHMS = ['EdDSA']
+
+# Verified tokens remembered per process (a client reuses its token for many requests)
+VERIFIED_CACHE_SIZE = 4096
+
+# Service-to-service endpoints, authenticated with the shared internal token
+INTERNAL_PATH_PREFIX = '/api/internal/'
+INTERNAL_TOKEN_HEADER = 'X-Internal-Token'
+
+class TokenVerifier:
+    """
+    Verifies auth-service access tokens against a cached JSON Web Key Set.
+
+    Attributes:
+        keys_url (str): URL of auth-service's JWKS endpoint
+        required (bool): Whether anonymous requests are rejected
+        issuer (str): Expected 'iss' claim
+        keys_ttl (float): Seconds a fetched key set is trusted
+        min_refresh (float): Minimum seconds between key fetches
+        leeway (int): Allowed clock skew in seconds
+        timeout (float): Timeout for the key fetch in seconds
+        internal_token (str): Shared secret for /api/internal/ calls ('' if unset)
+    """
+
+    def __init__(self):
+        self.keys_url = 'http://localhost:5001/api/auth/keys'
+        self.required = False
+        self.issuer = 'sortedshelf-auth'
+        self.keys_ttl = 3600.0
+        self.min_refresh = 30.0
+        self.leeway = 30
+        self.timeout = 2.0
+        self.internal_token = ''
+        self.internal_dev_open = False
+        self.local_keys = None
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._fetched_at = None
+        self._attempted_at = None
+        self._verified = {}
+
+    def init_app(self, app, local_keys=None):
+        """
+        Load verifier settings and authenticate every request.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+            local_keys (callable): Returns the key set (JWKS dict) in-process
+                instead of fetching it from auth-service (optional; auth-service
+                uses it to verify its own tokens)
+        """
+        self.keys_url = app.config.get('AUTH_SERVICE_URL', 'http://localhost:5001').rstrip('/') + '/api/auth/keys'
+        self.required = app.config.get('AUTH_REQUIRED', self.required)
+        self.issuer = app.config.get('AUTH_TOKEN_ISSUER', self.issuer)
+        self.keys_ttl = app.config.get('AUTH_KEYS_TTL', self.keys_ttl)
+        self.min_refresh = app.config.get('AUTH_KEYS_MIN_REFRESH', self.min_refresh)
+        self.leeway = app.config.get('AUTH_CLOCK_LEEWAY', self.leeway)
+        self.internal_token = app.config.get('INTERNAL_API_TOKEN', self.internal_token)
+        self.internal_dev_open = app.config.get('INTERNAL_API_DEV_OPEN', self.internal_dev_open)
+        self.local_keys = local_keys
+        if not self.internal_token:
+            if self.internal_dev_open:
+                app.logger.warning(
+                    'INTERNAL_API_TOKEN is not set and INTERNAL_API_DEV_OPEN is on; '
+                    'service token endpoints accept calls from anyone.'
+                )
+            else:
+                app.logger.warning(
+                    'INTERNAL_API_TOKEN is not set; service token endpoints will reject every call.'
+                )
+        app.before_request(self._authenticate)
+        app.extensions['token_verifier'] = self
+
+    def _refresh(self):
+        """
+        Fetch the key set from auth-service, keeping the old one on failure.
+
+        Called with self._lock held.
+        """
+        self._attempted_at = time.monotonic()
+        try:
+            if self.local_keys is not None:
+                key_set = jwt.PyJWKSet.from_dict(self.local_keys())
+            else:
+                resp = requests.get(self.keys_url, timeout=self.timeout)
+                resp.raise_for_status()
+                key_set = jwt.PyJWKSet.from_dict(resp.json())
+        except (requests.RequestException, ValueError, jwt.PyJWTError):
+            return
+        self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+        self._fetched_at = self._attempted_at
+
+    def _key_for(self, kid):
+        """
+        Return the verification key for a key ID, fetching keys only when needed.
+
+        Keys are re-fetched when the cached set has expired or an unknown key
+        ID appears (signing key rotation), but never more often than
+        min_refresh seconds, so bogus tokens cannot hammer auth-service.
+
+        Returns:
+            jwt.PyJWK or None: Key to verify with, or None if unknown
+        """
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        fresh = self._fetched_at is not None and now - self._fetched_at < self.keys_ttl
+        if key is not None and fresh:
+            return key
+
+        # A known (merely stale) key never waits for another thread's fetch
+        if self._lock.acquire(blocking=key is None):
+            try:
+                if self._attempted_at is None or now - self._attempted_at >= self.min_refresh:
+                    self._refresh()
+            finally:
+                self._lock.release()
+        return self._keys.get(kid)
+
+    def verify(self, token):
+        """
+        Validate a token's signature, issuer and expiry.
+
+        A token that already verified is answered from a small in-process
+        cache until it expires, so repeat requests skip the signature check.
+
+        Parameters:
+            token (str): Compact JWT from the Authorization header
+
+        Returns:
+            dict: Verified claims ('sub' is the user ID as a string)
+
+        Raises:
+            jwt.InvalidTokenError: If the token is malformed, unsigned by a
+            known key, expired or issued by someone else
+        """
+        claims = self._verified.get(token)
+        if claims is not None:
+            if time.time() < claims['exp'] + self.leeway:
+                return claims
+            self._verified.pop(token, None)
+
+        kid = jwt.get_unverified_header(token).get('kid')
+        key = self._key_for(kid)
+        if key is None:
+            raise jwt.InvalidTokenError('Unknown signing key')
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=ALGORITHMS,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={'require': ['exp', 'iss', 'sub']}
+        )
+        if len(self._verified) >= VERIFIED_CACHE_SIZE:
+            self._verified.clear()
+        self._verified[token] = claims
+        return claims
+
+    def _authenticate(self):
+        """
+        before_request hook: set g.auth_user_id from the bearer token.
+
+        Returns:
+            None to continue, or a 401 response
+        """
+        g.auth_user_id = None
+        if request.method == 'OPTIONS':
+            return None
+        if request.endpoint == 'metrics':
+            # Scraped by Prometheus, which sends no user token
+            return None
+        if request.path.startswith(INTERNAL_PATH_PREFIX):
+            return self._authenticate_internal()
+
+        header = request.headers.get('Authorization', '')
+        if not header:
+            if self.required:
+                return _unauthorized('Access token required')
+            return None
+
+        scheme, _, token = header.partition(' ')
+        if scheme.lower() != 'bearer' or not token.strip():
+            return _unauthorized('Authorization header must be "Bearer <token>"')
+        try:
+            claims = self.verify(token.strip())
+            g.auth_user_id = int(claims['sub'])
+        except (jwt.InvalidTokenError, ValueError):
+            return _unauthorized('Invalid or expired access token')
+        return None
+
+    def _authenticate_internal(self):
+        """
+        Check the service token (X-Internal-Token) on the current request.
+
+        Returns:
+            None to continue, or a 401 response
+        """
+        if not self.internal_token:
+            if self.internal_dev_open:
+                return None
+            return _unauthorized('INTERNAL_API_TOKEN is not configured')
+        sent = request.headers.get(INTERNAL_TOKEN_HEADER, '')
+        if not hmac.compare_digest(sent.encode(), self.internal_token.encode()):
+            return _unauthorized('Internal API token required')
+        return None
+
+def _unauthorized(message):
+    """Build a 401 JSON response with a WWW-Authenticate challenge."""
+    response = jsonify({'success': False, 'error': message})
+    response.headers['WWW-Authenticate'] = 'Bearer'
+    return response, 401
+
+def require_token():
+    """
+    Reject an anonymous request.
+
+    For reads that are scoped to the caller (g.auth_user_id) rather than
+    to a user_id in the request.
+
+    Returns:
+        None if the request carries a valid access token, otherwise a 401 JSON response tuple
+
+    Usage:
+        denied = require_token()
+        if denied:
+            return denied
+    """
+    if g.get('auth_user_id') is None:
+        return _unauthorized('Access token required')
+    return None
+
+def require_service_token():
+    """
+    Reject a request that does not carry the service token.
+
+    /api/internal/ paths are checked by the before_request hook already;
+    this is for operator endpoints elsewhere. Like them it fails closed
+    while INTERNAL_API_TOKEN is unset (unless INTERNAL_API_DEV_OPEN is on).
+
+    Returns:
+        None if the X-Internal-Token header matches INTERNAL_API_TOKEN,
+        otherwise a 401 JSON response tuple
+
+    Usage:
+        denied = require_service_token()
+        if denied:
+            return denied
+    """
+    return token_verifier._authenticate_internal()
+
+def forbid_other_user(user_id):
+    """
+    Reject a request for data of any user but the token's.
+
+    A user_id in the request proves nothing, so anonymous requests are
+    rejected too, even while AUTH_REQUIRED is off.
+
+    Parameters:
+        user_id: user_id taken from the request (int or str)
+
+    Returns:
+        None if allowed, otherwise a 401 (no token) or 403 (another
+        user's data) JSON response tuple
+
+    Usage:
+        denied = forbid_other_user(user_id)
+        if denied:
+            return denied
+    """
+    auth_user_id = g.get('auth_user_id')
+    if auth_user_id is None:
+        return _unauthorized('Access token required')
+    try:
+        if int(user_id) == auth_user_id:
+            return None
+    except (TypeError, ValueError):
+        pass
+    return jsonify({'success': False, 'error': 'Not allowed to access another user\'s data'}), 403
+
+def forward_auth_headers():
+    """
+    Return the caller's Authorization header for a downstream service call.
+
+    Call it on the request thread (not inside a worker thread).
+
+    Returns:
+        dict: {'Authorization': ...} or {} outside a request / without a token
+    """
+    if has_request_context() and request.headers.get('Authorization'):
+        return {'Authorization': request.headers['Authorization']}
+    return {}
+
+def internal_headers():
+    """
+    Return the service token header for a call to another service's /api/internal/ endpoint.
+
+    Safe to call from background threads.
+
+    Returns:
+        dict: {'X-Internal-Token': ...} or {} if INTERNAL_API_TOKEN is unset
+    """
+    if token_verifier.internal_token:
+        return {INTERNAL_TOKEN_HEADER: token_verifier.internal_token}
+    return {}
+
+# Shared verifier instance, configured by create_app()
+token_verifier = TokenVerifier()
@@ -0,0 +1,97 @@
+"""
+====================================================================================
+conditional.py - Conditional GET (ETag / 304) Helpers for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Lets read routes answer "304 Not Modified" without loading or serializing
+    the resource, when the client already holds the current version
+  - ETags are strong and derived from the row 'version' counters, which the
+    ORM increments on every UPDATE (see each service's models.py)
+
+Major Functions:
+  - etag_for: Build an ETag value from identifying parts (id, version, variant)
+  - etag_for_rows: Build an ETag for a list from its (id, version) pairs
+  - not_modified: 304 response if the request's If-None-Match matches, else None
+  - with_etag: Attach the ETag (and revalidation policy) to a full response
+
+Usage:
+  - from sortedshelf_common.conditional import etag_for, not_modified, with_etag
+  - etag = etag_for('media', media_id, version)
+  - cached = not_modified(etag)
+  - if cached: return cached
+  - return with_etag(jsonify({...}), etag), 200
+
+====================================================================================
+"""
+
+import hashlib
+
+from flask import make_response, request
+
+# Clients may keep a copy but must revalidate it on every use
+CACHE_CONTROL = 'private, no-cache'
+
+def etag_for(*parts):
+    """
+    Build a strong ETag value (without quotes) from identifying parts.
+
+    Parameters:
+        *parts: Values that change whenever the representation changes,
+            e.g. ('media', 12, 3, 'metadata')
+
+    Returns:
+        str: ETag value such as 'media-12-3-metadata'
+    """
+    return '-'.join(str(part) for part in parts)
+
+def etag_for_rows(prefix, rows):
+    """
+    Build an ETag for a list resource from its (id, version) pairs.
+
+    Parameters:
+        prefix (str): Resource name and variant, e.g. 'collections-7'
+        rows (iterable): (id, version) tuples in response order
+
+    Returns:
+        str: prefix plus a digest of every id/version pair
+    """
+    digest = hashlib.sha1()
+    for row_id, version in rows:
+        digest.update(f'{row_id}:{version};'.encode())
+    return f'{prefix}-{digest.hexdigest()}'
+
+def not_modified(etag):
+    """
+    Answer 304 if the client's If-None-Match already names this ETag.
+
+    Parameters:
+        etag (str): Current ETag value (from etag_for)
+
+    Returns:
+        Response or None: Empty 304 response, or None to build the full body
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def with_etag(response, etag):
+    """
+    Attach the ETag and revalidation policy to a full response.
+
+    Parameters:
+        response (Response): Response built by jsonify()
+        etag (str): Current ETag value
+
+    Returns:
+        Response: The same response
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
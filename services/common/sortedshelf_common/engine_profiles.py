@@ -0,0 +1,132 @@
+"""
+====================================================================================
+engine_profiles.py - Database Engine Profiles for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Turns the named DB_PROFILE into SQLAlchemy engine options, so the
+    services no longer run on library defaults:
+    - dev-sqlite: WAL journal (readers no longer block the writer),
+      synchronous=NORMAL, memory-mapped reads and a busy timeout, set on
+      every new connection
+    - prod-mysql: sized connection pool, pre-ping, recycling below MySQL's
+      wait_timeout, connect/read/write timeouts and a server-side
+      statement timeout (max_execution_time, applies to SELECTs)
+  - Logs one line at startup with the effective settings
+
+Major Functions:
+  - apply_profile: Fill SQLALCHEMY_ENGINE_OPTIONS from the profile (before db.init_app)
+  - init_app: Install the SQLite pragmas and log the settings (after db.init_app)
+
+Configuration (config.py):
+  - DB_PROFILE: 'dev-sqlite' or 'prod-mysql' (default: from the DATABASE_URL scheme)
+  - DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT / DB_POOL_RECYCLE: Pool settings
+  - DB_CONNECT_TIMEOUT / DB_READ_TIMEOUT / DB_STATEMENT_TIMEOUT_MS: MySQL timeouts
+  - SQLITE_BUSY_TIMEOUT_MS / SQLITE_MMAP_SIZE: SQLite pragmas
+
+Usage:
+  - from sortedshelf_common import engine_profiles
+  - engine_profiles.apply_profile(app); db.init_app(app); engine_profiles.init_app(app, db)
+  - An explicit SQLALCHEMY_ENGINE_OPTIONS in the config takes precedence
+
+====================================================================================
+"""
+
+
+from sqlalchemy import event
+
+PROFILES = ('dev-sqlite', 'prod-mysql')
+
+def _profile_options(config):
+    """
+    Build the engine options of the configured profile.
+
+    Raises:
+        ValueError: If DB_PROFILE is not one of PROFILES
+    """
+    profile = config['DB_PROFILE']
+    if profile == 'dev-sqlite':
+        # Flask-SQLAlchemy picks the pool for SQLite (static for in-memory
+        # databases); concurrency is governed by the pragmas instead
+        return {}
+    if profile == 'prod-mysql':
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+            # Recycle before MySQL's wait_timeout closes idle connections,
+            # and test each checkout so a dropped connection is replaced
+            'pool_recycle': config['DB_POOL_RECYCLE'],
+            'pool_pre_ping': True,
+            'connect_args': {
+                'connect_timeout': config['DB_CONNECT_TIMEOUT'],
+                'read_timeout': config['DB_READ_TIMEOUT'],
+                'write_timeout': config['DB_READ_TIMEOUT'],
+                'init_command': f"SET SESSION max_execution_time = {int(config['DB_STATEMENT_TIMEOUT_MS'])}"
+            }
+        }
+    raise ValueError(f"Unknown DB_PROFILE {profile!r} (expected one of: {', '.join(PROFILES)})")
+
+def _sqlite_pragmas(config, in_memory):
+    """PRAGMA (name, value) pairs run on every new SQLite connection."""
+    pragmas = [
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT_MS'])),
+        ('synchronous', 'NORMAL'),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE']))
+    ]
+    if not in_memory:
+        # In-memory databases have no journal file to switch
+        pragmas.insert(0, ('journal_mode', 'WAL'))
+    return pragmas
+
+def apply_profile(app):
+    """
+    Set SQLALCHEMY_ENGINE_OPTIONS from DB_PROFILE, unless it is set explicitly.
+
+    Must run before db.init_app(app), which creates the engine.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+
+    Raises:
+        ValueError: If DB_PROFILE is unknown
+    """
+    options = _profile_options(app.config)
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def init_app(app, db):
+    """
+    Install the SQLite pragmas and log the effective engine settings.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+        db (SQLAlchemy): Extension whose engine was just created
+    """
+    with app.app_context():
+        engine = db.engine
+    settings = {
+        key: value for key, value in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items() if key != 'connect_args'
+    }
+    if engine.dialect.name == 'sqlite' and app.config['DB_PROFILE'] == 'dev-sqlite':
+        pragmas = _sqlite_pragmas(app.config, engine.url.database in (None, '', ':memory:'))
+
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.close()
+
+        event.listen(engine, 'connect', set_pragmas)
+        settings.update({f'pragma {name}': value for name, value in pragmas})
+    else:
+        settings.update(app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('connect_args', {}))
+
+    app.logger.info(
+        'Database profile %s on %s: %s', app.config['DB_PROFILE'],
+        engine.url.render_as_string(hide_password=True),
+        ', '.join(f'{key}={value}' for key, value in settings.items()) or 'library defaults'
+    )
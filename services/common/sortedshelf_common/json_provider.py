@@ -0,0 +1,194 @@
+"""
+====================================================================================
+json_provider.py - Fast JSON Encoding for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Encodes every jsonify() response with orjson when it is installed
+    (several times faster than the standard library on large lists), and
+    with the standard library otherwise; the output is the same either way
+  - Builds list responses straight from Core row tuples: a serializer is
+    compiled once per model and field list, so a 10k-row page needs no
+    ORM objects and no to_dict() call per row
+
+Major Components:
+  - FastJSONProvider class: Flask JSON provider backed by orjson
+  - row_serializer: Cached (columns, serialize) pair for a model's fields
+  - parse_fields: Validate a ?fields= sparse fieldset against an allow-list
+  - pick_fields: Trim an already built dict to a sparse fieldset
+  - init_app: Install the provider on the app
+
+Usage:
+  - from sortedshelf_common import json_provider
+    json_provider.init_app(app) in create_app(); jsonify() then uses it
+  - columns, serialize = row_serializer(Media, ('id', 'title'))
+    rows = db.session.execute(select(*columns)).all()
+    return jsonify({'media': [serialize(row) for row in rows]})
+
+====================================================================================
+"""
+
+import json
+from datetime import date, datetime
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library encoder
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when available.
+
+    Keeps the default provider's behaviour: keys are sorted, datetimes are
+    passed through to DefaultJSONProvider.default (HTTP dates), and debug
+    apps pretty-print.
+    """
+
+    def _encode(self, obj):
+        """Encode obj to UTF-8 JSON bytes with orjson."""
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.compact is False or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize obj to a JSON string.
+
+        Calls with json.dumps() options other than the provider's own
+        layout ones (e.g. cls=) use the standard library.
+        """
+        if orjson is None or set(kwargs) - {'indent', 'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response (what jsonify() calls), encoding straight to bytes."""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b'\n', mimetype=self.mimetype)
+
+def _isoformat(value):
+    """Render a datetime column the way to_dict() does."""
+    return value.isoformat() if value is not None else None
+
+@lru_cache(maxsize=None)
+def row_serializer(model, fields, rename=()):
+    """
+    Compile a serializer from Core rows of a model's columns to dicts.
+
+    Datetime columns are rendered with isoformat(), like the models'
+    to_dict(); every other value is passed through as is.
+
+    Parameters:
+        model: Mapped model class, e.g. Media
+        fields (tuple[str]): Attribute names, in output order
+        rename (tuple): (attribute, key) pairs for keys that differ from
+            the attribute name (optional)
+
+    Returns:
+        tuple: (columns, serialize)
+            columns (list): Column attributes to select, in field order
+            serialize (callable): serialize(row) -> dict for one row of
+                select(*columns) (or a Row with those columns first)
+    """
+    mapper = inspect(model)
+    columns = [getattr(model, field) for field in fields]
+    keys = tuple(dict(rename).get(field, field) for field in fields)
+    converters = [(index, _isoformat) for index, field in enumerate(fields) if _is_temporal(mapper.columns[field])]
+    width = len(keys)
+
+    if not converters:
+        def serialize(row):
+            return dict(zip(keys, row[:width]))
+    else:
+        def serialize(row):
+            values = list(row[:width])
+            for index, convert in converters:
+                values[index] = convert(values[index])
+            return dict(zip(keys, values))
+    return columns, serialize
+
+def parse_fields(raw, allowed, required=('id',)):
+    """
+    Parse a ?fields= value (comma-separated field names) against an allow-list.
+
+    Parameters:
+        raw (str): Query parameter value ('' or None when absent)
+        allowed (tuple[str]): Fields the endpoint can return, in output order
+        required (tuple[str]): Fields always included (e.g. the ID clients key on)
+
+    Returns:
+        tuple[str] or None: Requested plus required fields in allow-list
+            order (stable, so row_serializer compiles each fieldset once),
+            or None when no fields were requested
+
+    Raises:
+        ValueError: If a requested field is not in the allow-list
+    """
+    if not raw:
+        return None
+    requested = {part.strip() for part in raw.split(',') if part.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))} (allowed: {', '.join(allowed)})")
+    requested.update(required)
+    return tuple(field for field in allowed if field in requested)
+
+def pick_fields(item, fields):
+    """
+    Trim a dict to a sparse fieldset.
+
+    Parameters:
+        item (dict or None): Serialized object
+        fields (tuple[str] or None): Fields from parse_fields (None keeps every key)
+
+    Returns:
+        dict or None: New dict with only the requested keys (item itself if fields is None)
+    """
+    if fields is None or item is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+def _is_temporal(column):
+    """Whether a column holds datetime or date values."""
+    try:
+        return issubclass(column.type.python_type, (datetime, date))
+    except NotImplementedError:
+        return False
+
+def dumps(obj):
+    """
+    Encode obj with the fast path outside a request (benchmarks, CLI).
+
+    Returns:
+        str: JSON text, keys sorted
+    """
+    if orjson is None:
+        return json.dumps(obj, sort_keys=True, default=DefaultJSONProvider.default)
+    option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    return orjson.dumps(obj, default=DefaultJSONProvider.default, option=option).decode('utf-8')
+
+def init_app(app):
+    """
+    Encode the app's JSON responses with FastJSONProvider.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,246 @@
+"""
+====================================================================================
+metrics.py - Request Metrics for SortedShelf Services (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Records, for every request: latency per route, response status,
+    requests in flight, and the number and total time of the SQL
+    statements it ran (SQLAlchemy engine events)
+  - Records the latency and outcome of outbound HTTP calls made through
+    observe_call() (collection-service's media-service client)
+  - Serves everything on GET /metrics in the Prometheus text format
+  - Overhead is a lock acquisition per request and two clock reads per
+    SQL statement; nothing is rendered until /metrics is scraped
+
+Major Components:
+  - Metrics class: In-process registry hooked into the Flask request cycle
+    - init_app: Install the request hooks, SQL timing and the /metrics route
+    - observe_call: Record one outbound HTTP call
+    - render: Prometheus text exposition of everything recorded
+  - metrics: Shared instance registered by create_app()
+
+Configuration (config.py):
+  - METRICS_ENABLED: Record metrics and serve /metrics (default on)
+
+Usage:
+  - from sortedshelf_common.metrics import metrics
+  - metrics.init_app(app, db) in create_app(), right after db.init_app(app)
+    so its hooks run before any other before_request hook
+  - curl http://localhost:5002/metrics (each service on its own port)
+  - Routes are labelled by their URL rule (/api/media/<int:media_id>), so
+    the number of series stays bounded; unmatched URLs share one label
+  - Counters are per worker process; scrape each worker (or run one) when
+    serving with several
+
+====================================================================================
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the latency buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the SQL-statements-per-request buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class _Histogram:
+    """
+    Bucketed observations per label set (Prometheus histogram semantics).
+
+    Each series is a list: one count per bucket, one for +Inf, then the
+    sum of all observed values. Callers hold the registry lock.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts = self.series.get(labels)
+        if counts is None:
+            counts = self.series[labels] = [0] * (len(self.buckets) + 1) + [0]
+        # bisect_left: a value equal to a bound belongs to that bucket (le)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def snapshot(self):
+        return {labels: list(counts) for labels, counts in self.series.items()}
+
+def _escape(value):
+    """Escape a label value for the text format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    """Render {name="value",...} ('' when there are no labels)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _bound(value):
+    """Render a bucket bound the way Prometheus clients do (0.5, 1.0, 10)."""
+    return '+Inf' if value == float('inf') else repr(float(value))
+
+class Metrics:
+    """
+    Request, SQL and outbound-call metrics for one worker process.
+
+    Attributes:
+        enabled (bool): Whether init_app installs the hooks and /metrics
+        in_flight (int): Requests currently being handled
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._latency = _Histogram(LATENCY_BUCKETS)
+        self._sql_queries = _Histogram(QUERY_COUNT_BUCKETS)
+        self._sql_time = _Histogram(LATENCY_BUCKETS)
+        self._calls = {}
+        self._call_latency = _Histogram(LATENCY_BUCKETS)
+
+    def init_app(self, app, db):
+        """
+        Record every request of the app and serve GET /metrics.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+            db (SQLAlchemy): Extension whose engine is timed
+        """
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        if not self.enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish_request)
+        with app.app_context():
+            engine = db.engine
+        for name, handler in (('before_cursor_execute', _query_started),
+                              ('after_cursor_execute', _query_finished)):
+            if not event.contains(engine, name, handler):
+                event.listen(engine, name, handler)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view, methods=['GET'])
+        app.extensions['metrics'] = self
+
+    def _start_request(self):
+        """before_request hook: start the clock and the per-request SQL counters."""
+        # [start time, SQL statements, SQL seconds]
+        g._metrics = [time.perf_counter(), 0, 0.0]
+        with self._lock:
+            self.in_flight += 1
+
+    def _record_status(self, response):
+        """after_request hook: remember the status code (also runs for error responses)."""
+        g._metrics_status = response.status_code
+        return response
+
+    def _finish_request(self, exc):
+        """teardown_request hook: record the finished request."""
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        elapsed = time.perf_counter() - state[0]
+        status = str(g.pop('_metrics_status', 500))
+        route = (request.method, request.url_rule.rule if request.url_rule is not None else 'unmatched')
+        with self._lock:
+            self.in_flight -= 1
+            key = route + (status,)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._latency.observe(route, elapsed)
+            self._sql_queries.observe(route, state[1])
+            self._sql_time.observe(route, state[2])
+
+    def observe_call(self, service, call, seconds, outcome):
+        """
+        Record one outbound HTTP call.
+
+        Parameters:
+            service (str): Called service, e.g. 'media-service'
+            call (str): Short name of the endpoint, e.g. 'media_batch'
+            seconds (float): Wall time of the call
+            outcome (str or int): Status code, or 'error' when no response arrived
+        """
+        if not self.enabled:
+            return
+        key = (service, call, str(outcome))
+        with self._lock:
+            self._calls[key] = self._calls.get(key, 0) + 1
+            self._call_latency.observe((service, call), seconds)
+
+    def render(self):
+        """
+        Render everything recorded so far.
+
+        Returns:
+            str: Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            in_flight = self.in_flight
+            requests_total = dict(self._requests)
+            calls_total = dict(self._calls)
+            histograms = [
+                ('http_request_duration_seconds', 'Time to build the response, by route.',
+                 ('method', 'route'), LATENCY_BUCKETS, self._latency.snapshot()),
+                ('http_request_sql_queries', 'SQL statements run per request, by route.',
+                 ('method', 'route'), QUERY_COUNT_BUCKETS, self._sql_queries.snapshot()),
+                ('http_request_sql_duration_seconds', 'Total SQL time per request, by route.',
+                 ('method', 'route'), LATENCY_BUCKETS, self._sql_time.snapshot()),
+                ('http_client_request_duration_seconds', 'Outbound HTTP call time, by service and call.',
+                 ('service', 'call'), LATENCY_BUCKETS, self._call_latency.snapshot())
+            ]
+
+        lines = [
+            '# HELP http_requests_in_flight Requests currently being handled.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {in_flight}'
+        ]
+        for name, help_text, names, values in (
+                ('http_requests_total', 'Requests handled, by route and status.',
+                 ('method', 'route', 'status'), requests_total),
+                ('http_client_requests_total', 'Outbound HTTP calls, by service, call and outcome.',
+                 ('service', 'call', 'outcome'), calls_total)):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            lines += [f'{name}{_labels(names, labels)} {count}' for labels, count in sorted(values.items())]
+
+        for name, help_text, names, buckets, series in histograms:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for labels, counts in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_labels(names, labels, [("le", _bound(bound))])} {cumulative}')
+                lines.append(f'{name}_sum{_labels(names, labels)} {counts[-1]}')
+                lines.append(f'{name}_count{_labels(names, labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def _metrics_view(self):
+        """GET /metrics"""
+        return Response(self.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    """before_cursor_execute: note when the statement started."""
+    conn.info['metrics_query_start'] = time.perf_counter()
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    """after_cursor_execute: add the statement to the current request's SQL counters."""
+    started = conn.info.pop('metrics_query_start', None)
+    if started is None or not has_request_context():
+        return
+    state = g.get('_metrics')
+    if state is not None:
+        state[1] += 1
+        state[2] += time.perf_counter() - started
+
+# Shared registry, configured by create_app()
+metrics = Metrics()
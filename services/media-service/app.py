@@ -15,9 +15,17 @@ Purpose:
 Major Functions:
   - create_app: Application factory function
     - Loads config from config.py
+    - Installs the fast JSON response encoder
     - Initializes database and migration extensions
+    - Applies the database engine profile (pool, timeouts, SQLite pragmas)
+    - Records request metrics and serves them on /metrics
     - Enables CORS for API access
-    - Registers routes and models
+    - Installs the access token verifier
+    - Configures the collection-service client
+    - Sets up the full-text search index
+    - Configures the read-through media cache
+    - Writes outbox change events with every media commit
+    - Registers routes, models and CLI commands
 
 Security:
   - Uses environment variables for secrets and DB config
@@ -58,14 +66,50 @@ def create_app():
     
     # Load configuration from config.py
     app.config.from_object(Config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    
+    # Encode JSON responses with orjson when it is installed
+    from sortedshelf_common import json_provider
+    json_provider.init_app(app)
     
     # Initialize database and migration extensions
+    # (engine pool, timeouts and SQLite pragmas come from DB_PROFILE;
+    # search structures are managed by search.py, not by migrations)
+    from sortedshelf_common import engine_profiles
+    import search
+    engine_profiles.apply_profile(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    engine_profiles.init_app(app, db)
+    migrate.init_app(app, db, include_object=search.include_object)
+    
+    # Request latency, status and SQL metrics on /metrics (hooks run first)
+    from sortedshelf_common.metrics import metrics
+    metrics.init_app(app, db)
+    
+    # Make sure the full-text search index exists before requests are served
+    search.init_app(app)
     
     # Enable CORS for frontend access (restricted to localhost:3000 for security)
     CORS(app, origins=["http://localhost:3000"])
     
+    # Configure the shared collection-service client (connection pool, base URL)
+    from collection_client import collection_client
+    collection_client.init_app(app)
+    
+    # Read-through cache for single items and metadata (invalidated on commit);
+    # committed changes are also pushed to collection-service's media cache
+    from cache import media_cache
+    media_cache.init_app(app, db)
+    media_cache.add_commit_listener(collection_client.notify_media_changed)
+    
+    # Record a change event in the same transaction as every media write
+    import outbox
+    outbox.init_app(app)
+    
+    # Verify access tokens locally (keys cached from auth-service)
+    from sortedshelf_common.auth_tokens import token_verifier
+    token_verifier.init_app(app)
+    
     # Register API routes blueprint
     from routes import bp as routes_bp
     app.register_blueprint(routes_bp)
@@ -73,6 +117,10 @@ def create_app():
     # Import models to ensure they are registered with SQLAlchemy
     import models
     
+    # Register maintenance CLI commands (flask <command>)
+    import commands
+    commands.init_app(app)
+    
     return app
 
 # Allow running the service directly for development
@@ -0,0 +1,113 @@
+"""
+====================================================================================
+benchmarks.py - Response Serialization Benchmark for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Measures how long a large GET /api/media response takes to build and
+    encode, comparing the old path (ORM objects, a hand-built dict per row,
+    standard library json) with the current one (Core row tuples, a
+    compiled row serializer, json_provider's orjson encoder)
+  - Runs against a throwaway in-memory SQLite database, so it needs no
+    data and never touches the configured one
+
+Major Functions:
+  - bench_serialization: Time both paths and report the results
+
+Usage:
+  - flask bench-serialization [--rows 10000] [--repeat 5]
+
+====================================================================================
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from sortedshelf_common.json_provider import dumps, orjson, row_serializer
+
+from app import db
+from models import Media
+from routes import LIST_FIELDS
+
+def _old_path(session):
+    """ORM objects, one hand-built dict per row, standard library encoder (build, encode seconds)."""
+    started = time.perf_counter()
+    items = session.execute(select(Media).order_by(Media.id)).scalars().all()
+    result = [
+        {
+            'id': media.id,
+            'title': media.title,
+            'creator': media.creator,
+            'year': media.year,
+            'type': media.type,
+            'publish_date': media.publish_date,
+            'date_added': media.date_added.isoformat() if media.date_added else None
+        } for media in items
+    ]
+    built = time.perf_counter()
+    json.dumps({'media': result}, sort_keys=True, separators=(',', ':'))
+    session.expunge_all()
+    return built - started, time.perf_counter() - built
+
+def _new_path(session):
+    """Core rows, compiled row serializer, json_provider encoder (build, encode seconds)."""
+    started = time.perf_counter()
+    columns, serialize = row_serializer(Media, LIST_FIELDS)
+    rows = session.execute(select(*columns).order_by(Media.id)).all()
+    result = [serialize(row) for row in rows]
+    built = time.perf_counter()
+    dumps({'media': result})
+    return built - started, time.perf_counter() - built
+
+def bench_serialization(rows=10000, repeat=5, echo=print):
+    """
+    Time both serialization paths on a generated catalog.
+
+    Each path runs repeat times; the best run is reported.
+
+    Parameters:
+        rows (int): Media rows in the response
+        repeat (int): Runs per path
+        echo (callable): Receives one report line per path
+
+    Returns:
+        dict: {'old': (build, encode), 'new': (build, encode)} best times in seconds
+    """
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Media), [
+            {
+                'user_id': 1,
+                'title': f'Title {i}',
+                'creator': f'Creator {i % 500}',
+                'year': 1950 + i % 70,
+                'type': 'book',
+                'publish_date': f'{1950 + i % 70}-01-01',
+                'status': 'Not Started',
+                'date_added': now - timedelta(minutes=i),
+                'updated_at': now
+            } for i in range(rows)
+        ])
+
+    results = {}
+    with Session(engine) as session:
+        for name, path in (('old', _old_path), ('new', _new_path)):
+            runs = [path(session) for _ in range(repeat)]
+            results[name] = min(runs, key=sum)
+    engine.dispose()
+
+    encoder = 'orjson' if orjson is not None else 'json (orjson not installed)'
+    for name, label in (('old', 'ORM + to_dict-style dicts + json'), ('new', f'Core rows + row serializer + {encoder}')):
+        build, encode = results[name]
+        echo(f'{name}: {label}: build {build * 1000:.1f} ms, encode {encode * 1000:.1f} ms, '
+             f'total {(build + encode) * 1000:.1f} ms')
+    echo(f'speedup: {sum(results["old"]) / sum(results["new"]):.1f}x for {rows} rows')
+    return results
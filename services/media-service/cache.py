@@ -0,0 +1,377 @@
+"""
+====================================================================================
+cache.py - Read-Through Media Cache for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Serves repeat reads of individual media items and their metadata lists
+    (item pages, collection-service fan-out) without touching the database
+  - Two levels: a bounded, TTL'd LRU in every worker process, and an optional
+    shared backend (e.g. Redis or memcached) plugged in through config
+  - Invalidated automatically after any commit that changed a media item or
+    its metadata through the ORM; a load that overlaps an invalidation is
+    served but not stored, so a slow reader cannot re-cache old data
+    (across processes the shared backend relies on MEDIA_CACHE_TTL for that)
+
+Major Components:
+  - LRUCache class: Thread-safe bounded LRU with per-entry TTL and counters
+  - InMemorySharedBackend class: Stand-in for a shared backend (tests, single host)
+  - MediaCache class: Read-through layer used by routes.py
+    - init_app: Reads MEDIA_CACHE_* settings and hooks session commit events
+    - get_many: Read-through lookup of many IDs with a loader for the misses
+    - invalidate: Drop cached entries for media IDs
+    - add_commit_listener: Be told which existing items a commit changed
+    - stats: Hit / miss / eviction counters (GET /api/media/cache/stats)
+  - media_cache: Shared instance registered by create_app()
+
+Configuration (config.py):
+  - MEDIA_CACHE_SIZE: Entries kept per worker process (0 disables the local cache)
+  - MEDIA_CACHE_TTL: Seconds an entry may be served before it is reloaded
+  - MEDIA_CACHE_BACKEND: '' (none), 'memory', or 'module:factory' returning an
+    object with get_many(keys), set_many(mapping, ttl) and delete_many(keys)
+
+Security:
+  - Entries carry user_id, so routes apply the same ownership checks to cached data
+
+Usage:
+  - entries = media_cache.get_many('media', [1, 2], load_media)
+  - media_cache.invalidate([1])   # only needed for writes that bypass the ORM
+
+====================================================================================
+"""
+
+import importlib
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+# Sentinel for "not in cache" (None is a legitimate cached value)
+MISSING = object()
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a size bound and a per-entry TTL.
+
+    Attributes:
+        maxsize (int): Maximum number of entries
+        ttl (float): Seconds an entry stays valid
+        hits, misses, evictions, expirations (int): Counters since start
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or MISSING if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = item
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Return the counters and current size.
+
+        Returns:
+            dict: hits, misses, evictions, expirations, size, maxsize, ttl, hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
+
+class InMemorySharedBackend:
+    """
+    In-process stand-in for a shared cache backend.
+
+    Implements the interface MediaCache expects from a real shared store
+    (get_many / set_many / delete_many on string keys), so the two-level
+    path can be exercised without running Redis or memcached.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return {key: value} for the keys that are present and unexpired."""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is not None and item[0] > now:
+                    found[key] = item[1]
+        return found
+
+    def set_many(self, mapping, ttl):
+        """Store every key/value pair for ttl seconds."""
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = (expires_at, value)
+
+    def delete_many(self, keys):
+        """Remove the given keys."""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+def _load_backend(spec, app):
+    """
+    Build the shared backend named by MEDIA_CACHE_BACKEND.
+
+    Returns:
+        object or None: Backend instance, or None if no backend is configured
+    """
+    if not spec:
+        return None
+    if spec == 'memory':
+        return InMemorySharedBackend()
+    module_name, _, factory_name = spec.partition(':')
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory(app)
+
+class MediaCache:
+    """
+    Read-through cache for media items ('media') and metadata lists ('metadata').
+
+    Attributes:
+        local (LRUCache): Per-process cache
+        backend (object or None): Optional shared backend
+        invalidations (int): Media IDs invalidated since start
+        shared_hits, shared_misses (int): Shared backend counters
+    """
+
+    # Every kind cached per media item (invalidate() drops all of them)
+    KINDS = ('media', 'metadata')
+
+    def __init__(self):
+        self.local = LRUCache(10000, 60.0)
+        self.backend = None
+        self.invalidations = 0
+        self.shared_hits = 0
+        self.shared_misses = 0
+        # Bumped by every invalidate(); loads that overlap one are not stored
+        self._generation = 0
+        # Called with the IDs of existing items each commit changed
+        self._commit_listeners = []
+
+    def init_app(self, app, db):
+        """
+        Load cache settings and invalidate on commit.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+            db (SQLAlchemy): Extension whose session writes are watched
+        """
+        self.local = LRUCache(app.config.get('MEDIA_CACHE_SIZE', 10000), app.config.get('MEDIA_CACHE_TTL', 60.0))
+        self.backend = _load_backend(app.config.get('MEDIA_CACHE_BACKEND'), app)
+        self._commit_listeners = []
+        for name, handler in (('after_flush', self._collect_changes),
+                              ('after_commit', self._invalidate_committed),
+                              ('after_soft_rollback', self._discard_changes)):
+            if not event.contains(db.session, name, handler):
+                event.listen(db.session, name, handler)
+        app.extensions['media_cache'] = self
+
+    @staticmethod
+    def _shared_key(kind, media_id):
+        """Key used in the shared backend."""
+        return f'media-service:{kind}:{media_id}'
+
+    def get_many(self, kind, media_ids, loader):
+        """
+        Look up many media IDs, loading only the misses.
+
+        Parameters:
+            kind (str): 'media' or 'metadata'
+            media_ids (list[int]): IDs to look up
+            loader (callable): loader(missing_ids) -> {media_id: value} for the
+                IDs that exist; IDs it leaves out are not cached
+
+        Returns:
+            dict: media_id -> cached or freshly loaded value (absent IDs omitted)
+        """
+        found = {}
+        missing = []
+        for media_id in media_ids:
+            value = self.local.get((kind, media_id))
+            if value is MISSING:
+                missing.append(media_id)
+            else:
+                found[media_id] = value
+
+        if missing and self.backend is not None:
+            shared = self.backend.get_many([self._shared_key(kind, media_id) for media_id in missing])
+            still_missing = []
+            for media_id in missing:
+                value = shared.get(self._shared_key(kind, media_id), MISSING)
+                if value is MISSING:
+                    still_missing.append(media_id)
+                else:
+                    found[media_id] = value
+                    self.local.set((kind, media_id), value)
+            self.shared_hits += len(missing) - len(still_missing)
+            self.shared_misses += len(still_missing)
+            missing = still_missing
+
+        if missing:
+            generation = self._generation
+            loaded = loader(missing)
+            found.update(loaded)
+            if generation != self._generation:
+                # A write committed while we were loading; what we read may
+                # predate it, so serve it once but do not cache it
+                return found
+            for media_id, value in loaded.items():
+                self.local.set((kind, media_id), value)
+            if loaded and self.backend is not None:
+                self.backend.set_many(
+                    {self._shared_key(kind, media_id): value for media_id, value in loaded.items()},
+                    self.local.ttl
+                )
+        return found
+
+    def get(self, kind, media_id, loader):
+        """
+        Look up one media ID (see get_many).
+
+        Returns:
+            object or None: Cached or loaded value, None if the item does not exist
+        """
+        return self.get_many(kind, [media_id], loader).get(media_id)
+
+    def invalidate(self, media_ids):
+        """
+        Drop every cached kind for the given media IDs (both levels).
+
+        Parameters:
+            media_ids (iterable[int]): Created, changed or deleted media IDs
+        """
+        media_ids = list(media_ids)
+        if not media_ids:
+            return
+        self._generation += 1
+        for media_id in media_ids:
+            for kind in self.KINDS:
+                self.local.delete((kind, media_id))
+        if self.backend is not None:
+            self.backend.delete_many([
+                self._shared_key(kind, media_id) for media_id in media_ids for kind in self.KINDS
+            ])
+        self.invalidations += len(media_ids)
+
+    def add_commit_listener(self, listener):
+        """
+        Register a callable told about committed changes to existing items.
+
+        Items created in the same transaction are left out (nobody can have
+        cached them yet).
+
+        Parameters:
+            listener (callable): listener(media_ids) with a non-empty list of IDs
+        """
+        self._commit_listeners.append(listener)
+
+    def _collect_changes(self, session, flush_context):
+        """after_flush: remember which media items this transaction wrote."""
+        from models import Media, MediaMetadata
+        changed = session.info.setdefault('media_cache_changed', set())
+        created = session.info.setdefault('media_cache_created', set())
+        for obj in session.new:
+            if isinstance(obj, Media) and obj.id is not None:
+                created.add(obj.id)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Media) and obj.id is not None:
+                changed.add(obj.id)
+            elif isinstance(obj, MediaMetadata) and obj.media_id is not None:
+                changed.add(obj.media_id)
+
+    def _invalidate_committed(self, session):
+        """after_commit: invalidate everything the transaction wrote."""
+        changed = session.info.pop('media_cache_changed', set())
+        created = session.info.pop('media_cache_created', set())
+        self.invalidate(changed)
+        existing = sorted(changed - created)
+        if existing:
+            for listener in self._commit_listeners:
+                listener(existing)
+
+    def _discard_changes(self, session, previous_transaction):
+        """after_soft_rollback: nothing was written, nothing to invalidate."""
+        session.info.pop('media_cache_changed', None)
+        session.info.pop('media_cache_created', None)
+
+    def stats(self):
+        """
+        Return local and shared counters for sizing the cache.
+
+        Returns:
+            dict: {'local': {...}, 'shared': {...} or None, 'invalidations': int}
+        """
+        shared = None
+        if self.backend is not None:
+            lookups = self.shared_hits + self.shared_misses
+            shared = {
+                'backend': type(self.backend).__name__,
+                'hits': self.shared_hits,
+                'misses': self.shared_misses,
+                'hit_ratio': round(self.shared_hits / lookups, 4) if lookups else None
+            }
+        return {'local': self.local.stats(), 'shared': shared, 'invalidations': self.invalidations}
+
+# Shared cache instance, configured by create_app()
+media_cache = MediaCache()
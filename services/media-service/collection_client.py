@@ -0,0 +1,182 @@
+"""
+====================================================================================
+collection_client.py - Collection Service Client for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Single place for all cross-service calls from media-service to collection-service
+  - Reuses keep-alive HTTP connections instead of opening one per call
+  - Tells collection-service which media items changed, so its media cache
+    drops them (sent from a background thread after the commit)
+
+Major Components:
+  - CollectionClient class: Pooled client for collection-service
+    - init_app: Reads COLLECTION_SERVICE_URL and the call timeout from app config
+    - get_ratings: Batch rating lookup for one user's media items
+    - notify_media_changed: Push changed media IDs to collection-service's cache
+    - send_media_events: Deliver outbox events to collection-service's projection
+  - collection_client: Shared instance registered by create_app()
+
+Configuration (config.py):
+  - COLLECTION_SERVICE_URL: Base URL of collection-service
+  - COLLECTION_CLIENT_TIMEOUT: Per-call timeout in seconds
+  - COLLECTION_NOTIFY_CHANGES: Push media changes to collection-service (on by default)
+
+Usage:
+  - from collection_client import collection_client
+  - ratings = collection_client.get_ratings(user_id=1, media_ids=[1, 2, 3])
+  - media_cache.add_commit_listener(collection_client.notify_media_changed)
+
+====================================================================================
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from sortedshelf_common.auth_tokens import forward_auth_headers, internal_headers
+
+class CollectionClient:
+    """
+    Pooled HTTP client for collection-service.
+
+    The session is created lazily and per process, so every worker forked
+    by a WSGI server gets its own keep-alive pool.
+
+    Attributes:
+        base_url (str): Base URL of collection-service (no trailing slash)
+        timeout (float): Per-call timeout in seconds
+        notify_changes (bool): Whether notify_media_changed sends anything
+    """
+
+    # Media IDs per invalidation call (collection-service accepts up to 10000)
+    NOTIFY_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self.base_url = 'http://localhost:5003'
+        self.timeout = 2.0
+        self.notify_changes = True
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._notifier = None
+        self._logger = None
+
+    def init_app(self, app):
+        """
+        Load client settings from the Flask app config.
+
+        Parameters:
+            app (Flask): Application being created by create_app()
+        """
+        self.base_url = app.config.get('COLLECTION_SERVICE_URL', self.base_url).rstrip('/')
+        self.timeout = app.config.get('COLLECTION_CLIENT_TIMEOUT', self.timeout)
+        self.notify_changes = app.config.get('COLLECTION_NOTIFY_CHANGES', self.notify_changes)
+        self._logger = app.logger
+        app.extensions['collection_client'] = self
+
+    def _get_session(self):
+        """Return the keep-alive session for the current process."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    # One background thread keeps notifications in commit order
+                    self._notifier = ThreadPoolExecutor(max_workers=1, thread_name_prefix='collection-notify')
+                    self._pid = pid
+        return self._session
+
+    def get_ratings(self, user_id, media_ids):
+        """
+        Look up a user's ratings for a chunk of media items.
+
+        The caller's access token (if any) is forwarded to collection-service.
+
+        Parameters:
+            user_id (int): Owner of the ratings
+            media_ids (list[int]): Media IDs (at most 1000 per call)
+
+        Returns:
+            dict: media_id (int) -> rating (int); unrated items are omitted
+
+        Raises:
+            requests.RequestException: If collection-service is unreachable or errors
+        """
+        if not media_ids:
+            return {}
+        resp = self._get_session().get(
+            f'{self.base_url}/api/collection-media/ratings',
+            params={'user_id': user_id, 'media_ids': ','.join(str(media_id) for media_id in media_ids)},
+            headers=forward_auth_headers(),
+            timeout=self.timeout
+        )
+        resp.raise_for_status()
+        return {int(media_id): rating for media_id, rating in resp.json().get('ratings', {}).items()}
+
+    def _send_media_changed(self, media_ids, headers):
+        """Background job: POST changed media IDs to collection-service."""
+        for start in range(0, len(media_ids), self.NOTIFY_CHUNK_SIZE):
+            try:
+                resp = self._get_session().post(
+                    f'{self.base_url}/api/internal/media-invalidate',
+                    json={'media_ids': media_ids[start:start + self.NOTIFY_CHUNK_SIZE]},
+                    headers=headers,
+                    timeout=self.timeout
+                )
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                # collection-service falls back to its cache TTL
+                if self._logger:
+                    self._logger.warning('Media change notification failed for %d items: %s', len(media_ids), e)
+                return
+
+    def notify_media_changed(self, media_ids):
+        """
+        Tell collection-service to drop changed media items from its cache.
+
+        Returns at once; the call is made on a background thread, so a slow
+        or unavailable collection-service never delays the write.
+
+        Parameters:
+            media_ids (list[int]): IDs of changed or deleted media items
+        """
+        if not self.notify_changes or not media_ids:
+            return
+        self._get_session()
+        self._notifier.submit(self._send_media_changed, list(media_ids), internal_headers())
+
+    def send_media_events(self, events):
+        """
+        Deliver a batch of outbox events to collection-service.
+
+        Parameters:
+            events (list[dict]): MediaOutbox.to_event() dicts, in ID order
+
+        Returns:
+            dict: collection-service's response ('applied', 'skipped')
+
+        Raises:
+            requests.RequestException: If collection-service is unreachable or
+            did not accept the batch
+        """
+        resp = self._get_session().post(
+            f'{self.base_url}/api/internal/media-events',
+            json={'events': events},
+            headers=internal_headers(),
+            timeout=self.timeout
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+# Shared client instance, configured by create_app()
+collection_client = CollectionClient()
@@ -0,0 +1,106 @@
+"""
+====================================================================================
+commands.py - Maintenance CLI Commands for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Provides operational commands run through the Flask CLI
+  - Keeps one-off maintenance jobs out of the request path
+
+Major Commands:
+  - flask rebuild-search-index: Recreate the SQLite full-text search index
+  - flask check-query-plans: Fail if a hot query stops using its index
+  - flask relay-outbox: Deliver media change events to collection-service (long-running)
+  - flask bench-serialization: Compare the old and new list response serialization paths
+
+Usage:
+  - set FLASK_APP=app.py
+  - flask rebuild-search-index
+  - flask check-query-plans
+  - flask relay-outbox [--once]
+  - flask bench-serialization [--rows 10000]
+
+====================================================================================
+"""
+
+import time
+
+import click
+
+def init_app(app):
+    """
+    Register maintenance commands on the Flask app.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Drop and rebuild the SQLite FTS5 search index from the media tables."""
+        from search import rebuild_index
+        count = rebuild_index()
+        click.echo(f'Indexed {count} media items')
+
+    @app.cli.command('check-query-plans')
+    def check_query_plans_command():
+        """Run EXPLAIN QUERY PLAN for every route query; exit 1 on a table scan."""
+        from query_plans import check_query_plans
+        failures = check_query_plans(echo=click.echo)
+        if failures:
+            raise click.ClickException(f'{len(failures)} query plan(s) regressed: {", ".join(failures)}')
+        click.echo('All query plans use indexes')
+
+    @app.cli.command('bench-serialization')
+    @click.option('--rows', default=10000, show_default=True, help='Media rows in the benchmarked response.')
+    @click.option('--repeat', default=5, show_default=True, help='Runs per path (the best is reported).')
+    def bench_serialization_command(rows, repeat):
+        """Time building and encoding a large media list, old path against new."""
+        from benchmarks import bench_serialization
+        bench_serialization(rows, repeat, echo=click.echo)
+
+    @app.cli.command('relay-outbox')
+    @click.option('--once', is_flag=True, help='Deliver everything pending, then exit.')
+    def relay_outbox(once):
+        """Deliver pending media change events to collection-service, in order."""
+        import requests
+        import outbox
+        from app import db
+        batch_size = app.config.get('OUTBOX_RELAY_BATCH', 500)
+        interval = app.config.get('OUTBOX_RELAY_INTERVAL', 1.0)
+        retention = app.config.get('OUTBOX_RETENTION_HOURS', 72)
+        
+        delivered_total = 0
+        failures = 0
+        next_prune = 0.0
+        while True:
+            if time.monotonic() >= next_prune:
+                pruned = outbox.prune_delivered(retention)
+                if pruned:
+                    click.echo(f'Pruned {pruned} delivered events')
+                next_prune = time.monotonic() + 600
+            try:
+                delivered = outbox.relay_pending(batch_size)
+            except requests.RequestException as e:
+                db.session.rollback()
+                failures += 1
+                if once:
+                    raise click.ClickException(f'Delivery failed after {delivered_total} events: {e}')
+                # Back off while collection-service is down; order is kept because
+                # the same batch is retried first
+                delay = min(interval * 2 ** failures, 30)
+                click.echo(f'Delivery failed ({e}); retrying in {delay:.0f}s', err=True)
+                time.sleep(delay)
+                continue
+            failures = 0
+            delivered_total += delivered
+            if delivered:
+                click.echo(f'Delivered {delivered} events')
+            if delivered < batch_size:
+                if once:
+                    click.echo(f'Outbox drained ({delivered_total} events delivered)')
+                    return
+                time.sleep(interval)
@@ -16,6 +16,12 @@ Major Components:
     - SECRET_KEY: Secret key for session and security
     - SQLALCHEMY_DATABASE_URI: Database connection URI
     - SQLALCHEMY_TRACK_MODIFICATIONS: Disable event system for performance
+    - DB_PROFILE / DB_* / SQLITE_*: Database engine profile (pool, timeouts, SQLite pragmas)
+    - METRICS_ENABLED: Prometheus-format request metrics on /metrics
+    - LOG_LEVEL: Level of the app logger (startup and request logs)
+    - COLLECTION_SERVICE_URL / COLLECTION_CLIENT_TIMEOUT / COLLECTION_NOTIFY_CHANGES: Collection-service client settings
+    - MEDIA_CACHE_SIZE / MEDIA_CACHE_TTL / MEDIA_CACHE_BACKEND: Read-through media cache settings
+    - OUTBOX_*: Change event outbox relay settings
 
 Security:
   - Secrets and DB credentials loaded from environment, not hardcoded
@@ -41,6 +47,35 @@ class Config:
         SECRET_KEY (str): Secret key for session and security
         SQLALCHEMY_DATABASE_URI (str): Database connection URI
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Disable SQLAlchemy event system for performance
+        DB_PROFILE (str): Engine profile, 'dev-sqlite' or 'prod-mysql' (default: from the URI scheme)
+        DB_POOL_SIZE (int): Connections kept open per worker process (prod-mysql)
+        DB_MAX_OVERFLOW (int): Extra connections allowed under load (prod-mysql)
+        DB_POOL_TIMEOUT (float): Seconds to wait for a free connection (prod-mysql)
+        DB_POOL_RECYCLE (int): Seconds before a connection is replaced, below MySQL's wait_timeout
+        DB_CONNECT_TIMEOUT (int): Seconds to establish a connection (prod-mysql)
+        DB_READ_TIMEOUT (int): Socket read/write timeout in seconds (prod-mysql)
+        DB_STATEMENT_TIMEOUT_MS (int): Server-side SELECT timeout, max_execution_time (prod-mysql)
+        SQLITE_BUSY_TIMEOUT_MS (int): Milliseconds to wait on a locked database (dev-sqlite)
+        SQLITE_MMAP_SIZE (int): Bytes of the database file memory-mapped for reads (dev-sqlite)
+        METRICS_ENABLED (bool): Record request metrics and serve them on /metrics
+        LOG_LEVEL (str): Level of app.logger, e.g. INFO or WARNING
+        AUTH_SERVICE_URL (str): Base URL of auth-service (access token keys)
+        AUTH_REQUIRED (bool): Reject requests that carry no access token
+        AUTH_TOKEN_ISSUER (str): Expected issuer of access tokens
+        AUTH_KEYS_TTL (float): Seconds cached token keys are trusted before re-fetching
+        AUTH_KEYS_MIN_REFRESH (float): Minimum seconds between token key fetches
+        AUTH_CLOCK_LEEWAY (int): Allowed clock skew for token expiry (seconds)
+        INTERNAL_API_TOKEN (str): Shared secret for service-to-service /api/internal/ calls
+        INTERNAL_API_DEV_OPEN (bool): Leave /api/internal/ open while the token is unset (development only)
+        COLLECTION_SERVICE_URL (str): Base URL of collection-service
+        COLLECTION_CLIENT_TIMEOUT (float): Per-call timeout for collection-service requests (seconds)
+        COLLECTION_NOTIFY_CHANGES (bool): Push changed media IDs to collection-service's cache
+        OUTBOX_RELAY_BATCH (int): Outbox events delivered per relay call
+        OUTBOX_RELAY_INTERVAL (float): Seconds the relay sleeps once it has caught up
+        OUTBOX_RETENTION_HOURS (float): Hours delivered outbox events are kept
+        MEDIA_CACHE_SIZE (int): Media cache entries per worker process (0 disables it)
+        MEDIA_CACHE_TTL (float): Seconds a cached media entry is served before reloading
+        MEDIA_CACHE_BACKEND (str): Shared cache backend ('', 'memory' or 'module:factory')
     """
 
     # Set the secret key for the Flask app, defaulting to 'dev' if not provided
@@ -52,5 +87,48 @@ class Config:
     # Disable the modification tracking feature of SQLAlchemy to save resources
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Database engine profile: pool, timeouts and SQLite pragmas (see sortedshelf_common/engine_profiles.py)
+    DB_PROFILE = os.getenv('DB_PROFILE') or ('dev-sqlite' if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else 'prod-mysql')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 280))
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    DB_READ_TIMEOUT = int(os.getenv('DB_READ_TIMEOUT', 60))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # Request metrics served on /metrics (see sortedshelf_common/metrics.py)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+    # App logger level (INFO shows the database profile line at startup)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
     # Port configuration for media service
     PORT = int(os.getenv('PORT', 5002))
+
+    # Collection-service client settings (see collection_client.py)
+    COLLECTION_SERVICE_URL = os.getenv('COLLECTION_SERVICE_URL', 'http://localhost:5003')
+    COLLECTION_CLIENT_TIMEOUT = float(os.getenv('COLLECTION_CLIENT_TIMEOUT', 2.0))
+    COLLECTION_NOTIFY_CHANGES = os.getenv('COLLECTION_NOTIFY_CHANGES', 'true').lower() in ('1', 'true', 'yes')
+
+    # Change event outbox and its relay to collection-service (see outbox.py)
+    OUTBOX_RELAY_BATCH = int(os.getenv('OUTBOX_RELAY_BATCH', 500))
+    OUTBOX_RELAY_INTERVAL = float(os.getenv('OUTBOX_RELAY_INTERVAL', 1.0))
+    OUTBOX_RETENTION_HOURS = float(os.getenv('OUTBOX_RETENTION_HOURS', 72))
+
+    # Access token verification (see sortedshelf_common/auth_tokens.py)
+    AUTH_SERVICE_URL = os.getenv('AUTH_SERVICE_URL', 'http://localhost:5001')
+    AUTH_REQUIRED = os.getenv('AUTH_REQUIRED', 'false').lower() in ('1', 'true', 'yes')
+    AUTH_TOKEN_ISSUER = os.getenv('AUTH_TOKEN_ISSUER', 'sortedshelf-auth')
+    AUTH_KEYS_TTL = float(os.getenv('AUTH_KEYS_TTL', 3600))
+    AUTH_KEYS_MIN_REFRESH = float(os.getenv('AUTH_KEYS_MIN_REFRESH', 30))
+    AUTH_CLOCK_LEEWAY = int(os.getenv('AUTH_CLOCK_LEEWAY', 30))
+    INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN', '')
+    INTERNAL_API_DEV_OPEN = os.getenv('INTERNAL_API_DEV_OPEN', 'false').lower() in ('1', 'true', 'yes')
+
+    # Read-through media cache (see cache.py)
+    MEDIA_CACHE_SIZE = int(os.getenv('MEDIA_CACHE_SIZE', 10000))
+    MEDIA_CACHE_TTL = float(os.getenv('MEDIA_CACHE_TTL', 60))
+    MEDIA_CACHE_BACKEND = os.getenv('MEDIA_CACHE_BACKEND', '')
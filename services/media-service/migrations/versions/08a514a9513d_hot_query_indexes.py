@@ -0,0 +1,30 @@
+"""Hot query indexes
+
+Revision ID: 08a514a9513d
+Revises: e039533ac3b3
+Create Date: 2026-10-18 04:24:45.303091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '08a514a9513d'
+down_revision = 'e039533ac3b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_media_user_date_added', 'media', ['user_id', 'date_added', 'id'], unique=False)
+    op.create_index('ix_media_user_title', 'media', ['user_id', 'title', 'id'], unique=False)
+    op.create_index('ix_media_user_year', 'media', ['user_id', 'year', 'id'], unique=False)
+    op.create_index('ix_media_metadata_media_id', 'media_metadata', ['media_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_media_metadata_media_id', table_name='media_metadata')
+    op.drop_index('ix_media_user_year', table_name='media')
+    op.drop_index('ix_media_user_title', table_name='media')
+    op.drop_index('ix_media_user_date_added', table_name='media')
@@ -0,0 +1,31 @@
+"""Full-text search indexes
+
+Revision ID: 8d5fbc225b13
+Revises: 08a514a9513d
+Create Date: 2026-10-18 04:26:41.846642
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d5fbc225b13'
+down_revision = '08a514a9513d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # MySQL only; on SQLite search.py keeps its own FTS5 table (media_fts)
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.create_index('ft_media_title_creator', 'media', ['title', 'creator'], unique=False, mysql_prefix='FULLTEXT')
+    op.create_index('ft_media_metadata_value', 'media_metadata', ['value'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_media_metadata_value', table_name='media_metadata')
+    op.drop_index('ft_media_title_creator', table_name='media')
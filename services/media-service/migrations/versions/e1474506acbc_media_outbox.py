@@ -0,0 +1,35 @@
+"""Media outbox
+
+Revision ID: e1474506acbc
+Revises: f98230fa6f57
+Create Date: 2026-10-18 04:27:42.887904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1474506acbc'
+down_revision = 'f98230fa6f57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('media_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=10), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_media_outbox_pending', 'media_outbox', ['delivered_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_media_outbox_pending', table_name='media_outbox')
+    op.drop_table('media_outbox')
@@ -0,0 +1,27 @@
+"""Row versions
+
+Revision ID: f98230fa6f57
+Revises: 8d5fbc225b13
+Create Date: 2026-10-18 04:27:06.695981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f98230fa6f57'
+down_revision = '8d5fbc225b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('media', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('media', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('media') as batch_op:
+        batch_op.drop_column('version')
+        batch_op.drop_column('updated_at')
@@ -10,10 +10,12 @@ Purpose:
   - Defines SQLAlchemy ORM models for media items and metadata
   - Provides user-specific media cataloging functionality
   - Supports flexible metadata storage for different media types
+  - Versions every row (updated_at + version counter) for ETags / conditional GET
 
 Major Components:
   - Media model: Core media item representation
   - MediaMetadata model: Flexible key-value metadata storage
+  - MediaOutbox model: Change events written with each media commit (see outbox.py)
 
 Security:
   - All operations use SQLAlchemy ORM to prevent SQL injection
@@ -26,6 +28,7 @@ Usage:
 ====================================================================================
 """
 
+import json
 from app import db
 from datetime import datetime
 
@@ -47,11 +50,25 @@ class Media(db.Model):
         cover_url (str): URL to cover image for display
         status (str): Current status (Not Started, In Progress, Completed)
         date_added (datetime): When item was added to collection
+        updated_at (datetime): When the item or its metadata last changed
+        version (int): Row version, incremented on every UPDATE (ETags, optimistic locking)
+    
+    Relationships:
+        metadata_items (list[MediaMetadata]): Name/value metadata for this item
     
     Methods:
-        to_dict(): Returns dictionary representation for JSON serialization
+        to_dict(include_metadata=False): Returns dictionary representation for JSON serialization
+        touch(): Mark the item changed (bumps updated_at and version on flush)
     """
     __tablename__ = 'media'
+    __table_args__ = (
+        # Access paths for GET /api/media: user scope + keyset order per sort column
+        db.Index('ix_media_user_date_added', 'user_id', 'date_added', 'id'),
+        db.Index('ix_media_user_title', 'user_id', 'title', 'id'),
+        db.Index('ix_media_user_year', 'user_id', 'year', 'id'),
+        # Production full-text search index (MySQL only; SQLite uses FTS5, see search.py)
+        db.Index('ft_media_title_creator', 'title', 'creator', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, nullable=False)
     title = db.Column(db.String(255), nullable=False)
@@ -62,11 +79,24 @@ class Media(db.Model):
     cover_url = db.Column(db.String(255))
     status = db.Column(db.String(20), nullable=False, default='Not Started')
     date_added = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
-    def to_dict(self):
+    # The ORM increments 'version' in every UPDATE it issues (and refuses to
+    # overwrite a row another request changed in the meantime)
+    __mapper_args__ = {'version_id_col': version}
+
+    # Name/value metadata rows for this item, in insertion order.
+    # Use selectinload(Media.metadata_items) when loading many items.
+    metadata_items = db.relationship('MediaMetadata', order_by='MediaMetadata.id', lazy='select')
+
+    def to_dict(self, include_metadata=False):
         """
         Convert Media object to dictionary for JSON serialization.
         
+        Parameters:
+            include_metadata (bool): Embed metadata as a 'metadata' list of {name, value}
+        
         Returns:
             dict: Dictionary containing all media attributes
         
@@ -74,7 +104,7 @@ class Media(db.Model):
             media_dict = media_item.to_dict()
             return jsonify(media_dict)
         """
-        return {
+        result = {
             'id': self.id,
             'user_id': self.user_id,
             'title': self.title,
@@ -84,8 +114,25 @@ class Media(db.Model):
             'publish_date': self.publish_date,
             'cover_url': self.cover_url,
             'status': self.status,
-            'date_added': self.date_added.isoformat() if self.date_added else None
+            'date_added': self.date_added.isoformat() if self.date_added else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        if include_metadata:
+            result['metadata'] = [{'name': m.name, 'value': m.value} for m in self.metadata_items]
+        return result
+
+    def touch(self):
+        """
+        Mark the item as changed when only its metadata rows were written.
+        
+        Updating updated_at makes the next flush issue an UPDATE, which also
+        increments version, so cached copies (ETags) of the item are invalidated.
+        
+        Usage:
+            media.touch()
+            db.session.commit()
+        """
+        self.updated_at = datetime.utcnow()
 
 class MediaMetadata(db.Model):
     """
@@ -104,6 +151,12 @@ class MediaMetadata(db.Model):
         to_dict(): Returns dictionary representation for JSON serialization
     """
     __tablename__ = 'media_metadata'
+    __table_args__ = (
+        # Metadata is always read and replaced per media item
+        db.Index('ix_media_metadata_media_id', 'media_id'),
+        # Production full-text search index on metadata values (MySQL only)
+        db.Index('ft_media_metadata_value', 'value', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     media_id = db.Column(db.Integer, db.ForeignKey('media.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -126,3 +179,57 @@ class MediaMetadata(db.Model):
             'name': self.name,
             'value': self.value
         }
+
+class MediaOutbox(db.Model):
+    """
+    Transactional outbox of media change events.
+    
+    A row is written in the same transaction as every change to a media
+    item (see outbox.py), so an event exists if and only if the change
+    committed. 'flask relay-outbox' delivers pending rows to
+    collection-service in id order.
+    
+    Attributes:
+        id (int): Primary key; delivery order and the event's idempotency key
+        media_id (int): Media item the event is about
+        event_type (str): 'upsert' (created or changed) or 'delete'
+        version (int): Media row version after the change (None for deletes)
+        payload (str): JSON of the item's fields (Media.to_dict()) for upserts
+        created_at (datetime): When the change committed
+        delivered_at (datetime): When collection-service accepted it (None = pending)
+    
+    Methods:
+        to_event(): Returns the event as sent to collection-service
+    """
+    __tablename__ = 'media_outbox'
+    __table_args__ = (
+        # Relay: pending events in order
+        db.Index('ix_media_outbox_pending', 'delivered_at', 'id'),
+        # Event IDs must never be reused after pruning (consumers dedupe on them)
+        {'sqlite_autoincrement': True},
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    media_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(10), nullable=False)
+    version = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+
+    def to_event(self):
+        """
+        Convert the outbox row to the event sent to collection-service.
+        
+        Returns:
+            dict: {'id', 'media_id', 'type', 'version', 'media'}
+        
+        Usage:
+            events = [row.to_event() for row in pending]
+        """
+        return {
+            'id': self.id,
+            'media_id': self.media_id,
+            'type': self.event_type,
+            'version': self.version,
+            'media': json.loads(self.payload) if self.payload else None
+        }
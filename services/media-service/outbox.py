@@ -0,0 +1,157 @@
+"""
+====================================================================================
+outbox.py - Transactional Outbox for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Records a change event (upsert or delete) for every media item a
+    transaction creates, changes or deletes, inside that same transaction,
+    so events can never be lost or invented by a crash between the write
+    and the notification
+  - Relays pending events, in order, to collection-service, which keeps a
+    local projection of the media fields it displays (no HTTP at read time)
+
+Major Functions:
+  - init_app: Hook the session so every commit writes its outbox rows
+  - relay_pending: Deliver one batch of pending events to collection-service
+  - prune_delivered: Delete delivered events older than the retention period
+  - outbox_position: Highest event ID written so far (for projection rebuilds)
+
+Configuration (config.py):
+  - OUTBOX_RELAY_BATCH: Events delivered per relay call
+  - OUTBOX_RELAY_INTERVAL: Seconds the relay sleeps when it has caught up
+  - OUTBOX_RETENTION_HOURS: Hours delivered events are kept before pruning
+
+Usage:
+  - outbox.init_app(app) in create_app(); nothing else is needed on the write path
+  - flask relay-outbox   (run exactly one relay per database, so order holds)
+
+====================================================================================
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, event, func, insert, select, update
+
+from app import db
+from collection_client import collection_client
+from models import Media, MediaOutbox
+
+# Media IDs per current-state query when a commit writes its events
+_EVENT_QUERY_CHUNK = 500
+
+def _collect_changes(session, flush_context):
+    """after_flush: remember which media items this transaction wrote."""
+    changed = session.info.setdefault('outbox_media', set())
+    for obj in session.new:
+        if isinstance(obj, Media):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Media) and session.is_modified(obj, include_collections=False):
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Media):
+            changed.add(obj.id)
+
+def _write_events(session):
+    """
+    before_commit: add one outbox row per media item the transaction wrote.
+
+    The row carries the item's state as of this commit (or a delete), so
+    several changes to one item in a transaction produce a single event.
+    """
+    session.flush()
+    media_ids = sorted(session.info.pop('outbox_media', ()))
+    if not media_ids:
+        return
+    rows = []
+    for start in range(0, len(media_ids), _EVENT_QUERY_CHUNK):
+        chunk = media_ids[start:start + _EVENT_QUERY_CHUNK]
+        current = {m.id: m for m in session.execute(select(Media).where(Media.id.in_(chunk))).scalars()}
+        for media_id in chunk:
+            media = current.get(media_id)
+            if media is None:
+                rows.append({'media_id': media_id, 'event_type': 'delete', 'version': None, 'payload': None})
+            else:
+                rows.append({
+                    'media_id': media_id,
+                    'event_type': 'upsert',
+                    'version': media.version,
+                    'payload': json.dumps(media.to_dict())
+                })
+    session.execute(insert(MediaOutbox), rows)
+
+def _discard_changes(session, previous_transaction):
+    """after_soft_rollback: the changes never happened, so neither do their events."""
+    session.info.pop('outbox_media', None)
+
+def init_app(app):
+    """
+    Write outbox events with every commit that touches media items.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    for name, handler in (('after_flush', _collect_changes),
+                          ('before_commit', _write_events),
+                          ('after_soft_rollback', _discard_changes)):
+        if not event.contains(db.session, name, handler):
+            event.listen(db.session, name, handler)
+
+def relay_pending(batch_size):
+    """
+    Deliver the oldest pending events to collection-service and mark them delivered.
+
+    Parameters:
+        batch_size (int): Maximum events to deliver in this call
+
+    Returns:
+        int: Events delivered (0 when the outbox is empty)
+
+    Raises:
+        requests.RequestException: If collection-service did not accept the
+            batch (nothing is marked delivered; the next call retries it)
+    """
+    pending = MediaOutbox.query.filter(MediaOutbox.delivered_at.is_(None)) \
+        .order_by(MediaOutbox.id).limit(batch_size).all()
+    if not pending:
+        return 0
+    collection_client.send_media_events([row.to_event() for row in pending])
+    db.session.execute(
+        update(MediaOutbox)
+        .where(MediaOutbox.id.in_([row.id for row in pending]))
+        .values(delivered_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return len(pending)
+
+def prune_delivered(retention_hours):
+    """
+    Delete delivered events older than the retention period.
+
+    Parameters:
+        retention_hours (float): Hours to keep delivered events
+
+    Returns:
+        int: Events deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    result = db.session.execute(delete(MediaOutbox).where(MediaOutbox.delivered_at < cutoff))
+    db.session.commit()
+    return result.rowcount
+
+def outbox_position():
+    """
+    Return the highest outbox event ID written so far.
+
+    A projection rebuilt from a snapshot read after this call already
+    reflects every event up to it.
+
+    Returns:
+        int: Event ID (0 if the outbox is empty)
+    """
+    return db.session.execute(select(func.max(MediaOutbox.id))).scalar() or 0
@@ -0,0 +1,139 @@
+"""
+====================================================================================
+query_plans.py - Query Plan Regression Checks for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Guards the indexes declared in models.py against regressions
+  - Runs EXPLAIN QUERY PLAN for the queries behind every media route on SQLite
+  - Fails if a hot query falls back to a full table scan or a sort of all rows
+
+Major Functions:
+  - hot_queries: The statements issued by routes.py, with representative parameters
+  - explain: EXPLAIN QUERY PLAN for one statement on a SQLite connection
+  - regressions: The plan steps that scan a whole table or sort every row
+  - check_query_plans: Builds the schema in memory and explains every hot query
+
+Usage:
+  - flask check-query-plans   (exits non-zero if any plan regresses)
+  - Add a statement to hot_queries() whenever a route gains a new query
+  - tests/test_query_plans.py runs the same checks against the migrated schema
+
+====================================================================================
+"""
+
+import re
+from datetime import datetime
+
+from sqlalchemy import create_engine, delete, select, tuple_
+
+from app import db
+from models import Media, MediaMetadata, MediaOutbox
+
+# Plan details that mean a query reads every row of a table
+_FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (COVERING )?INDEX)')
+_SORTS_ALL_ROWS = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)')
+
+def hot_queries():
+    """
+    Return the queries issued by the media routes.
+
+    Returns:
+        list[tuple[str, Executable]]: (description, statement) pairs
+    """
+    when = datetime(2024, 1, 1)
+    page = 51
+    queries = [
+        ('GET /api/media/<id> (cache miss)', select(Media).where(Media.id.in_([1]))),
+        ('GET /api/media?ids= (cache misses)', select(Media).where(Media.id.in_([1, 2, 3]))),
+        ('GET /api/media/<id>/metadata (cache miss, items)',
+         select(Media.id, Media.user_id, Media.version).where(Media.id.in_([1, 2, 3]))),
+        ('GET /api/media/<id>/metadata (cache miss, rows)',
+         select(MediaMetadata.id, MediaMetadata.media_id, MediaMetadata.name, MediaMetadata.value)
+         .where(MediaMetadata.media_id.in_([1, 2, 3]))),
+        ('DELETE /api/media/<id> (metadata)', delete(MediaMetadata).where(MediaMetadata.media_id == 1)),
+        ('PATCH /api/media/<id> (metadata replace)', delete(MediaMetadata).where(MediaMetadata.media_id == 1)),
+        ('GET /api/internal/media-feed', select(Media).where(Media.id > 10).order_by(Media.id).limit(1000)),
+        ('flask relay-outbox (pending)',
+         select(MediaOutbox).where(MediaOutbox.delivered_at.is_(None)).order_by(MediaOutbox.id).limit(500)),
+        ('flask relay-outbox (prune)', delete(MediaOutbox).where(MediaOutbox.delivered_at < when)),
+        ('GET /api/media/export',
+         select(Media.id, Media.title, Media.type, Media.publish_date)
+         .where(Media.user_id == 1).order_by(Media.date_added, Media.id)),
+    ]
+
+    # GET /api/media: every sort column, both directions, first and later pages
+    for column, value in ((Media.date_added, when), (Media.title, 'm'), (Media.year, 2000)):
+        for descending in (False, True):
+            name = f'GET /api/media?sort={column.key}&order={"desc" if descending else "asc"}'
+            order = (column.desc(), Media.id.desc()) if descending else (column.asc(), Media.id.asc())
+            key = tuple_(column, Media.id)
+            after = key < tuple_(value, 10) if descending else key > tuple_(value, 10)
+            base = select(Media).where(Media.user_id == 1)
+            if column.expression.nullable:
+                base = base.where(column.isnot(None))
+            queries.append((name, base.order_by(*order).limit(page)))
+            queries.append((f'{name}&after=', base.where(after).order_by(*order).limit(page)))
+            if column.expression.nullable:
+                nulls = select(Media).where(Media.user_id == 1, column.is_(None))
+                id_after = Media.id < 10 if descending else Media.id > 10
+                queries.append((f'{name} (NULL tail)', nulls.where(id_after).order_by(order[1]).limit(page)))
+
+    return queries
+
+def explain(conn, stmt):
+    """
+    Run EXPLAIN QUERY PLAN for a statement on a SQLite connection.
+
+    Parameters:
+        conn (Connection): Open connection to a SQLite database with the schema
+        stmt (Executable): Statement from hot_queries()
+
+    Returns:
+        list[str]: The detail column of every plan row
+    """
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.construct_params()
+    positional = tuple(params[key] for key in compiled.positiontup)
+    return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', positional)]
+
+def regressions(name, plan):
+    """
+    Return the plan steps that read every row of a table or sort every row.
+
+    Parameters:
+        name (str): Description of the query (from hot_queries())
+        plan (list[str]): Output of explain()
+
+    Returns:
+        list[str]: Offending steps (empty if the plan uses indexes)
+    """
+    return [step for step in plan if _FULL_SCAN.search(step) or _SORTS_ALL_ROWS.search(step)]
+
+def check_query_plans(echo=print):
+    """
+    Explain every hot query against an in-memory SQLite copy of the schema.
+
+    Parameters:
+        echo (callable): Receives one report line per query
+
+    Returns:
+        list[str]: Descriptions of queries whose plan regressed (empty if all pass)
+    """
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    failures = []
+
+    with engine.connect() as conn:
+        for name, stmt in hot_queries():
+            plan = explain(conn, stmt)
+            bad = regressions(name, plan)
+            echo(f"{'FAIL' if bad else 'ok  '} {name}: {'; '.join(plan)}")
+            if bad:
+                failures.append(name)
+
+    engine.dispose()
+    return failures
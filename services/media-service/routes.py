@@ -13,45 +13,229 @@ Purpose:
   - Integrates with frontend and other microservices
 
 Major Endpoints:
-  - GET /api/media: List all media items
+  - GET /api/media: List a user's media items (keyset paginated, sortable)
+  - GET /api/media?ids=1,2,3: Batch lookup of media items by ID
   - POST /api/media: Create new media item with metadata
+  - POST /api/media/import: Streaming bulk import from CSV
+  - GET /api/media/export: Streaming CSV export with ratings
   - GET /api/media/<id>: Get specific media item details
   - PATCH /api/media/<id>: Update media item and metadata
+  - DELETE /api/media/<id>: Delete a media item and its metadata
   - GET /api/media/<id>/metadata: Get metadata for media item
+  - PATCH /api/media/<id>/metadata: Upsert/delete individual metadata names
+  - GET /api/media/search: Ranked full-text search over a user's media
+  - GET /api/media/cache/stats: Read-through cache counters (for sizing)
+  - GET /api/internal/media-feed: Full media snapshot for collection-service projection rebuilds
 
 Security:
   - Input validation on all endpoints
   - SQLAlchemy ORM prevents SQL injection
   - User ID filtering ensures data isolation
+  - Single-item reads carry strong ETags and answer If-None-Match with 304
+    (checked against the row version before the item is loaded)
+  - Single-item, metadata and ?ids= reads are served from the read-through
+    cache (cache.py); commits that change an item invalidate it
+  - Every user-scoped request needs an access token, and may only touch
+    that user's media
+    (verified locally by sortedshelf_common/auth_tokens.py, 403 otherwise)
 
 Usage:
   - Registered as blueprint in app.py
   - Consumed by React frontend via fetch API
   - Used by collection-service for media linking
+  - Calls collection-service for ratings via collection_client.py
 
 ====================================================================================
 """
 
-from flask import Blueprint, request, jsonify
+import base64
+import csv
+import io
+import json
+import time
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, g, request, jsonify, stream_with_context
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm.exc import StaleDataError
+from sortedshelf_common.auth_tokens import forbid_other_user, require_token
+from sortedshelf_common.conditional import etag_for, not_modified, with_etag
+from sortedshelf_common.json_provider import parse_fields, pick_fields, row_serializer
 
 from app import db
+from cache import media_cache
+from collection_client import collection_client
 from models import Media, MediaMetadata
+from search import index_media, remove_media, search_media
 
 bp = Blueprint('routes', __name__)
 
-@bp.route('/api/media/<int:media_id>', methods=['GET', 'PATCH'])
+def _include_metadata():
+    """
+    Check whether the request asked for embedded metadata (?include=metadata).
+    
+    Returns:
+        bool: True if 'metadata' is one of the comma-separated include values
+    """
+    return 'metadata' in request.args.get('include', '').split(',')
+
+def _apply_metadata_diff(media, submitted):
+    """
+    Make a media item's stored metadata equal to the submitted pairs.
+    
+    Instead of deleting every row and re-inserting the full list, rows
+    that already match are left alone, rows whose name is still present
+    get their value updated in place, and only the remainder is inserted
+    or deleted. Duplicate names are handled as a multiset. Changes are
+    added to the current session; the caller commits.
+    
+    Parameters:
+        media (Media): Item whose metadata is being replaced
+        submitted (list[tuple]): Desired (name, value) pairs
+    
+    Returns:
+        bool: True if any metadata row was inserted, updated or deleted
+    """
+    wanted = Counter((name, str(value)) for name, value in submitted)
+    
+    # Keep exact matches; everything else in storage is a candidate for reuse
+    leftover_rows = []
+    for row in media.metadata_items:
+        key = (row.name, row.value)
+        if wanted[key] > 0:
+            wanted[key] -= 1
+        else:
+            leftover_rows.append(row)
+    
+    values_to_add = defaultdict(list)
+    for (name, value), count in wanted.items():
+        values_to_add[name].extend([value] * count)
+    
+    changed = False
+    for row in leftover_rows:
+        if values_to_add.get(row.name):
+            row.value = values_to_add[row.name].pop(0)  # UPDATE in place
+        else:
+            db.session.delete(row)
+        changed = True
+    
+    for name, values in values_to_add.items():
+        for value in values:
+            db.session.add(MediaMetadata(media_id=media.id, name=name, value=value))
+            changed = True
+    
+    if changed:
+        # Metadata is part of the item: bump its updated_at and version too
+        media.touch()
+        # Reload the relationship on next access so responses see the new rows
+        db.session.flush()
+        db.session.expire(media, ['metadata_items'])
+    return changed
+
+def _load_media_entries(media_ids):
+    """
+    Cache loader for 'media' entries (one IN query).
+    
+    Parameters:
+        media_ids (list[int]): IDs missing from the cache
+    
+    Returns:
+        dict: media_id -> {'user_id', 'version', 'media': to_dict()} for items that exist
+    """
+    return {
+        m.id: {'user_id': m.user_id, 'version': m.version, 'media': m.to_dict()}
+        for m in Media.query.filter(Media.id.in_(media_ids)).all()
+    }
+
+def _load_metadata_entries(media_ids):
+    """
+    Cache loader for 'metadata' entries (two IN queries).
+    
+    The item's version is stored alongside its metadata so readers can
+    tell when the two cached halves were loaded on either side of a write.
+    
+    Parameters:
+        media_ids (list[int]): IDs missing from the cache
+    
+    Returns:
+        dict: media_id -> {'user_id', 'version', 'metadata': [{name, value}]}
+              for items that exist
+    """
+    heads = db.session.query(Media.id, Media.user_id, Media.version).filter(Media.id.in_(media_ids)).all()
+    entries = {h.id: {'user_id': h.user_id, 'version': h.version, 'metadata': []} for h in heads}
+    if entries:
+        rows = db.session.query(MediaMetadata.id, MediaMetadata.media_id, MediaMetadata.name, MediaMetadata.value) \
+            .filter(MediaMetadata.media_id.in_(list(entries))).all()
+        for row in sorted(rows, key=lambda r: r.id):
+            entries[row.media_id]['metadata'].append({'name': row.name, 'value': row.value})
+    return entries
+
+def _cached_media(media_ids, include_metadata, entries=None):
+    """
+    Read media items through the cache.
+    
+    Parameters:
+        media_ids (list[int]): IDs to look up
+        include_metadata (bool): Embed each item's 'metadata' list
+        entries (dict): 'media' cache entries the caller already holds (optional)
+    
+    Returns:
+        dict: media_id -> (entry, media dict) for items that exist, where
+              entry holds 'user_id' and 'version' and the dict is a fresh
+              copy safe to modify
+    """
+    if entries is None:
+        entries = media_cache.get_many('media', media_ids, _load_media_entries)
+    else:
+        entries = dict(entries)
+    metadata = {}
+    if include_metadata and entries:
+        metadata = media_cache.get_many('metadata', list(entries), _load_metadata_entries)
+        stale = [
+            media_id for media_id, entry in entries.items()
+            if media_id not in metadata or metadata[media_id]['version'] != entry['version']
+        ]
+        if stale:
+            # The two halves straddle a write: reload both from the database
+            media_cache.invalidate(stale)
+            for media_id in stale:
+                entries.pop(media_id)
+            entries.update(_load_media_entries(stale))
+            metadata.update(_load_metadata_entries(stale))
+    
+    result = {}
+    for media_id, entry in entries.items():
+        media = dict(entry['media'])
+        if include_metadata:
+            media['metadata'] = metadata.get(media_id, {}).get('metadata', [])
+        result[media_id] = (entry, media)
+    return result
+
+@bp.route('/api/media/<int:media_id>', methods=['GET', 'PATCH', 'DELETE'])
 def get_or_update_media(media_id):
     """
-    Handle GET and PATCH requests for individual media items.
+    Handle GET, PATCH and DELETE requests for individual media items.
     
-    GET: Retrieve details for a single media item by ID
+    GET: Retrieve details for a single media item by ID (read-through cache;
+         a cache hit answers, including 304s, without a database query)
     PATCH: Update media item fields and replace all metadata
+           (only the metadata rows that differ are inserted, updated or deleted)
+    DELETE: Delete the item, its metadata and its search index entry
     
     Parameters:
         media_id (int): ID of the media item
     
+    Query Parameters:
+        include (str): "metadata" to embed the item's metadata list (optional)
+        fields (str): Comma-separated fields to return, e.g. "id,title,type" (optional)
+    
     GET Returns:
-        200: JSON with media details
+        200: JSON with media details (plus 'metadata' when include=metadata)
+             and a strong ETag
+        304: Not modified (If-None-Match matched the current ETag)
+        400: Unknown field in fields
         404: Media not found
     
     PATCH Body:
@@ -67,46 +251,160 @@ def get_or_update_media(media_id):
     PATCH Returns:
         200: Updated media details
         404: Media not found
+        409: The item was changed by another request at the same time
+        500: Database error
+    
+    DELETE Returns:
+        200: JSON with the deleted item's 'id'
+        404: Media not found
         500: Database error
     
     Usage:
         GET /api/media/123
+        GET /api/media/123?include=metadata
+        GET /api/media/123?fields=id,title,cover_url
         PATCH /api/media/123 with JSON body
+        DELETE /api/media/123
     """
     from models import Media, MediaMetadata
+    if request.method == 'GET':
+        # The cached entry carries the row version, so the ETag check needs no query
+        include_metadata = _include_metadata()
+        try:
+            fields = _requested_fields(include_metadata)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        variant = 'metadata' if include_metadata else 'plain'
+        if fields is not None:
+            variant += ':' + ','.join(fields)
+        entry = media_cache.get('media', media_id, _load_media_entries)
+        if not entry:
+            return jsonify({'success': False, 'error': 'Media not found'}), 404
+        denied = forbid_other_user(entry['user_id'])
+        if denied:
+            return denied
+        cached = not_modified(etag_for('media', media_id, entry['version'], variant))
+        if cached:
+            return cached
+        
+        found = _cached_media([media_id], include_metadata, entries={media_id: entry})
+        if media_id not in found:
+            return jsonify({'success': False, 'error': 'Media not found'}), 404
+        entry, media = found[media_id]
+        response = jsonify({'success': True, 'media': pick_fields(media, fields)})
+        return with_etag(response, etag_for('media', media_id, entry['version'], variant)), 200
+    
     media = Media.query.get(media_id)
     if not media:
         return jsonify({'success': False, 'error': 'Media not found'}), 404
+    denied = forbid_other_user(media.user_id)
+    if denied:
+        return denied
     
-    if request.method == 'GET':
-        return jsonify({'success': True, 'media': media.to_dict()}), 200
+    if request.method == 'DELETE':
+        try:
+            MediaMetadata.query.filter_by(media_id=media_id).delete()
+            db.session.delete(media)
+            remove_media([media_id])
+            db.session.commit()
+            return jsonify({'success': True, 'id': media_id}), 200
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)}), 500
     
     # PATCH logic - update media fields and metadata
     data = request.get_json()
     
     # Update only fields present in request
-    for field in ['title', 'creator', 'year', 'type', 'status', 'publish_date', 'cover_url']:
+    for field in MEDIA_FIELDS:
         if field in data:
             setattr(media, field, data[field])
+    reindex = 'title' in data or 'creator' in data
     
-    # Metadata update - replace all existing metadata
+    # Metadata update - make stored metadata match the submitted list,
+    # writing only the rows that actually differ
     if 'metadata' in data and isinstance(data['metadata'], list):
-        # Remove old metadata entries
-        MediaMetadata.query.filter_by(media_id=media_id).delete()
-        
-        # Add new metadata entries
-        for md in data['metadata']:
-            if 'name' in md and 'value' in md:
-                new_md = MediaMetadata(media_id=media_id, name=md['name'], value=md['value'])
-                db.session.add(new_md)
+        submitted = [
+            (md['name'], md['value']) for md in data['metadata']
+            if 'name' in md and 'value' in md and md['value'] is not None
+        ]
+        if _apply_metadata_diff(media, submitted):
+            reindex = True
     
     try:
+        if reindex:
+            index_media([media_id])
         db.session.commit()
-        return jsonify({'success': True, 'media': media.to_dict()}), 200
+        return jsonify({'success': True, 'media': media.to_dict(include_metadata=_include_metadata())}), 200
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Media was modified by another request, please retry'}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Media columns that clients may set directly (POST, PATCH and CSV import)
+MEDIA_FIELDS = ('title', 'creator', 'year', 'type', 'status', 'publish_date', 'cover_url')
+
+def _validate_media(data):
+    """
+    Validate a new media item and collect its column values.
+    
+    Shared by POST /api/media and POST /api/media/import so both
+    apply the same rules.
+    
+    Parameters:
+        data (dict): Incoming item (JSON body or CSV row)
+    
+    Returns:
+        tuple: (fields, missing)
+            fields (dict): Column values for Media(**fields), including user_id
+            missing (list[str]): Names of missing required fields
+    """
+    fields = {
+        'user_id': data.get('user_id'),
+        'title': data.get('title'),
+        'creator': data.get('creator'),
+        'year': data.get('year'),
+        'type': data.get('type'),
+        'publish_date': data.get('publish_date'),
+        'cover_url': data.get('cover_url'),
+        'status': data.get('status', 'Not Started')
+    }
+    
+    # Validate required fields and collect missing ones
+    missing = []
+    if not fields['title']:
+        missing.append('title')
+    if not fields['creator']:
+        missing.append('creator')
+    if not fields['type']:
+        missing.append('type')
+    if not fields['user_id']:
+        missing.append('user_id')
+    
+    return fields, missing
+
+def _metadata_entries(metadata):
+    """
+    Normalize incoming metadata to a list of {name, value} pairs.
+    
+    Parameters:
+        metadata (dict or list): {"isbn": "123"} or [{"name": "isbn", "value": "123"}]
+    
+    Returns:
+        list[dict]: Entries with both name and value present (None values skipped)
+    """
+    if not metadata:
+        return []
+    if isinstance(metadata, dict):
+        # Convert dict to list of {name, value} pairs, skip None values
+        return [{'name': k, 'value': v} for k, v in metadata.items() if v is not None]
+    if isinstance(metadata, list):
+        # Only include entries with both name and value present
+        return [entry for entry in metadata if entry.get('name') is not None and entry.get('value') is not None]
+    return []
+
 @bp.route('/api/media', methods=['POST'])
 def add_media():
     """
@@ -146,85 +444,29 @@ def add_media():
         }
     """
     data = request.get_json()
-    print('DEBUG: Incoming request data:', data)
+    current_app.logger.debug('add_media request data: %s', data)
 
     # Extract and validate required fields
-    title = data.get('title')
-    creator = data.get('creator')
-    year = data.get('year')
-    media_type = data.get('type')
-    user_id = data.get('user_id')
-    print(f'DEBUG: user_id value: {user_id} (type: {type(user_id)})')
-    
-    # Extract optional fields with defaults
-    status = data.get('status', 'Not Started')
-    publish_date = data.get('publish_date')
-    cover_url = data.get('cover_url')
-
-    # Validate required fields and collect missing ones
-    missing = []
-    if not title:
-        missing.append('title')
-    if not creator:
-        missing.append('creator')
-    if not media_type:
-        missing.append('type')
-    if not user_id:
-        missing.append('user_id')
-    
+    fields, missing = _validate_media(data)
     if missing:
         return jsonify({'error': f"Missing required fields: {', '.join(missing)}"}), 400
+    denied = forbid_other_user(fields['user_id'])
+    if denied:
+        return denied
 
     try:
         # Create new media item
-        item = Media(
-            user_id=user_id,
-            title=title,
-            creator=creator,
-            year=year,
-            type=media_type,
-            publish_date=publish_date,
-            cover_url=cover_url,
-            status=status
-        )
+        item = Media(**fields)
         db.session.add(item)
         db.session.flush()  # Ensure item.id is available for metadata foreign keys
 
-        # Process metadata - supports both dict and list formats
-        metadata = data.get('metadata')
-        print(f'DEBUG: Parsed metadata: {metadata}')
-        
-        from models import MediaMetadata
-        metadata_entries = []
-        
-        if metadata:
-            if isinstance(metadata, dict):
-                # Convert dict to list of {name, value} pairs, skip None values
-                for k, v in metadata.items():
-                    if v is not None:
-                        metadata_entries.append({'name': k, 'value': v})
-            elif isinstance(metadata, list):
-                # Only include entries with both name and value present
-                metadata_entries = [entry for entry in metadata if entry.get('name') is not None and entry.get('value') is not None]
-
-        # Save each valid metadata entry to database
-        for entry in metadata_entries:
-            name = entry.get('name')
-            value = entry.get('value')
-            print(f'DEBUG: Processing metadata entry: name={name}, value={value}')
-            
-            try:
-                meta = MediaMetadata(media_id=item.id, name=name, value=value)
-                db.session.add(meta)
-                print(f'DEBUG: Added MediaMetadata: media_id={item.id}, name={name}, value={value}')
-            except Exception as meta_err:
-                print(f'ERROR: Failed to add MediaMetadata: {meta_err}')
+        # Save each valid metadata entry to database (dict or list format)
+        for entry in _metadata_entries(data.get('metadata')):
+            db.session.add(MediaMetadata(media_id=item.id, name=entry['name'], value=entry['value']))
 
-        print('DEBUG: Attempting to commit session...')
-        
         try:
+            index_media([item.id])
             db.session.commit()
-            print('DEBUG: Commit successful.')
             return jsonify({
                 'success': True, 
                 'id': item.id, 
@@ -232,50 +474,614 @@ def add_media():
             }), 201
         except Exception as commit_err:
             db.session.rollback()
-            print(f'ERROR: Commit failed: {commit_err}')
+            current_app.logger.error('add_media commit failed: %s', commit_err)
             return jsonify({'error': f'Commit failed: {commit_err}'}), 500
             
     except Exception as e:
         db.session.rollback()
-        print(f'ERROR: Unexpected exception: {e}')
+        current_app.logger.error('add_media failed: %s', e)
         return jsonify({'error': str(e)}), 500
 
+# Rows inserted and committed together by POST /api/media/import
+IMPORT_BATCH_SIZE = 1000
+
+# Row errors reported in full by POST /api/media/import (the rest are only counted)
+MAX_IMPORT_ERRORS = 1000
+
+@bp.route('/api/media/import', methods=['POST'])
+def import_media():
+    """
+    Bulk-import media items from a UTF-8 CSV file (user story 21).
+    
+    The CSV is read row by row from the upload stream (never loaded into
+    memory as a whole). Each row is validated with the same rules as
+    POST /api/media; valid rows are inserted IMPORT_BATCH_SIZE at a time
+    with one commit per batch, and invalid rows are reported by line number.
+
+    CSV Columns (header row required):
+        title, creator, type (required)
+        year, publish_date, cover_url, status (optional)
+        Any other column is stored as MediaMetadata (empty cells are skipped)
+
+    Request:
+        multipart/form-data with 'file' (CSV) and 'user_id' fields, or
+        a raw text/csv body with ?user_id= in the query string
+
+    Returns:
+        200: JSON with 'imported', 'failed', 'errors' ([{"row": n, "error": "..."}])
+             and 'rows_per_second'
+        400: Missing user_id, file or header row
+
+    Usage:
+        curl -F user_id=1 -F file=@catalog.csv http://localhost:5002/api/media/import
+    """
+    user_id = request.form.get('user_id') or request.args.get('user_id')
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'user_id required and must be an integer'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    
+    if 'file' in request.files:
+        stream = request.files['file'].stream
+    elif request.mimetype == 'text/csv':
+        stream = request.stream
+    else:
+        return jsonify({'success': False, 'error': 'CSV file required'}), 400
+    
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    started = time.perf_counter()
+    imported = 0
+    failed = 0
+    errors = []
+    
+    def report(row_number, message):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_IMPORT_ERRORS:
+            errors.append({'row': row_number, 'error': message})
+    
+    def flush_batch(batch):
+        """Insert one batch of validated rows and commit it."""
+        nonlocal imported
+        try:
+            items = [Media(**fields) for _, fields, _ in batch]
+            db.session.add_all(items)
+            db.session.flush()
+            metadata_rows = [
+                {'media_id': item.id, 'name': entry['name'], 'value': entry['value']}
+                for item, (_, _, entries) in zip(items, batch) for entry in entries
+            ]
+            if metadata_rows:
+                db.session.execute(insert(MediaMetadata), metadata_rows)
+            index_media([item.id for item in items])
+            db.session.commit()
+            imported += len(batch)
+        except Exception as e:
+            db.session.rollback()
+            for row_number, _, _ in batch:
+                report(row_number, f'Batch insert failed: {e}')
+    
+    batch = []
+    try:
+        if not reader.fieldnames:
+            return jsonify({'success': False, 'error': 'CSV header row required'}), 400
+        metadata_columns = [c for c in reader.fieldnames if c and c not in MEDIA_FIELDS and c != 'user_id']
+        
+        for row in reader:
+            row_number = reader.line_num
+            data = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k in MEDIA_FIELDS}
+            data['user_id'] = user_id
+            if not data.get('status'):
+                data.pop('status', None)
+            try:
+                data['year'] = int(data['year']) if data.get('year') else None
+            except ValueError:
+                report(row_number, f"Invalid year: {data['year']}")
+                continue
+            
+            fields, missing = _validate_media(data)
+            if missing:
+                report(row_number, f"Missing required fields: {', '.join(missing)}")
+                continue
+            
+            entries = _metadata_entries({c: row[c] for c in metadata_columns if row.get(c)})
+            batch.append((row_number, fields, entries))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush_batch(batch)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        report(reader.line_num, f'Unreadable CSV, import stopped: {e}')
+    
+    if batch:
+        flush_batch(batch)
+    
+    elapsed = time.perf_counter() - started
+    return jsonify({
+        'success': True,
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'rows_per_second': round((imported + failed) / elapsed, 1) if elapsed > 0 else None
+    }), 200
+
+# Upper bound on ids accepted by a single batch lookup (keeps the IN list sane)
+MAX_BATCH_IDS = 500
+
+def _parse_id_list(raw):
+    """
+    Parse a comma-separated list of integer IDs from a query string value.
+    
+    Parameters:
+        raw (str): Comma-separated IDs, e.g. "1,2,3"
+    
+    Returns:
+        list[int]: IDs in request order with duplicates removed
+    
+    Raises:
+        ValueError: If any entry is not an integer
+    """
+    ids = []
+    seen = set()
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        media_id = int(part)
+        if media_id not in seen:
+            seen.add(media_id)
+            ids.append(media_id)
+    return ids
+
+def _get_media_batch(raw_ids):
+    """
+    Look up many media items by ID, through the cache (misses are loaded
+    with a single IN (...) query).
+    
+    Used by collection-service to hydrate a collection in one round trip
+    instead of one GET /api/media/<id> per item.
+    
+    Parameters:
+        raw_ids (str): Comma-separated media IDs from the 'ids' query parameter
+    
+    Returns:
+        200: JSON with 'media' (full media objects, or the ?fields= subset,
+             in request order) and 'missing' (IDs that do not exist, or
+             belong to another user)
+        400: Malformed or too many IDs, or an unknown field
+        401: No access token
+    """
+    denied = require_token()
+    if denied:
+        return denied
+    try:
+        ids = _parse_id_list(raw_ids)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be a comma-separated list of integers'}), 400
+    
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_BATCH_IDS} ids per request'}), 400
+    include_metadata = _include_metadata()
+    try:
+        fields = _requested_fields(include_metadata)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Cache hits are served from memory; only the misses hit the database
+    found = _cached_media(ids, include_metadata) if ids else {}
+    # Other users' items are reported as missing
+    found = {media_id: hit for media_id, hit in found.items() if hit[0]['user_id'] == g.auth_user_id}
+    
+    media_list = [pick_fields(found[media_id][1], fields) for media_id in ids if media_id in found]
+    missing = [media_id for media_id in ids if media_id not in found]
+    
+    return jsonify({'success': True, 'media': media_list, 'missing': missing}), 200
+
+# Fields a client may request with ?fields= (the keys of Media.to_dict())
+READ_FIELDS = ('id', 'user_id', 'title', 'creator', 'year', 'type', 'publish_date',
+               'cover_url', 'status', 'date_added', 'updated_at')
+
+# Fields of each item in GET /api/media pages when no ?fields= is given
+LIST_FIELDS = ('id', 'title', 'creator', 'year', 'type', 'publish_date', 'date_added')
+
+def _requested_fields(include_metadata=False):
+    """
+    Parse the ?fields= sparse fieldset of a media read.
+    
+    Parameters:
+        include_metadata (bool): Keep the embedded 'metadata' list (include=metadata)
+    
+    Returns:
+        tuple[str] or None: Fields to return ('id' always included), None for the default
+    
+    Raises:
+        ValueError: If a field is not in READ_FIELDS
+    """
+    fields = parse_fields(request.args.get('fields'), READ_FIELDS)
+    if fields is not None and include_metadata:
+        fields += ('metadata',)
+    return fields
+
+# Page sizes for GET /api/media (keyset pagination)
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Sortable columns for GET /api/media: name -> (column, nullable, default order)
+SORT_COLUMNS = {
+    'date_added': (Media.date_added, False, 'desc'),
+    'title': (Media.title, False, 'asc'),
+    'year': (Media.year, True, 'asc'),
+}
+
+def _encode_cursor(sort, order, value, last_id):
+    """
+    Build an opaque pagination cursor from the last row of a page.
+    
+    Parameters:
+        sort (str): Sort column name (key of SORT_COLUMNS)
+        order (str): 'asc' or 'desc'
+        value: Sort column value of the last row (datetime, str, int or None)
+        last_id (int): ID of the last row (tie-breaker)
+    
+    Returns:
+        str: URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, order, value, last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor, sort, order):
+    """
+    Decode a cursor produced by _encode_cursor.
+    
+    Returns:
+        tuple: (value, last_id) for the row the next page starts after
+    
+    Raises:
+        ValueError: If the cursor is malformed, holds a value of the wrong
+        type for the sort column, or was issued for another sort
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cur_sort, cur_order, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cur_sort != sort or cur_order != order:
+        raise ValueError('Cursor does not match sort order')
+    # Values are bound straight into the keyset comparison, so a hand-edited
+    # cursor must not reach the database with the wrong type
+    if not _is_db_int(last_id):
+        raise ValueError('Invalid cursor')
+    if value is None:
+        if not SORT_COLUMNS[sort][1]:
+            raise ValueError('Invalid cursor')
+    elif sort == 'year':
+        if not _is_db_int(value):
+            raise ValueError('Invalid cursor')
+    elif not isinstance(value, str):
+        raise ValueError('Invalid cursor')
+    elif sort == 'date_added':
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError('Invalid cursor')
+    return value, last_id
+
+def _is_db_int(value):
+    """Whether a decoded cursor value is an integer that fits a BIGINT column."""
+    return isinstance(value, int) and not isinstance(value, bool) and -2**63 <= value < 2**63
+
+def _keyset_page(query, column, nullable, descending, limit, after):
+    """
+    Fetch one page (plus one look-ahead row) ordered by (column, id).
+    
+    Uses a row-value comparison (column, id) > (value, id) so the database
+    can seek straight into the (user_id, column, id) index instead of
+    counting past skipped rows the way OFFSET does. NULLs in a nullable
+    sort column always sort last and are paged by id alone.
+    
+    Parameters:
+        query: Base query over Media columns (already filtered, e.g. by user_id)
+        column: Media column to sort by
+        nullable (bool): Whether the sort column may contain NULLs
+        descending (bool): Sort direction
+        limit (int): Page size
+        after (tuple|None): (value, last_id) decoded from the cursor
+    
+    Returns:
+        list: Up to limit + 1 rows
+    """
+    if descending:
+        order_by = (column.desc(), Media.id.desc())
+    else:
+        order_by = (column.asc(), Media.id.asc())
+    
+    rows = []
+    in_null_region = after is not None and after[0] is None
+    
+    # Non-NULL region first
+    if not in_null_region:
+        q = query.filter(column.isnot(None)) if nullable else query
+        if after is not None:
+            key = tuple_(column, Media.id)
+            q = q.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+        rows = q.order_by(*order_by).limit(limit + 1).all()
+    
+    # Then the NULL region, if the page still has room
+    if nullable and len(rows) <= limit:
+        q = query.filter(column.is_(None))
+        if in_null_region:
+            q = q.filter(Media.id < after[1] if descending else Media.id > after[1])
+        rows += q.order_by(order_by[1]).limit(limit + 1 - len(rows)).all()
+    
+    return rows
+
 @bp.route('/api/media', methods=['GET'])
 def list_media():
     """
-    Retrieve all media items in the catalog.
+    Retrieve one page of a user's media items.
     
-    Returns a list of all media items with basic information.
-    Note: This endpoint currently returns all media regardless of user.
-    Consider adding user filtering for production use.
+    Uses keyset (cursor) pagination: each response carries a 'next_cursor'
+    that is passed back as 'after' to fetch the following page, so the cost
+    of a page does not depend on how far into the catalog it is.
+    Ties in the sort column are broken by id for a stable order.
+
+    When the 'ids' parameter is present the endpoint switches to batch
+    lookup mode and returns full media objects for exactly those IDs, in
+    request order (so a page of collection-service's
+    /api/collection-media/by-rating is hydrated as sorted).
 
     Query Parameters:
-        user_id (int): Filter by user ID (optional, not currently implemented)
+        user_id (int): Only return media owned by this user (optional,
+                       defaults to the token's user; must match it)
+        limit (int): Page size (optional, default 50, max 500)
+        after (str): Cursor from a previous response's 'next_cursor' (optional)
+        sort (str): date_added, title or year (optional, default date_added)
+        order (str): asc or desc (optional, default desc for date_added, asc otherwise)
+        ids (str): Comma-separated media IDs for batch lookup (optional, max 500)
+        include (str): "metadata" to embed each item's metadata list (optional)
+        fields (str): Comma-separated fields to return (optional); only those
+                      columns are selected, e.g. "id,title,type" for a dropdown
 
     Returns:
-        200: JSON object with 'media' array containing media items
-        Each media item includes: id, title, creator, year, type, publish_date, description
+        200: JSON object with 'media' array and 'next_cursor' (null on the last page)
+        Each media item includes: id, title, creator, year, type, publish_date, date_added
+        (or the requested fields, plus id)
+        In batch mode: {"success": true, "media": [...], "missing": [...]}
+        400: Invalid user_id, limit, sort, order, cursor or fields
+        401: No access token
+        403: user_id is not the token's user
 
     Usage:
-        GET /api/media
-        Returns: {"media": [{"id": 1, "title": "Book Title", ...}, ...]}
+        GET /api/media?user_id=1&sort=title&limit=50
+        Returns: {"media": [{"id": 1, "title": "Book Title", ...}, ...], "next_cursor": "..."}
+        GET /api/media?user_id=1&sort=title&limit=50&after=<next_cursor>
+        GET /api/media?user_id=1&fields=id,title,type
+        GET /api/media?ids=1,2,3
+        Returns: {"success": true, "media": [{...}, {...}], "missing": [3]}
     """
-    items = Media.query.all()
+    if 'ids' in request.args:
+        return _get_media_batch(request.args.get('ids', ''))
     
-    # Build list of dictionaries for each media item
-    result = [
-        {
-            'id': media.id,
-            'title': media.title,
-            'creator': media.creator,
-            'year': media.year,
-            'type': media.type,
-            'publish_date': media.publish_date,
-            'description': getattr(media, 'description', None)
-        } for media in items
-    ]
-    
-    return jsonify({'media': result})
+    sort = request.args.get('sort', 'date_added')
+    if sort not in SORT_COLUMNS:
+        return jsonify({'success': False, 'error': f"sort must be one of: {', '.join(SORT_COLUMNS)}"}), 400
+    column, nullable, default_order = SORT_COLUMNS[sort]
+    
+    order = request.args.get('order', default_order)
+    if order not in ('asc', 'desc'):
+        return jsonify({'success': False, 'error': 'order must be asc or desc'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    after = None
+    if request.args.get('after'):
+        try:
+            after = _decode_cursor(request.args['after'], sort, order)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+    
+    include_metadata = _include_metadata()
+    try:
+        fields = parse_fields(request.args.get('fields'), READ_FIELDS) or LIST_FIELDS
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # Core rows of just the requested columns (plus the sort column, which
+    # the cursor needs); no Media objects are built
+    columns, serialize = row_serializer(Media, fields)
+    query = db.session.query(*columns, *([column] if sort not in fields else []))
+    
+    user_id = request.args.get('user_id')
+    if user_id:
+        try:
+            query = query.filter(Media.user_id == int(user_id))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'user_id must be an integer'}), 400
+        denied = forbid_other_user(user_id)
+        if denied:
+            return denied
+    else:
+        denied = require_token()
+        if denied:
+            return denied
+        query = query.filter(Media.user_id == g.auth_user_id)
+    
+    items = _keyset_page(query, column, nullable, order == 'desc', limit, after)
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = _encode_cursor(sort, order, getattr(last, sort), last.id)
+    
+    result = [serialize(row) for row in items]
+    if include_metadata and result:
+        # One extra SELECT ... WHERE media_id IN (page ids) for the whole page
+        metadata = defaultdict(list)
+        for media_id, name, value in db.session.execute(
+            select(MediaMetadata.media_id, MediaMetadata.name, MediaMetadata.value)
+            .where(MediaMetadata.media_id.in_([entry['id'] for entry in result]))
+            .order_by(MediaMetadata.id)
+        ):
+            metadata[media_id].append({'name': name, 'value': value})
+        for entry in result:
+            entry['metadata'] = metadata[entry['id']]
+    
+    return jsonify({'media': result, 'next_cursor': next_cursor})
+
+# Media rows fetched from the database (and rated via collection-service) per chunk
+EXPORT_BATCH_SIZE = 500
+
+# Column layout of the catalog export (backlog user story 20)
+EXPORT_HEADER = ['ID', 'Title', 'Type', 'Publish Date', 'Rating']
+
+@bp.route('/api/media/export', methods=['GET'])
+def export_media():
+    """
+    Stream a user's catalog as CSV with ratings (user story 20).
+    
+    Rows are read with a server-side cursor EXPORT_BATCH_SIZE at a time;
+    each chunk's ratings are fetched from collection-service in a single
+    batch call and the chunk is written out before the next one is read,
+    so memory use does not grow with the size of the catalog. When the
+    client sends 'Accept-Encoding: gzip' the stream is compressed on the fly.
+    
+    If collection-service cannot be reached for a chunk, that chunk is
+    exported with empty ratings rather than aborting the download.
+
+    Query Parameters:
+        user_id (int): Owner of the catalog (required)
+
+    Returns:
+        200: text/csv attachment with columns ID, Title, Type, Publish Date, Rating
+        400: Missing or invalid user_id
+
+    Usage:
+        GET /api/media/export?user_id=1
+    """
+    try:
+        user_id = int(request.args.get('user_id', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'user_id required and must be an integer'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    
+    use_gzip = 'gzip' in request.accept_encodings
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        def take():
+            data = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
+        
+        writer.writerow(EXPORT_HEADER)
+        yield take()
+        
+        stmt = (
+            select(Media.id, Media.title, Media.type, Media.publish_date)
+            .where(Media.user_id == user_id)
+            .order_by(Media.date_added, Media.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in db.session.execute(stmt).partitions():
+            try:
+                ratings = collection_client.get_ratings(user_id, [row.id for row in rows])
+            except Exception as e:
+                current_app.logger.warning('export: ratings unavailable for chunk: %s', e)
+                ratings = {}
+            for row in rows:
+                writer.writerow([row.id, row.title, row.type, row.publish_date, ratings.get(row.id, '')])
+            yield take()
+    
+    def generate_gzip():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+        for chunk in generate_csv():
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
+    
+    body = generate_gzip() if use_gzip else (chunk.encode('utf-8') for chunk in generate_csv())
+    response = Response(stream_with_context(body), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename=media_export_{user_id}.csv'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+# Page sizes for GET /api/media/search
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+@bp.route('/api/media/search', methods=['GET'])
+def search_media_route():
+    """
+    Full-text search over a user's media titles and creators (user story 7).
+    
+    Every word in 'q' must match as a prefix of a word in the title or
+    creator (or metadata values when metadata=1). Results are ordered by
+    relevance, with title matches ranked above creator matches.
+
+    Query Parameters:
+        user_id (int): Owner whose media is searched (required)
+        q (str): Search text, e.g. "gats" or "great fitz" (required)
+        limit (int): Page size (optional, default 20, max 100)
+        offset (int): Number of results to skip (optional, default 0)
+        metadata (str): "1" to also search metadata values (optional)
+
+    Returns:
+        200: JSON with 'media' array (best match first) and 'next_offset'
+             (null on the last page)
+        400: Missing or invalid parameters
+
+    Usage:
+        GET /api/media/search?user_id=1&q=gats
+        Returns: {"success": true, "media": [{...}], "next_offset": null}
+    """
+    user_id = request.args.get('user_id')
+    q = request.args.get('q', '').strip()
+    if not user_id or not q:
+        return jsonify({'success': False, 'error': 'user_id and q required'}), 400
+    
+    try:
+        user_id = int(user_id)
+        limit = int(request.args.get('limit', DEFAULT_SEARCH_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'user_id, limit and offset must be integers'}), 400
+    denied = forbid_other_user(user_id)
+    if denied:
+        return denied
+    limit = max(1, min(limit, MAX_SEARCH_PAGE_SIZE))
+    offset = max(0, offset)
+    include_metadata = request.args.get('metadata') in ('1', 'true')
+    
+    media_ids, has_more = search_media(user_id, q, limit, offset, include_metadata)
+    
+    # Load the matched rows in one query and return them in rank order
+    found = {}
+    if media_ids:
+        found = {m.id: m for m in Media.query.filter(Media.id.in_(media_ids)).all()}
+    result = [found[media_id].to_dict() for media_id in media_ids if media_id in found]
+    
+    return jsonify({
+        'success': True,
+        'media': result,
+        'next_offset': offset + limit if has_more else None
+    }), 200
 
 @bp.route('/api/media/<int:media_id>/metadata', methods=['GET'])
 def get_media_metadata(media_id):
@@ -289,19 +1095,172 @@ def get_media_metadata(media_id):
         media_id (int): ID of the media item
 
     Returns:
-        200: JSON with 'metadata' array of {name, value} objects
-        404: Media not found (implicitly - no explicit check)
+        200: JSON with 'metadata' array of {name, value} objects and a
+             strong ETag (metadata writes bump the media item's version)
+        304: Not modified (If-None-Match matched the current ETag)
+        404: Media not found (implicitly - an empty list is returned)
 
     Usage:
         GET /api/media/123/metadata
         Returns: {"success": true, "metadata": [{"name": "isbn", "value": "123"}, ...]}
     """
-    from models import MediaMetadata
+    entry = media_cache.get('metadata', media_id, _load_metadata_entries)
+    if not entry:
+        return jsonify({'success': True, 'metadata': []})
+    denied = forbid_other_user(entry['user_id'])
+    if denied:
+        return denied
+    etag = etag_for('media-metadata', media_id, entry['version'])
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    response = jsonify({'success': True, 'metadata': entry['metadata']})
+    return with_etag(response, etag)
+
+@bp.route('/api/media/<int:media_id>/metadata', methods=['PATCH'])
+def patch_media_metadata(media_id):
+    """
+    Partially update metadata for a media item (upsert by name).
+    
+    Only the names sent are touched: a name with a value is inserted or
+    updated, a name with a null value is deleted, and every other stored
+    name is left as is. All changes are applied in one transaction.
+
+    Parameters:
+        media_id (int): ID of the media item
+
+    Request Body (JSON):
+        metadata (dict or list): Names to upsert or delete
+            - Dict format: {"isbn": "123", "genre": null}
+            - List format: [{"name": "isbn", "value": "123"}, {"name": "genre", "value": null}]
+              (a name listed twice keeps its last value)
+
+    Returns:
+        200: JSON with the item's full 'metadata' array after the update
+        400: Body is not a JSON object, or missing or malformed metadata
+        404: Media not found
+        409: The item was changed by another request at the same time
+        500: Database error
+
+    Usage:
+        PATCH /api/media/123/metadata
+        {"metadata": {"rating_source": "imdb", "genre": null}}
+    """
+    media = Media.query.get(media_id)
+    if not media:
+        return jsonify({'success': False, 'error': 'Media not found'}), 404
+    denied = forbid_other_user(media.user_id)
+    if denied:
+        return denied
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    metadata = data.get('metadata')
+    if isinstance(metadata, dict):
+        updates = metadata
+    elif isinstance(metadata, list) and all(isinstance(md, dict) and md.get('name') for md in metadata):
+        # A name sent more than once keeps its last value
+        updates = {md['name']: md.get('value') for md in metadata}
+    else:
+        return jsonify({'success': False, 'error': 'metadata must be an object or a list of {name, value}'}), 400
+    
+    stored = defaultdict(list)
+    for row in media.metadata_items:
+        stored[row.name].append(row)
+    
+    changed = False
+    for name, value in updates.items():
+        rows = stored.pop(name, [])
+        if value is None:
+            for row in rows:
+                db.session.delete(row)
+                changed = True
+            continue
+        value = str(value)
+        if rows:
+            if rows[0].value != value:
+                rows[0].value = value
+                changed = True
+            for row in rows[1:]:
+                db.session.delete(row)  # collapse duplicate names
+                changed = True
+        else:
+            db.session.add(MediaMetadata(media_id=media_id, name=name, value=value))
+            changed = True
+    
+    try:
+        if changed:
+            media.touch()
+            db.session.flush()
+            db.session.expire(media, ['metadata_items'])
+            index_media([media_id])
+        db.session.commit()
+        result = [{'name': m.name, 'value': m.value} for m in media.metadata_items]
+        return jsonify({'success': True, 'metadata': result}), 200
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': 'Media was modified by another request, please retry'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/media/cache/stats', methods=['GET'])
+def media_cache_stats():
+    """
+    Report read-through cache counters for this worker process.
+    
+    Use the hit ratio and eviction count to size MEDIA_CACHE_SIZE and
+    MEDIA_CACHE_TTL (counters are per process and reset on restart).
+
+    Returns:
+        200: JSON with 'cache': {'local': {...}, 'shared': {...} or null, 'invalidations': n}
+
+    Usage:
+        GET /api/media/cache/stats
+    """
+    return jsonify({'success': True, 'cache': media_cache.stats()}), 200
+
+# Page size limits for GET /api/internal/media-feed
+DEFAULT_FEED_PAGE = 1000
+MAX_FEED_PAGE = 5000
+
+@bp.route('/api/internal/media-feed', methods=['GET'])
+def media_feed():
+    """
+    Page through every media item in ID order (service-to-service).
     
-    metadata = MediaMetadata.query.filter_by(media_id=media_id).all()
+    Used by collection-service's 'flask rebuild-media-projection'. Each page
+    also reports the outbox position read before the page, so the rebuilt
+    projection knows which change events it already reflects.
     
-    result = [
-        {'name': m.name, 'value': m.value} for m in metadata
-    ]
+    Query Parameters:
+        after (int): Return items with a larger ID (default 0)
+        limit (int): Items per page (default 1000, max 5000)
+    
+    Returns:
+        200: JSON with 'media' (to_dict() plus 'version'), 'next_after'
+             (null on the last page) and 'outbox_position'
+        400: Invalid parameters
+    
+    Usage:
+        GET /api/internal/media-feed?after=0&limit=1000
+    """
+    from outbox import outbox_position
+    try:
+        after = int(request.args.get('after', 0))
+        limit = min(int(request.args.get('limit', DEFAULT_FEED_PAGE)), MAX_FEED_PAGE)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'after and limit must be integers'}), 400
+    if limit < 1:
+        return jsonify({'success': False, 'error': 'limit must be positive'}), 400
     
-    return jsonify({'success': True, 'metadata': result})
+    position = outbox_position()
+    items = Media.query.filter(Media.id > after).order_by(Media.id).limit(limit).all()
+    return jsonify({
+        'success': True,
+        'media': [{**m.to_dict(), 'version': m.version} for m in items],
+        'next_after': items[-1].id if len(items) == limit else None,
+        'outbox_position': position
+    }), 200
@@ -0,0 +1,224 @@
+"""
+====================================================================================
+search.py - Full-Text Search Index for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Provides partial-title / creator search (user story 7) backed by a real text index
+  - SQLite (development): FTS5 virtual table 'media_fts' kept in sync by the routes
+    (created and back-filled automatically the first time the service sees the schema)
+  - MySQL (production): FULLTEXT indexes declared on the models, maintained by InnoDB
+
+Major Functions:
+  - search_media: Ranked, user-scoped, paginated search returning media IDs
+  - index_media: Re-index specific media items (call before commit on every write)
+  - remove_media: Drop media items from the index
+  - rebuild_index: Recreate the SQLite index from the media tables
+  - include_object: Keeps Flask-Migrate from touching the search structures
+  - init_app: Ensures the SQLite index exists before each request is handled
+
+Security:
+  - Search terms are reduced to word tokens and passed as bound parameters
+  - Every query is filtered by user_id
+
+Usage:
+  - from search import search_media, index_media
+  - ids, has_more = search_media(user_id=1, q='gats', limit=20, offset=0)
+
+====================================================================================
+"""
+
+import re
+
+from sqlalchemy import text
+
+from app import db
+
+# Name of the SQLite FTS5 table (rowid = media.id)
+FTS_TABLE = 'media_fts'
+
+# Prefix of the MySQL FULLTEXT index names declared in models.py
+FULLTEXT_PREFIX = 'ft_'
+
+# bm25 column weights for title, creator and metadata (SQLite)
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Engines whose FTS5 table has already been checked in this process
+_ensured = set()
+
+def _dialect():
+    """Return the name of the active database dialect ('sqlite', 'mysql', ...)."""
+    return db.engine.dialect.name
+
+def _tokens(q):
+    """
+    Split a user query into word tokens.
+
+    Returns:
+        list[str]: Lower-cased word tokens, punctuation and operators removed
+    """
+    return [t.lower() for t in re.findall(r'\w+', q or '', re.UNICODE)]
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """
+    Flask-Migrate filter that hides search structures from autogenerate.
+
+    The FTS5 table (and its shadow tables) is managed here, not by migrations,
+    and the FULLTEXT indexes only exist on MySQL.
+    """
+    if type_ == 'table' and name and name.startswith(FTS_TABLE):
+        return False
+    if type_ == 'index' and name and name.startswith(FULLTEXT_PREFIX) and _dialect() != 'mysql':
+        return False
+    return True
+
+def _populate_sql(where=''):
+    """INSERT ... SELECT statement that (re)builds FTS rows from the media tables."""
+    return (
+        f"INSERT INTO {FTS_TABLE} (rowid, title, creator, metadata, user_id) "
+        "SELECT m.id, m.title, m.creator, "
+        "(SELECT group_concat(mm.value, ' ') FROM media_metadata mm WHERE mm.media_id = m.id), "
+        f"m.user_id FROM media m {where}"
+    )
+
+def ensure_index():
+    """
+    Create (and initially populate) the SQLite FTS5 table if it is missing.
+
+    Runs on its own connection and commits immediately, so it must be called
+    before the request has written anything (init_app hooks it into
+    before_request). No-op on other databases, and checked only once per
+    engine per process.
+    """
+    if db.engine.url in _ensured:
+        return
+    if _dialect() != 'sqlite':
+        _ensured.add(db.engine.url)
+        return
+    with db.engine.begin() as conn:
+        tables = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+        if 'media' not in tables:
+            # Schema not migrated yet; try again on the next request
+            return
+        if FTS_TABLE not in tables:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "title, creator, metadata, user_id UNINDEXED, "
+                "prefix = '2 3', tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            conn.execute(text(_populate_sql()))
+    _ensured.add(db.engine.url)
+
+def init_app(app):
+    """
+    Hook the search index into the Flask app.
+
+    Parameters:
+        app (Flask): Application being created by create_app()
+    """
+    app.before_request(ensure_index)
+
+def index_media(media_ids):
+    """
+    Refresh the search index for the given media items.
+
+    Must run inside the same transaction as the write (before commit) so
+    the index never disagrees with the media tables. Pending ORM changes
+    are flushed first.
+
+    Parameters:
+        media_ids (list[int]): IDs of created or updated media items
+    """
+    if _dialect() != 'sqlite' or not media_ids:
+        return
+    db.session.flush()
+    params = {f'id{i}': media_id for i, media_id in enumerate(media_ids)}
+    in_list = ', '.join(f':{key}' for key in params)
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({in_list})"), params)
+    db.session.execute(text(_populate_sql(f"WHERE m.id IN ({in_list})")), params)
+
+def remove_media(media_ids):
+    """
+    Remove the given media items from the search index (SQLite only).
+
+    Parameters:
+        media_ids (list[int]): IDs of deleted media items
+    """
+    if _dialect() != 'sqlite' or not media_ids:
+        return
+    params = {f'id{i}': media_id for i, media_id in enumerate(media_ids)}
+    in_list = ', '.join(f':{key}' for key in params)
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({in_list})"), params)
+
+def rebuild_index():
+    """
+    Drop and rebuild the SQLite FTS5 table from the media tables.
+
+    Returns:
+        int: Number of media items indexed (0 on MySQL, where InnoDB
+        maintains the FULLTEXT indexes itself)
+    """
+    if _dialect() != 'sqlite':
+        return 0
+    with db.engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _ensured.discard(db.engine.url)
+    ensure_index()
+    return db.session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+
+def search_media(user_id, q, limit, offset, include_metadata=False):
+    """
+    Run a ranked, prefix-matching search over a user's media.
+
+    Every query term must match (AND) and is treated as a prefix, so
+    'gat fitz' finds 'The Great Gatsby' by 'F. Scott Fitzgerald'.
+
+    Parameters:
+        user_id (int): Owner whose media is searched
+        q (str): Raw search text
+        limit (int): Page size
+        offset (int): Number of ranked results to skip
+        include_metadata (bool): Also match MediaMetadata values
+
+    Returns:
+        tuple: (media_ids, has_more)
+            media_ids (list[int]): Matching IDs, best match first
+            has_more (bool): Whether another page exists
+    """
+    tokens = _tokens(q)
+    if not tokens:
+        return [], False
+
+    params = {'user_id': user_id, 'limit': limit + 1, 'offset': offset}
+
+    if _dialect() == 'sqlite':
+        terms = ' '.join(f'"{t}"*' for t in tokens)
+        columns = '{title creator metadata}' if include_metadata else '{title creator}'
+        params['match'] = f'{columns} : ({terms})'
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        rows = db.session.execute(text(
+            f"SELECT rowid FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH :match AND user_id = :user_id "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), rowid "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+    else:
+        params['match'] = ' '.join(f'+{t}*' for t in tokens)
+        relevance = "MATCH (m.title, m.creator) AGAINST (:match IN BOOLEAN MODE)"
+        condition = relevance
+        if include_metadata:
+            condition = (
+                f"({relevance} OR m.id IN (SELECT mm.media_id FROM media_metadata mm "
+                "WHERE MATCH (mm.value) AGAINST (:match IN BOOLEAN MODE)))"
+            )
+        rows = db.session.execute(text(
+            f"SELECT m.id FROM media m WHERE m.user_id = :user_id AND {condition} "
+            f"ORDER BY {relevance} DESC, m.id "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+
+    media_ids = [row[0] for row in rows]
+    return media_ids[:limit], len(media_ids) > limit
@@ -0,0 +1,107 @@
+"""
+====================================================================================
+conftest.py - Pytest Fixtures for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Runs the media-service tests against an in-memory SQLite database
+  - Builds the schema with the shipped migrations (flask db upgrade), so every
+    test also exercises migrations/
+  - Signs access tokens with a test key that the token verifier trusts in
+    place of auth-service's, so no other service has to be running
+
+Fixtures:
+  - app: Media Service app on the migrated database (one per test session)
+  - client: Flask test client; empties every table and the media cache afterwards
+  - make_token: make_token(user_id, **overrides) -> signed access token
+  - auth_headers: auth_headers(user_id) -> Authorization header for that user
+  - service_headers: Service token header for /api/internal/ endpoints
+
+Usage:
+  - python -m pytest   (from the media-service folder)
+
+====================================================================================
+"""
+
+import json
+import os
+import sys
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from flask_migrate import upgrade
+from jwt.algorithms import OKPAlgorithm
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+# Config reads the environment when it is imported, so set it before the app is
+INTERNAL_TOKEN = 'test-internal-token'
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['DB_PROFILE'] = 'dev-sqlite'
+os.environ['INTERNAL_API_TOKEN'] = INTERNAL_TOKEN
+os.environ['COLLECTION_NOTIFY_CHANGES'] = 'false'
+
+# Stands in for auth-service's signing key
+SIGNING_KEY = Ed25519PrivateKey.generate()
+KEY_ID = 'test-key'
+ISSUER = 'sortedshelf-auth'
+
+def signing_jwks():
+    """Key set the verifier loads instead of fetching GET /api/auth/keys."""
+    jwk = json.loads(OKPAlgorithm.to_jwk(SIGNING_KEY.public_key()))
+    return {'keys': [dict(jwk, kid=KEY_ID, use='sig', alg='EdDSA')]}
+
+@pytest.fixture(scope='session')
+def app():
+    """Media Service app whose in-memory database was built by the migrations."""
+    from app import create_app
+    from sortedshelf_common.auth_tokens import token_verifier
+    application = create_app()
+    application.config['TESTING'] = True
+    token_verifier.local_keys = signing_jwks
+    with application.app_context():
+        upgrade(directory=os.path.join(SERVICE_DIR, 'migrations'))
+    return application
+
+@pytest.fixture
+def client(app):
+    """Test client; every table, the search index and the cache are emptied afterwards."""
+    yield app.test_client()
+
+    from app import db
+    from cache import media_cache
+    from search import rebuild_index
+    with app.app_context():
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        rebuild_index()
+    media_cache.local.clear()
+
+@pytest.fixture
+def make_token():
+    """Factory for access tokens signed with the test key."""
+    def make(user_id, key=SIGNING_KEY, kid=KEY_ID, **claims):
+        now = int(time.time())
+        payload = {'sub': str(user_id), 'iss': ISSUER, 'iat': now, 'exp': now + 900}
+        payload.update(claims)
+        return jwt.encode(payload, key, algorithm='EdDSA', headers={'kid': kid})
+    return make
+
+@pytest.fixture
+def auth_headers(make_token):
+    """Factory for the Authorization header of a user."""
+    def headers(user_id):
+        return {'Authorization': f'Bearer {make_token(user_id)}'}
+    return headers
+
+@pytest.fixture
+def service_headers():
+    """Service token header accepted by /api/internal/ endpoints."""
+    return {'X-Internal-Token': INTERNAL_TOKEN}
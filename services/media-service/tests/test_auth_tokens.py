@@ -0,0 +1,49 @@
+"""
+====================================================================================
+test_auth_tokens.py - Access Token Tests for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Tokens are verified locally: expired, foreign-issuer, unknown-key,
+    wrongly signed and malformed tokens are answered with 401
+  - /api/internal/ endpoints take the service token, not a user token
+
+Usage:
+  - python -m pytest tests/test_auth_tokens.py
+
+====================================================================================
+"""
+
+import time
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+def test_valid_token_is_accepted(client, make_token):
+    resp = client.get('/api/media', headers={'Authorization': f'Bearer {make_token(1)}'})
+    assert resp.status_code == 200
+
+@pytest.mark.parametrize('overrides', [
+    {'exp': int(time.time()) - 3600},
+    {'iss': 'someone-else'},
+    {'kid': 'unknown-key'},
+    {'key': Ed25519PrivateKey.generate()},
+], ids=['expired', 'wrong-issuer', 'unknown-key-id', 'wrong-signing-key'])
+def test_bad_token_is_rejected(client, make_token, overrides):
+    resp = client.get('/api/media', headers={'Authorization': f'Bearer {make_token(1, **overrides)}'})
+    assert resp.status_code == 401
+    assert resp.get_json()['error'] == 'Invalid or expired access token'
+    assert resp.headers['WWW-Authenticate'] == 'Bearer'
+
+@pytest.mark.parametrize('header', ['Bearer not-a-jwt', 'Basic dXNlcjpwdw==', 'Bearer '])
+def test_malformed_authorization_header_is_rejected(client, header):
+    assert client.get('/api/media', headers={'Authorization': header}).status_code == 401
+
+def test_internal_endpoint_needs_the_service_token(client, auth_headers, service_headers):
+    assert client.get('/api/internal/media-feed').status_code == 401
+    assert client.get('/api/internal/media-feed', headers=auth_headers(1)).status_code == 401
+    assert client.get('/api/internal/media-feed', headers={'X-Internal-Token': 'guess'}).status_code == 401
+    assert client.get('/api/internal/media-feed', headers=service_headers).status_code == 200
@@ -0,0 +1,64 @@
+"""
+====================================================================================
+test_cache.py - Media Cache Tests for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - A load that overlaps an invalidation is served once but not cached
+    (the generation guard in MediaCache.get_many)
+  - Committed writes invalidate the cached item and its metadata
+
+Usage:
+  - python -m pytest tests/test_cache.py
+
+====================================================================================
+"""
+
+from cache import MediaCache
+
+def test_load_overlapping_an_invalidation_is_not_cached():
+    cache = MediaCache()
+    loads = []
+
+    def loader(media_ids):
+        loads.append(list(media_ids))
+        if len(loads) == 1:
+            # A write to the item commits while this read is still running
+            cache.invalidate(media_ids)
+        return {media_id: {'id': media_id, 'version': len(loads)} for media_id in media_ids}
+
+    assert cache.get('media', 1, loader) == {'id': 1, 'version': 1}
+    assert cache.get('media', 1, loader) == {'id': 1, 'version': 2}
+    assert cache.get('media', 1, loader) == {'id': 1, 'version': 2}
+    assert loads == [[1], [1]]
+
+def test_invalidate_drops_every_kind():
+    cache = MediaCache()
+    cache.get('media', 1, lambda ids: {1: 'item'})
+    cache.get('metadata', 1, lambda ids: {1: ['meta']})
+
+    cache.invalidate([1])
+
+    assert cache.get('media', 1, lambda ids: {1: 'item v2'}) == 'item v2'
+    assert cache.get('metadata', 1, lambda ids: {1: ['meta v2']}) == ['meta v2']
+    assert cache.stats()['invalidations'] == 1
+
+def test_commit_invalidates_cached_metadata(client, auth_headers):
+    headers = auth_headers(1)
+    resp = client.post('/api/media', headers=headers, json={
+        'user_id': 1, 'title': 'Title', 'creator': 'Creator', 'type': 'book', 'metadata': {'isbn': '111'}
+    })
+    media_id = resp.get_json()['id']
+    assert client.get(f'/api/media/{media_id}/metadata', headers=headers).get_json()['metadata'] == [
+        {'name': 'isbn', 'value': '111'}
+    ]
+
+    patched = client.patch(f'/api/media/{media_id}/metadata', headers=headers, json={'metadata': {'isbn': '222'}})
+    assert patched.status_code == 200
+
+    assert client.get(f'/api/media/{media_id}/metadata', headers=headers).get_json()['metadata'] == [
+        {'name': 'isbn', 'value': '222'}
+    ]
@@ -0,0 +1,158 @@
+"""
+====================================================================================
+test_media_routes.py - Media Route Tests for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - GET /api/media keyset pagination: following next_cursor visits every item
+    once, in order, including the NULL region of a nullable sort column
+  - Hand-edited or mistyped cursors are rejected with 400
+  - Single items answer a matching If-None-Match with 304 until they change
+  - Requests without a token get 401, requests for another user's data 403
+
+Usage:
+  - python -m pytest tests/test_media_routes.py
+
+====================================================================================
+"""
+
+import base64
+import json
+
+import pytest
+
+def add_media(client, auth_headers, user_id=1, **fields):
+    """Create a media item through the API and return its ID."""
+    body = {'user_id': user_id, 'title': 'Title', 'creator': 'Creator', 'type': 'book'}
+    body.update(fields)
+    resp = client.post('/api/media', json=body, headers=auth_headers(user_id))
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()['id']
+
+def walk_pages(client, headers, limit, max_pages=20, **params):
+    """Follow next_cursor from the first page to the last; return the IDs seen."""
+    ids = []
+    after = None
+    for _ in range(max_pages):
+        query = dict(params, limit=limit)
+        if after:
+            query['after'] = after
+        resp = client.get('/api/media', query_string=query, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        body = resp.get_json()
+        assert len(body['media']) <= limit
+        ids += [item['id'] for item in body['media']]
+        after = body['next_cursor']
+        if after is None:
+            return ids
+    pytest.fail(f'next_cursor did not reach the last page in {max_pages} pages: {ids}')
+
+def cursor(*parts):
+    """Encode a cursor the way _encode_cursor does, with arbitrary contents."""
+    raw = json.dumps(list(parts)).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_year_cursor_round_trip_includes_null_years(client, auth_headers, order):
+    years = [2001, None, 1999, None, 2005, None]
+    ids = [add_media(client, auth_headers, year=year) for year in years]
+    add_media(client, auth_headers, user_id=2, year=2000)
+
+    dated = sorted((year, media_id) for year, media_id in zip(years, ids) if year is not None)
+    undated = sorted(media_id for year, media_id in zip(years, ids) if year is None)
+    if order == 'desc':
+        dated.reverse()
+        undated.reverse()
+    expected = [media_id for _, media_id in dated] + undated
+
+    # Pages of 2 put one cursor inside the NULL region (value None)
+    assert walk_pages(client, auth_headers(1), 2, sort='year', order=order) == expected
+
+@pytest.mark.parametrize('sort', ['date_added', 'title', 'year'])
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_paging_matches_a_single_page(client, auth_headers, sort, order):
+    for i, title in enumerate(['delta', 'alpha', 'charlie', 'alpha', 'bravo']):
+        add_media(client, auth_headers, title=title, year=None if i % 2 else 1990 + i)
+
+    headers = auth_headers(1)
+    whole = client.get('/api/media', query_string={'sort': sort, 'order': order, 'limit': 500}, headers=headers)
+    expected = [item['id'] for item in whole.get_json()['media']]
+    assert len(expected) == 5
+    assert walk_pages(client, headers, 2, sort=sort, order=order) == expected
+
+@pytest.mark.parametrize('sort, order, after', [
+    ('date_added', 'desc', 'not-a-cursor'),
+    ('year', 'asc', cursor('year', 'asc', '1999', 3)),
+    ('year', 'asc', cursor('year', 'asc', True, 3)),
+    ('year', 'asc', cursor('year', 'asc', 2 ** 63, 3)),
+    ('year', 'asc', cursor('year', 'asc', 1999, '3')),
+    ('title', 'asc', cursor('title', 'asc', None, 3)),
+    ('title', 'asc', cursor('title', 'asc', 7, 3)),
+    ('date_added', 'desc', cursor('date_added', 'desc', 'yesterday', 3)),
+    ('date_added', 'desc', cursor('date_added', 'desc', 20240101, 3)),
+    ('date_added', 'desc', cursor('date_added', 'desc', '2024-01-01T00:00:00')),
+], ids=['not-base64-json', 'year-string', 'year-bool', 'year-too-big', 'id-string', 'title-null',
+        'title-int', 'date-unparsable', 'date-int', 'id-missing'])
+def test_mistyped_cursor_is_rejected(client, auth_headers, sort, order, after):
+    add_media(client, auth_headers)
+    resp = client.get('/api/media', query_string={'sort': sort, 'order': order, 'after': after},
+                      headers=auth_headers(1))
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == 'Invalid cursor'
+
+def test_cursor_from_another_sort_is_rejected(client, auth_headers):
+    add_media(client, auth_headers)
+    add_media(client, auth_headers)
+    headers = auth_headers(1)
+    first = client.get('/api/media', query_string={'sort': 'title', 'limit': 1}, headers=headers)
+    after = first.get_json()['next_cursor']
+
+    resp = client.get('/api/media', query_string={'sort': 'year', 'after': after}, headers=headers)
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == 'Cursor does not match sort order'
+
+def test_item_etag_answers_304_until_the_item_changes(client, auth_headers):
+    media_id = add_media(client, auth_headers, title='Old title')
+    headers = auth_headers(1)
+
+    first = client.get(f'/api/media/{media_id}', headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get(f'/api/media/{media_id}', headers={**headers, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+    assert client.patch(f'/api/media/{media_id}', json={'title': 'New title'}, headers=headers).status_code == 200
+    changed = client.get(f'/api/media/{media_id}', headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['media']['title'] == 'New title'
+
+def test_list_needs_a_token_for_the_requested_user(client, auth_headers):
+    add_media(client, auth_headers)
+
+    assert client.get('/api/media').status_code == 401
+    assert client.get('/api/media', query_string={'user_id': 1}).status_code == 401
+    assert client.get('/api/media', query_string={'user_id': 1}, headers=auth_headers(2)).status_code == 403
+    own = client.get('/api/media', headers=auth_headers(2))
+    assert own.status_code == 200
+    assert own.get_json()['media'] == []
+
+@pytest.mark.parametrize('method', ['get', 'patch', 'delete'])
+def test_item_is_only_visible_to_its_owner(client, auth_headers, method):
+    media_id = add_media(client, auth_headers)
+    send = getattr(client, method)
+    body = {'json': {'title': 'Taken'}} if method == 'patch' else {}
+
+    assert send(f'/api/media/{media_id}', **body).status_code == 401
+    assert send(f'/api/media/{media_id}', headers=auth_headers(2), **body).status_code == 403
+    assert client.get(f'/api/media/{media_id}', headers=auth_headers(1)).get_json()['media']['title'] == 'Title'
+
+def test_create_for_another_user_is_forbidden(client, auth_headers):
+    body = {'user_id': 1, 'title': 'Title', 'creator': 'Creator', 'type': 'book'}
+    assert client.post('/api/media', json=body).status_code == 401
+    assert client.post('/api/media', json=body, headers=auth_headers(2)).status_code == 403
@@ -0,0 +1,86 @@
+"""
+====================================================================================
+test_outbox.py - Transactional Outbox Tests for Media Service (SortedShelf)
+====================================================================================
+
+Course: CS361
+Author: Justin Enghauser
+
+Purpose:
+  - Every committed create, update and delete writes one event with the
+    item's state; rolled-back writes write none
+  - The relay marks events delivered only once collection-service accepted
+    them, and replays the same events, in order, after a failed delivery
+
+Usage:
+  - python -m pytest tests/test_outbox.py
+
+====================================================================================
+"""
+
+import pytest
+import requests
+
+from app import db
+from collection_client import collection_client
+from models import Media, MediaOutbox
+from outbox import relay_pending
+
+def add_media(client, auth_headers, title='Title'):
+    """Create a media item for user 1 through the API and return its ID."""
+    body = {'user_id': 1, 'title': title, 'creator': 'Creator', 'type': 'book'}
+    resp = client.post('/api/media', json=body, headers=auth_headers(1))
+    assert resp.status_code == 201
+    return resp.get_json()['id']
+
+def outbox_events(app):
+    """Every outbox event, oldest first."""
+    with app.app_context():
+        return [row.to_event() for row in MediaOutbox.query.order_by(MediaOutbox.id)]
+
+def test_each_commit_records_the_item_state(app, client, auth_headers):
+    headers = auth_headers(1)
+    media_id = add_media(client, auth_headers, title='First')
+    client.patch(f'/api/media/{media_id}', json={'title': 'Second'}, headers=headers)
+    client.delete(f'/api/media/{media_id}', headers=headers)
+
+    events = outbox_events(app)
+    assert [(e['media_id'], e['type'], e['version']) for e in events] == [
+        (media_id, 'upsert', 1), (media_id, 'upsert', 2), (media_id, 'delete', None)
+    ]
+    assert [e['media'] and e['media']['title'] for e in events] == ['First', 'Second', None]
+
+def test_rolled_back_write_records_nothing(app):
+    with app.app_context():
+        db.session.add(Media(user_id=1, title='Title', creator='Creator', type='book'))
+        db.session.flush()
+        db.session.rollback()
+    assert outbox_events(app) == []
+
+def test_relay_replays_a_batch_that_was_not_accepted(app, client, auth_headers, monkeypatch):
+    for title in ('a', 'b', 'c'):
+        add_media(client, auth_headers, title=title)
+    sent = []
+
+    def refuse(events):
+        sent.append([e['id'] for e in events])
+        raise requests.ConnectionError('collection-service is down')
+
+    def accept(events):
+        sent.append([e['id'] for e in events])
+        return {'success': True, 'applied': len(events), 'skipped': 0}
+
+    monkeypatch.setattr(collection_client, 'send_media_events', refuse)
+    with app.app_context():
+        with pytest.raises(requests.ConnectionError):
+            relay_pending(10)
+        assert MediaOutbox.query.filter(MediaOutbox.delivered_at.is_(None)).count() == 3
+
+    monkeypatch.setattr(collection_client, 'send_media_events', accept)
+    with app.app_context():
+        assert [relay_pending(2), relay_pending(2), relay_pending(2)] == [2, 1, 0]
+        assert MediaOutbox.query.filter(MediaOutbox.delivered_at.is_(None)).count() == 0
+
+    failed, *delivered = sent
+    assert sum(delivered, []) == failed
+    assert failed == sorted(failed)